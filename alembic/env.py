@@ -9,6 +9,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from src.config import DATABASE_URL
+from src.database.busca import PRODUTOS_BUSCA
 from src.database.models import Base
 
 
@@ -24,6 +25,18 @@ if config.config_file_name is not None:
 # add your model's MetaData object here
 target_metadata = Base.metadata
 
+
+def include_name(name, type_, parent_names) -> bool:
+    """
+    Ignora no autogenerate a tabela FTS5 da busca e as tabelas internas dela
+    (produtos_busca_data, _idx, _content, _docsize, _config): criadas por evento
+    DDL no SQLite, fora do Base.metadata; senão toda revisão geraria o DROP delas
+    """
+    if type_ == "table":
+        return not (name or "").startswith(PRODUTOS_BUSCA.name)
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
     url = config.get_main_option("sqlalchemy.url")
@@ -32,6 +45,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -48,8 +62,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, 
-            target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
         )
 
         with context.begin_transaction():
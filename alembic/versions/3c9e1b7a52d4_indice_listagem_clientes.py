@@ -0,0 +1,29 @@
+"""indice de listagem paginada de clientes
+
+Revision ID: 3c9e1b7a52d4
+Revises: fb23fd08740a
+Create Date: 2026-10-17 10:12:03.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e1b7a52d4'
+down_revision: Union[str, Sequence[str], None] = 'fb23fd08740a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_cliente_ativo_id', 'clientes', ['ativo', 'id_cliente'], unique=False)
+    op.drop_index('idx_cliente_ativo', table_name='clientes')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('idx_cliente_ativo', 'clientes', ['ativo'], unique=False)
+    op.drop_index('idx_cliente_ativo_id', table_name='clientes')
@@ -0,0 +1,51 @@
+"""indice de busca de produtos
+
+Revision ID: 8a4e2c91d7b3
+Revises: 3c9e1b7a52d4
+Create Date: 2026-10-17 14:05:41.902315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4e2c91d7b3'
+down_revision: Union[str, Sequence[str], None] = '3c9e1b7a52d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Mesmas expressões de src/database/models.py (DOCUMENTO_BUSCA e NOME_SEM_ACENTO)
+SEM_ACENTO = "f_unaccent(lower(coalesce({}, '')))"
+DOCUMENTO = ("setweight(to_tsvector('simple'::regconfig, {}), 'A') || "
+             "setweight(to_tsvector('simple'::regconfig, {}), 'B') || "
+             "setweight(to_tsvector('simple'::regconfig, {}), 'C')").format(
+    SEM_ACENTO.format('nome'), SEM_ACENTO.format('modelo'), SEM_ACENTO.format('categoria'))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text LANGUAGE sql IMMUTABLE PARALLEL SAFE "
+                   "STRICT AS $$ SELECT public.unaccent('public.unaccent', $1) $$")
+        op.execute(f"CREATE INDEX idx_produto_busca_documento ON produtos USING gin (({DOCUMENTO}))")
+        op.execute(f"CREATE INDEX idx_produto_busca_nome_trgm ON produtos "
+                   f"USING gin ({SEM_ACENTO.format('nome')} gin_trgm_ops)")
+    elif op.get_bind().dialect.name == 'sqlite':
+        op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS produtos_busca USING fts5("
+                   "nome, modelo, categoria, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')")
+        op.execute("INSERT INTO produtos_busca(rowid, nome, modelo, categoria) "
+                   "SELECT codigo, nome, coalesce(modelo, ''), categoria FROM produtos WHERE ativo")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('idx_produto_busca_nome_trgm', table_name='produtos')
+        op.drop_index('idx_produto_busca_documento', table_name='produtos')
+        op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
+    elif op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS produtos_busca")
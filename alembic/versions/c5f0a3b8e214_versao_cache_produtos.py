@@ -0,0 +1,36 @@
+"""versao dos produtos para o cache em processo
+
+Revision ID: c5f0a3b8e214
+Revises: 8a4e2c91d7b3
+Create Date: 2026-10-17 16:22:09.517430
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f0a3b8e214'
+down_revision: Union[str, Sequence[str], None] = '8a4e2c91d7b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('produtos_versao',
+    sa.Column('produto_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('versao', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('produto_id')
+    )
+    op.create_index('idx_produto_versao_versao', 'produtos_versao', ['versao'], unique=False)
+    # Contador global (produto_id = 0)
+    op.execute("INSERT INTO produtos_versao (produto_id, versao) VALUES (0, 0)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_produto_versao_versao', table_name='produtos_versao')
+    op.drop_table('produtos_versao')
@@ -1,13 +1,57 @@
+from contextlib import asynccontextmanager
+
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from jwt import InvalidTokenError
+from sqlalchemy import text
 
+from src.api.container import iniciar_container
 from src.api.routes import clientes, produtos, vendas, estoque, auth
 from src.api.exception_handlers import validation_exception_handler, jwt_exception_handler, generic_exception_handler
+from src.api.middleware.metricas import MetricasMiddleware
+from src.api.middleware.request_context import RequestIdMiddleware
+from src.api.middleware.server_timing import ServerTimingMiddleware
+from src.config import API_THREADPOOL_TAMANHO, DB_PRONTIDAO_SATURACAO, EXPIRACAO_WORKER_ATIVO
+from src.database.configuracao import aquecer_pool, estado_pool
+from src.database.connection import configuracao_engine, engine
+from src.services.metricas import registro
+from src.services.security import PasswordHandler
+from src.services.workers import CarrinhoExpiracaoWorker, ReservaExpiracaoWorker
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Configura o threadpool das rotas, cria os controllers e inicia/encerra os workers e o export de métricas"""
+    # As rotas são síncronas (SQLAlchemy/bcrypt) e rodam no threadpool do AnyIO:
+    # limitar ao tamanho do pool de conexões evita threads esperando conexão
+    to_thread.current_default_thread_limiter().total_tokens = API_THREADPOOL_TAMANHO
+
+    iniciar_container(app)
+    # Abre as conexões antes do primeiro pico (DB_AQUECER)
+    await to_thread.run_sync(aquecer_pool, engine, configuracao_engine.aquecer)
+
+    workers = [CarrinhoExpiracaoWorker(), ReservaExpiracaoWorker()] if EXPIRACAO_WORKER_ATIVO else []
+
+    for worker in workers:
+        worker.iniciar()
+    # Com METRICAS_DIR: snapshot periódico deste worker para o /metrics agregado
+    registro.iniciar_exportacao()
+
+    app.state.workers = workers
+    try:
+        yield
+    finally:
+        for worker in workers:
+            await worker.parar()
+        PasswordHandler.encerrar_executor()
+        registro.parar_exportacao()
 
 
-app = FastAPI(title="API Sistema de Loja", description="API REST para gerenciamento de loja", version="1.0.0")
+app = FastAPI(title="API Sistema de Loja", description="API REST para gerenciamento de loja", version="1.0.0",
+              lifespan=lifespan)
 # uvicorn src.api.app:app --reload
 
 app.add_middleware(
@@ -17,6 +61,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(MetricasMiddleware)
+# Por último = mais externo: o request_id vale também para o CORS e para os handlers de erro
+app.add_middleware(RequestIdMiddleware)
 
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(InvalidTokenError, jwt_exception_handler)
@@ -41,3 +89,33 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/ready")
+def readiness_check():
+    """
+    Prontidão para receber tráfego: banco acessível e pool abaixo de DB_PRONTIDAO_SATURACAO
+
+    Com o pool saturado responde 503 sem pedir conexão (o ping ficaria esperando na fila).
+    """
+    pool = estado_pool(engine)
+    saturado = pool.get("saturacao", 0.0) >= DB_PRONTIDAO_SATURACAO
+    banco = "nao_verificado"
+
+    if not saturado:
+        try:
+            with engine.connect() as conexao:
+                conexao.execute(text("SELECT 1"))
+            banco = "ok"
+        except Exception:
+            banco = "indisponivel"
+
+    pronto = banco == "ok"
+    return JSONResponse(status_code=200 if pronto else 503,
+                        content={"status": "ready" if pronto else "not_ready", "banco": banco, "pool": pool})
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Métricas no formato texto do Prometheus (soma de todos os workers quando METRICAS_DIR está definido)"""
+    return PlainTextResponse(registro.exportar(), media_type="text/plain; version=0.0.4")
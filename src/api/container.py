@@ -0,0 +1,48 @@
+"""
+Controllers da aplicação, criados uma vez por processo
+
+Os controllers não guardam estado de requisição (a sessão chega por
+parâmetro), então uma instância de cada serve todas as requisições. O
+`lifespan` monta o container em `app.state.controllers`; as dependencies
+das rotas só devolvem a instância pronta, sem construir controller nem
+chamar `get_logger` a cada requisição.
+"""
+
+from fastapi import FastAPI, Request
+
+from src.controllers.auth_controller import AuthController
+from src.controllers.carrinho_controller import CarrinhoController
+from src.controllers.cliente_controller import ClienteController
+from src.controllers.estoque_controller import EstoqueController
+from src.controllers.produto_controller import ProdutoController
+from src.controllers.venda_controller import VendaController
+
+
+class ControllerContainer:
+    """Singletons dos controllers, com as dependências entre eles compartilhadas"""
+
+    def __init__(self):
+        self.estoque = EstoqueController()
+        self.carrinho = CarrinhoController(estoque_controller=self.estoque)
+        self.venda = VendaController(estoque_controller=self.estoque, carrinho_controller=self.carrinho)
+        self.produto = ProdutoController()
+        self.cliente = ClienteController()
+        self.auth = AuthController()
+
+
+def iniciar_container(app: FastAPI) -> ControllerContainer:
+    """Cria o container e guarda em `app.state` (chamado no lifespan)"""
+    app.state.controllers = ControllerContainer()
+    return app.state.controllers
+
+
+def get_controllers(request: Request) -> ControllerContainer:
+    """
+    Container da aplicação
+
+    Sem lifespan (ex.: TestClient fora de `with`), cria na primeira requisição.
+    """
+    container = getattr(request.app.state, "controllers", None)
+    if container is None:
+        container = iniciar_container(request.app)
+    return container
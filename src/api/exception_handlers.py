@@ -3,6 +3,9 @@ from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from jwt.exceptions import InvalidTokenError
 
+from src.api.middleware.request_context import REQUEST_ID_HEADER
+from src.utils.logKit.context import current_request
+
 
 async def validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
     """Trata erros  de validação Pydantic"""
@@ -15,11 +18,14 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 
 async def generic_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     """Trata erros não esperados"""
+    # Roda fora do RequestIdMiddleware (ServerErrorMiddleware): o ID vem do contexto da requisição
+    contexto = current_request()
+    headers = {REQUEST_ID_HEADER: contexto.request_id} if contexto is not None else None
     return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                         content={"success": False,
                                  "message": "Erro interno do servidor",
                                  "error_type": type(exc).__name__
-                                 })
+                                 }, headers=headers)
 
 async def jwt_exception_handler(request: Request, exc: InvalidTokenError) -> JSONResponse:
     """Trata erros de JWT"""
@@ -1,3 +1,7 @@
 from .auth_middleware import require_vendedor_or_above, get_current_user, require_admin_or_gerente
+from .metricas import MetricasMiddleware
+from .request_context import RequestIdMiddleware
+from .server_timing import ServerTimingMiddleware
 
-__all__ = ["require_vendedor_or_above", "get_current_user", "require_admin_or_gerente"]
\ No newline at end of file
+__all__ = ["require_vendedor_or_above", "get_current_user", "require_admin_or_gerente", "RequestIdMiddleware",
+           "ServerTimingMiddleware", "MetricasMiddleware"]
\ No newline at end of file
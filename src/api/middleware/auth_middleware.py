@@ -1,19 +1,27 @@
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from src.services.security import JWTHandler
+from src.utils.logKit.context import current_request
 
 security = HTTPBearer()
 
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+def get_current_user(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """
        Dependency para obter usuário atual do token
 
+    O token é verificado uma vez por requisição; os claims ficam em
+    `request.state.user` para as demais dependencies da mesma requisição.
+
     Usage:
         @router.get("/perfil")
         async def meu_perfil(user: dict = Depends(get_current_user)):
             return user
     """
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
+
     token = credentials.credentials
     payload = JWTHandler.verify_token(token, token_type="access")
 
@@ -21,7 +29,12 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token invalido ou expirado",
                             headers={"WWW-Authenticate": "Bearer"})
 
-    return JWTHandler.verify_token(token, token_type="access")
+    request.state.user = payload
+    # Logs do resto da requisição passam a levar o usuário
+    contexto = current_request()
+    if contexto is not None:
+        contexto.user_id = payload.get("user_id")
+    return payload
 
 
 def require_admin(user: dict = Depends(get_current_user)) -> dict:
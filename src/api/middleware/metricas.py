@@ -0,0 +1,44 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.services.metricas import LATENCIA_REQUISICOES, REQUISICOES_EM_ANDAMENTO
+
+# Rotas não encontradas (404) ficam todas numa série, sem explodir a cardinalidade por URL
+ROTA_DESCONHECIDA = "desconhecida"
+
+
+class MetricasMiddleware:
+    """
+    Middleware ASGI que alimenta as métricas HTTP do /metrics
+
+    - `http_requests_in_flight`: requisições em andamento
+    - `http_request_duration_seconds`: latência por método, template da rota
+      (ex.: /products/{produto_id}) e status
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500  # exceção sem resposta: o ServerErrorMiddleware (por fora) responde 500
+
+        async def send_com_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUISICOES_EM_ANDAMENTO.inc()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_com_status)
+        finally:
+            REQUISICOES_EM_ANDAMENTO.dec()
+            rota = getattr(scope.get("route"), "path", ROTA_DESCONHECIDA)
+            LATENCIA_REQUISICOES.observar(time.perf_counter() - inicio, method=scope["method"], route=rota,
+                                          status=str(status))
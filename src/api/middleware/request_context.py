@@ -0,0 +1,73 @@
+import re
+from uuid import uuid4
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils.logKit.context import RequestContext, bind_request, reset_request
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_HEADER = REQUEST_ID_HEADER.lower().encode("latin-1")
+# IDs vindos do cliente/proxy só são aceitos se forem curtos e sem caracteres de controle
+_ID_VALIDO = re.compile(rb"[A-Za-z0-9._:\-]{1,128}")
+
+
+class _ContextoASGI(RequestContext):
+    """Contexto cuja rota é lida do scope depois do roteamento (template, ex.: /products/{produto_id})"""
+
+    __slots__ = ("_scope", "_rota")
+
+    def __init__(self, request_id: str, scope: Scope) -> None:
+        self._scope = scope
+        super().__init__(request_id)
+
+    @property
+    def route(self) -> str | None:
+        rota = self._rota
+        if rota is None:
+            # Antes do roteamento o scope ainda não tem "route"; depois fica guardada
+            rota = self._rota = getattr(self._scope.get("route"), "path", None)
+        return rota
+
+    @route.setter
+    def route(self, valor: str | None) -> None:
+        self._rota = valor
+
+
+class RequestIdMiddleware:
+    """
+    Middleware ASGI que atribui ou propaga o `X-Request-ID`
+
+    Usa o ID recebido no header (quando válido) ou gera um novo, publica o
+    contexto para os logs (`src.utils.logKit.context`) e devolve o ID no
+    header da resposta.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for nome, valor in scope["headers"]:
+            if nome == _HEADER:
+                if _ID_VALIDO.fullmatch(valor):
+                    request_id = valor.decode("latin-1")
+                break
+        if request_id is None:
+            request_id = uuid4().hex
+
+        cabecalho = (_HEADER, request_id.encode("latin-1"))
+
+        async def send_com_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), cabecalho]
+            await send(message)
+
+        token = bind_request(_ContextoASGI(request_id, scope))
+        # Sem finally: numa exceção o contexto continua valendo para o handler de erro 500
+        # (ServerErrorMiddleware fica por fora); a task da requisição termina em seguida
+        await self.app(scope, receive, send_com_id)
+        reset_request(token)
@@ -0,0 +1,42 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.database.instrumentacao import EstatisticasRequisicao, estatisticas_requisicao
+
+
+class ServerTimingMiddleware:
+    """
+    Middleware ASGI que expõe o custo de banco da requisição em `Server-Timing`
+
+    Exemplo de header:
+        Server-Timing: db;dur=3.21;desc="4 queries", app;dur=7.80
+
+    Os números vêm da instrumentação SQL (`src.database.instrumentacao`), que
+    acumula statements e tempo no objeto publicado aqui no ContextVar.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estatisticas = EstatisticasRequisicao()
+        inicio = time.perf_counter()
+
+        async def send_com_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - inicio) * 1000
+                valor = (f'db;dur={estatisticas.tempo_db * 1000:.2f};desc="{estatisticas.consultas} queries", '
+                         f'app;dur={total_ms:.2f}')
+                message["headers"] = [*message.get("headers", ()), (b"server-timing", valor.encode("latin-1"))]
+            await send(message)
+
+        token = estatisticas_requisicao.set(estatisticas)
+        try:
+            await self.app(scope, receive, send_com_timing)
+        finally:
+            estatisticas_requisicao.reset(token)
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from src.controllers import AuthController
+from src.api.container import get_controllers
 from src.api.schemas.auth_schema import (UsuarioRegistro, UsuarioLogin, TokenResponse, RefreshTokenRequest,
                                          AlterarSenhaRequest, UsuarioResponse)
 from src.api.middleware.auth_middleware import get_current_user, require_admin
@@ -15,9 +16,9 @@ auth_router = APIRouter(prefix="/auth", tags=["Autenticação"])
 endpoint_auth_log = get_logger("LoggerAuth", "WARNING")
 
 
-def get_auth_controller() -> AuthController:
+async def get_auth_controller(request: Request) -> AuthController:
     """Dependency para obter instância do controller"""
-    return AuthController()
+    return get_controllers(request).auth
 
 
 @limiter.limit('3/minute')
@@ -26,8 +27,8 @@ def get_auth_controller() -> AuthController:
                   response_model=dict,
                   summary="Registrar novo usuário",
                   description="Cadastra um novo usuário no sistema com validações de segurança")
-async def registrar(request: Request, usuario: UsuarioRegistro, db: Session = Depends(get_db),
-                    controller: AuthController = Depends(get_auth_controller)):
+def registrar(request: Request, usuario: UsuarioRegistro, db: Session = Depends(get_db),
+              controller: AuthController = Depends(get_auth_controller)):
     """
     ## Registra novo usuário no sistema
 
@@ -98,7 +99,7 @@ async def registrar(request: Request, usuario: UsuarioRegistro, db: Session = De
     summary="Autenticar usuário",
     description="Realiza login e retorna tokens JWT"
 )
-async def login(
+def login(
         credenciais: UsuarioLogin,
         db: Session = Depends(get_db),
         controller: AuthController = Depends(get_auth_controller)
@@ -168,7 +169,7 @@ async def login(
     summary="Renovar access token",
     description="Usa refresh_token para obter novo access_token"
 )
-async def renovar_token(
+def renovar_token(
         request: RefreshTokenRequest,
         db: Session = Depends(get_db),
         controller: AuthController = Depends(get_auth_controller)
@@ -247,7 +248,7 @@ async def renovar_token(
     summary="Obter perfil do usuário",
     description="Retorna dados do usuário autenticado"
 )
-async def perfil_usuario(
+def perfil_usuario(
         user: dict = Depends(get_current_user),
         db: Session = Depends(get_db),
         controller: AuthController = Depends(get_auth_controller)
@@ -308,7 +309,7 @@ async def perfil_usuario(
     summary="Alterar senha",
     description="Permite usuário alterar sua própria senha"
 )
-async def alterar_senha(
+def alterar_senha(
         request: AlterarSenhaRequest,
         user: dict = Depends(get_current_user),
         db: Session = Depends(get_db),
@@ -377,7 +378,7 @@ async def alterar_senha(
     summary="Listar usuários",
     description="Lista usuários do sistema (apenas admins)"
 )
-async def listar_usuarios(
+def listar_usuarios(
         tipo_usuario: Optional[str] = Query(
             None,
             pattern="^(admin|gerente|vendedor)$",
@@ -436,7 +437,7 @@ async def listar_usuarios(
     summary="Desativar usuário",
     description="Desativa um usuário (soft delete)"
 )
-async def desativar_usuario(
+def desativar_usuario(
         user_id: int,
         admin: dict = Depends(require_admin),
         db: Session = Depends(get_db),
@@ -508,7 +509,7 @@ async def desativar_usuario(
     summary="Fazer logout",
     description="Invalida token do usuário (implementação básica)"
 )
-async def logout(
+def logout(
         user: dict = Depends(get_current_user)
 ):
     """
@@ -1,9 +1,10 @@
-from typing import List
+from typing import List, Optional
 from sqlalchemy.orm import Session
 from src.database.connection import get_db
 from src.utils.logKit.config_logging import get_logger
-from fastapi import APIRouter, HTTPException, Query, status, Depends
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status, Depends
 from src.controllers.cliente_controller import ClienteController
+from src.api.container import get_controllers
 from src.api.schemas import ClienteCreate, ClienteUpdate, ClienteResponse
 from src.api.middleware import get_current_user, require_admin_or_gerente
 
@@ -11,8 +12,8 @@ cliente_router = APIRouter(prefix="/clients", tags=["clients"])
 endpoint_cliente_log = get_logger("LoggerCliente", "WARNING")
 
 
-def get_cliente_controller() -> ClienteController:
-    return ClienteController()
+async def get_cliente_controller(request: Request) -> ClienteController:
+    return get_controllers(request).cliente
 
 
 @cliente_router.post("/register", status_code=status.HTTP_201_CREATED,
@@ -20,8 +21,8 @@ def get_cliente_controller() -> ClienteController:
                      response_model=dict,
                      summary="Registrar novo cliente",
                      description="Cadastra um cliente no sistema")
-async def cliente_register(cliente: ClienteCreate, db: Session = Depends(get_db),
-                           controller: ClienteController = Depends(get_cliente_controller)):
+def cliente_register(cliente: ClienteCreate, db: Session = Depends(get_db),
+                     controller: ClienteController = Depends(get_cliente_controller)):
     """
     Cadastra novo cliente no sistema
 
@@ -51,9 +52,9 @@ async def cliente_register(cliente: ClienteCreate, db: Session = Depends(get_db)
 
 
 @cliente_router.get("/search", dependencies=[Depends(get_current_user)])
-async def cliente_search(db: Session = Depends(get_db),
-                         cpf: str = Query(..., min_length=11, max_length=14, description="CPF do cliente"),
-                         controller: ClienteController = Depends(get_cliente_controller)):
+def cliente_search(db: Session = Depends(get_db),
+                   cpf: str = Query(..., min_length=11, max_length=14, description="CPF do cliente"),
+                   controller: ClienteController = Depends(get_cliente_controller)):
     """
     Buscar cliente por CPF
 
@@ -75,8 +76,8 @@ async def cliente_search(db: Session = Depends(get_db),
 
 
 @cliente_router.put("/edit_registration", dependencies=[Depends(require_admin_or_gerente)])
-async def cliente_edit_registration(cpf: str, cliente_update: ClienteUpdate, db: Session = Depends(get_db),
-                                    controller: ClienteController = Depends(get_cliente_controller)):
+def cliente_edit_registration(cpf: str, cliente_update: ClienteUpdate, db: Session = Depends(get_db),
+                              controller: ClienteController = Depends(get_cliente_controller)):
     """
     Edita dados de contato do cliente
 
@@ -112,8 +113,8 @@ async def cliente_edit_registration(cpf: str, cliente_update: ClienteUpdate, db:
 
 
 @cliente_router.delete("/disable", dependencies=[Depends(require_admin_or_gerente)])
-async def cliente_disabled(cpf: str, db: Session = Depends(get_db),
-                           controller: ClienteController = Depends(get_cliente_controller)):
+def cliente_disabled(cpf: str, db: Session = Depends(get_db),
+                     controller: ClienteController = Depends(get_cliente_controller)):
     """
     Desativa cliente (soft delete)
 
@@ -139,28 +140,46 @@ async def cliente_disabled(cpf: str, db: Session = Depends(get_db),
 
 @cliente_router.get("", response_model=List[ClienteResponse],
                     dependencies=[Depends(get_current_user), Depends(require_admin_or_gerente)])
-async def list_clients(
+def list_clients(
+        response: Response,
         skip: int = Query(0, ge=0, description="Numero de registros a pular"),
         limit: int = Query(100, ge=1, le=1000, description="Maximo de registros"),
+        after_id: Optional[int] = Query(None, ge=0, description="Retorna clientes com id maior que este (cursor)"),
+        include_total: bool = Query(True, description="Calcula o total de clientes ativos (X-Total-Count)"),
         db: Session = Depends(get_db),
         controller: ClienteController = Depends(get_cliente_controller)
 ):
     """
-    Lista todos os clientes ativos
+    Lista clientes ativos em ordem de id
 
     Parâmetros de paginação:
-    - **skip**: Offset para paginação (padrão 0)
+    - **after_id**: Cursor; use o valor de `X-Next-After-Id` da página anterior.
+      Custo constante, independente do total de clientes
+    - **skip**: Offset para paginação (padrão 0); o banco ainda percorre os registros pulados
     - **limit**: Numero maximo de resultados (padrão: 100, Máx: 1000)
+    - **include_total**: Envia `X-Total-Count`; desligue em bases grandes (COUNT percorre o índice inteiro)
+
+    Headers de resposta:
+    - **X-Next-After-Id**: cursor da próxima página (ausente na última)
+    - **X-Total-Count**: total de clientes ativos
 
     """
 
     try:
-        resultado = controller.listar_clientes(db)
+        resultado = controller.listar_clientes(db, limite=limit, apos_id=after_id, pular=skip)
 
         if isinstance(resultado, str):
-            return []
+            resultado = []
+
+        if len(resultado) == limit:
+            response.headers["X-Next-After-Id"] = str(resultado[-1].id_cliente)
 
-        return resultado[skip: skip + limit]
+        if include_total:
+            total = controller.contar_clientes(db)
+            if total is not None:
+                response.headers["X-Total-Count"] = str(total)
+
+        return resultado
 
     except Exception:
         endpoint_cliente_log.exception("Erro ao listar clientes")
@@ -1,16 +1,17 @@
 from datetime import datetime
 from sqlalchemy.orm import Session
-from fastapi import APIRouter, status, HTTPException, Query, Depends, Path
-from src.database.connection import get_db
+from fastapi import APIRouter, status, HTTPException, Query, Depends, Path, Request
+from src.database.connection import executar_db, get_db, get_sessao
 from src.controllers import EstoqueController
+from src.api.container import get_controllers
 from src.utils.logKit import get_logger
 from src.api.schemas import EstoqueReposicaoResponse, EstoqueReposicaoRequest, DisponibilidadeResponse, ReservasResponse
 from src.api.middleware import get_current_user, require_admin_or_gerente, require_vendedor_or_above
 
 
-def get_estoque_controller() -> EstoqueController:
+async def get_estoque_controller(request: Request) -> EstoqueController:
     """Dependency para obter instância do EstoqueController"""
-    return EstoqueController()
+    return get_controllers(request).estoque
 
 
 estoque_router = APIRouter(prefix="/stock", tags=["stock"])
@@ -23,11 +24,11 @@ endpoint_estoque_log = get_logger("LoggerEstoque", "WARNING")
     response_model=EstoqueReposicaoResponse,
     summary="Repor estoque de um produto"
 )
-async def repor_estoque(id_produto: int = Path(..., gt=0, description="ID do produto a ser reposto"),
-                        db: Session = Depends(get_db),
-                        reposicao: EstoqueReposicaoRequest = ...,
-                        controller: EstoqueController = Depends(get_estoque_controller),
-                        user: dict = Depends(require_admin_or_gerente)) -> EstoqueReposicaoResponse:
+def repor_estoque(id_produto: int = Path(..., gt=0, description="ID do produto a ser reposto"),
+                  db: Session = Depends(get_db),
+                  reposicao: EstoqueReposicaoRequest = ...,
+                  controller: EstoqueController = Depends(get_estoque_controller),
+                  user: dict = Depends(require_admin_or_gerente)) -> EstoqueReposicaoResponse:
     """
     ## Repõe estoque de um produto ativo
 
@@ -96,7 +97,7 @@ async def repor_estoque(id_produto: int = Path(..., gt=0, description="ID do pro
     response_model=ReservasResponse,
     summary="Consultar reservas de estoque"
 )
-async def obter_reservas_usuario(
+def obter_reservas_usuario(
         controller: EstoqueController = Depends(get_estoque_controller),
         db: Session = Depends(get_db),
         user: dict = Depends(get_current_user)) -> ReservasResponse:
@@ -157,7 +158,7 @@ async def verificar_disponibilidade(
         id_produto: int = Path(..., gt=0, description="ID do produto"),
         quantidade: int = Query(1, gt=0, description="Quantidade desejada"),
         user: dict = Depends(get_current_user),
-        db: Session = Depends(get_db),
+        db: Session = Depends(get_sessao),
         controller: EstoqueController = Depends(get_estoque_controller)
 ) -> DisponibilidadeResponse:
     """
@@ -171,7 +172,7 @@ async def verificar_disponibilidade(
     ```
     """
     try:
-        habilitado, msg_habilitado = controller.produto_habilitado(db, id_produto)
+        habilitado, msg_habilitado = await executar_db(db, controller.produto_habilitado, id_produto)
 
         if not habilitado:
             if "não localizado" in msg_habilitado.lower():
@@ -180,10 +181,10 @@ async def verificar_disponibilidade(
                     detail=f"Produto {id_produto} não encontrado"
                 )
 
-        disponivel, qtd_disponivel = controller.verificar_disponibilidade(db=db,
-                                                                          produto_id=id_produto,
-                                                                          quantidade=quantidade,
-                                                                          usuario=user['user_id'])
+        disponivel, qtd_disponivel = await executar_db(db, controller.verificar_disponibilidade,
+                                                       produto_id=id_produto,
+                                                       quantidade=quantidade,
+                                                       usuario=user['user_id'])
 
         return DisponibilidadeResponse(
             success=True,
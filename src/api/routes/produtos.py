@@ -1,26 +1,27 @@
 from typing import Optional
-from fastapi import APIRouter, status, HTTPException, Query, Depends
-from src.api.schemas.produto_schema import ProdutoUpdate
+from fastapi import APIRouter, status, HTTPException, Query, Depends, Request, Response
+from src.api.schemas.produto_schema import CAMPOS_PRODUTO, ProdutosPagina, ProdutoUpdate
 from src.controllers import ProdutoController
+from src.api.container import get_controllers
 from src.utils.logKit import get_logger
 from src.api.schemas import ProdutoCreated
 from src.api.middleware import require_admin_or_gerente
-from src.database.connection import get_db
+from src.database.connection import executar_db, get_db, get_sessao
 from sqlalchemy.orm import Session
 
 produtos_router = APIRouter(prefix="/products", tags=["products"])
 endpoint_produtos_log = get_logger("LoggerProduto", "WARNING")
 
 
-def get_produto_controller() -> ProdutoController:
-    """Dependency para obter instância do EstoqueController"""
-    return ProdutoController()
+async def get_produto_controller(request: Request) -> ProdutoController:
+    """Dependency para obter instância do ProdutoController"""
+    return get_controllers(request).produto
 
 
 @produtos_router.post("/", status_code=status.HTTP_201_CREATED, summary="Cadastra novo produto", )
-async def cadastrar_produto(produto: ProdutoCreated, user: dict = Depends(require_admin_or_gerente),
-                            db: Session = Depends(get_db),
-                            controller: ProdutoController = Depends(get_produto_controller)):
+def cadastrar_produto(produto: ProdutoCreated, user: dict = Depends(require_admin_or_gerente),
+                      db: Session = Depends(get_db),
+                      controller: ProdutoController = Depends(get_produto_controller)):
     """
     Cadastra um novo produto no sistema
 
@@ -46,9 +47,9 @@ async def cadastrar_produto(produto: ProdutoCreated, user: dict = Depends(requir
 
 
 @produtos_router.patch("/{id_produto}", status_code=status.HTTP_200_OK)
-async def atualizar_produto(id_produto: int, produto: ProdutoUpdate,
-                            db: Session = Depends(get_db), user: dict = Depends(require_admin_or_gerente),
-                            controller: ProdutoController = Depends(get_produto_controller)):
+def atualizar_produto(id_produto: int, produto: ProdutoUpdate,
+                      db: Session = Depends(get_db), user: dict = Depends(require_admin_or_gerente),
+                      controller: ProdutoController = Depends(get_produto_controller)):
     """
     Editar dados de um produto no sistema
 
@@ -84,37 +85,77 @@ async def atualizar_produto(id_produto: int, produto: ProdutoUpdate,
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@produtos_router.get("/search", status_code=status.HTTP_200_OK)
-async def buscar_produto(db: Session = Depends(get_db),
+@produtos_router.get("/search", status_code=status.HTTP_200_OK, response_model=ProdutosPagina)
+async def buscar_produto(db: Session = Depends(get_sessao),
                          nome: Optional[str] = Query(None, description="Buscar por nome"),
                          categoria: Optional[str] = Query(None, description="Buscar por categoria"),
                          modelo: Optional[str] = Query(None, description="Buscar por modelo"),
+                         q: Optional[str] = Query(None, min_length=1, max_length=100,
+                                                  description="Busca por prefixo em nome, modelo e categoria"),
+                         fields: Optional[str] = Query(None, description="Campos separados por vírgula "
+                                                                          f"({', '.join(CAMPOS_PRODUTO)})"),
+                         limit: int = Query(100, ge=1, le=1000, description="Maximo de resultados"),
+                         skip: int = Query(0, ge=0, le=10_000, description="Resultados a pular"),
+                         after_codigo: Optional[int] = Query(None, ge=0,
+                                                             description="Cursor: produtos com código maior "
+                                                                         "(nome, modelo ou categoria)"),
                          controller: ProdutoController = Depends(get_produto_controller)
                          ):
     """
-    Buscar produto por coluna e dado
+    Buscar produtos ativos
+
+    - **q**: busca por prefixo, sem acento e ordenada por relevância
+      ("note del" acha "Notebook Dell")
+    - **nome**, **modelo** ou **categoria**: igualdade exata, em ordem de código
+    - **fields**: só estas colunas são lidas do banco e enviadas (padrão: todas)
+    - **limit**/**skip**: paginação; `next_skip` é nulo na última página
+    - **after_codigo**: cursor das listagens por nome/modelo/categoria; use o
+      `next_after_codigo` da página anterior. Custo constante, sem o limite de skip
 
     :returns
-        Retorna o produto formatado,
+        `{"itens": [...], "limit", "skip", "next_skip"}` mais `next_after_codigo` nas listagens
+        (nulo na última página), ou `q` e `relevancia` na busca por q
 
     :exception
-        404 produto não encontrado
+        400 sem filtro, campo desconhecido em fields ou after_codigo com q
     """
     try:
-
+        campos = [campo.strip() for campo in fields.split(",") if campo.strip()] if fields else None
+        desconhecidos = set(campos or ()) - set(CAMPOS_PRODUTO)
+        if desconhecidos:
+            raise HTTPException(status_code=400, detail=f"Campos desconhecidos: {', '.join(sorted(desconhecidos))}. "
+                                                        f"Disponíveis: {', '.join(CAMPOS_PRODUTO)}")
+
+        # Um a mais para saber se há próxima página
+        if q:
+            if after_codigo is not None:
+                raise HTTPException(status_code=400, detail="after_codigo não vale para q (ordem por relevância)")
+            resultado = await executar_db(db, controller.pesquisar_produtos, q, limit + 1, skip, campos)
+            if isinstance(resultado, str):
+                raise HTTPException(status_code=500, detail=resultado)
+            return Response(ProdutosPagina.json_das_linhas(resultado, limit, skip, q=q),
+                            media_type="application/json")
+
+        # O codigo é lido (no fim da linha) para o cursor mesmo fora de fields
+        consulta = campos + ["codigo"] if campos and "codigo" not in campos else campos
         if nome:
-            resultado = controller.busca_produto(db, 'nome', nome)
+            resultado = await executar_db(db, controller.busca_produto, 'nome', nome, limit + 1, skip, consulta,
+                                          after_codigo)
         elif categoria:
-            resultado = controller.filtro_categoria(db, categoria)
+            resultado = await executar_db(db, controller.filtro_categoria, categoria, limit + 1, skip, consulta,
+                                          after_codigo)
         elif modelo:
-            resultado = controller.busca_produto(db, 'modelo', modelo)
+            resultado = await executar_db(db, controller.busca_produto, 'modelo', modelo, limit + 1, skip,
+                                          consulta, after_codigo)
         else:
-            raise HTTPException(status_code=400, detail="Forneça ao menos um filtro:  nome, categoria ou modelo")
+            raise HTTPException(status_code=400, detail="Forneça ao menos um filtro: q, nome, categoria ou modelo")
 
-        if "não localizado" in resultado:
-            return {"database": [], "message": "Nenhum produto encontrado"}
+        if isinstance(resultado, str):
+            raise HTTPException(status_code=500, detail=resultado)
 
-        return {'database': resultado}
+        proximo = resultado[limit - 1].codigo if len(resultado) > limit else None
+        return Response(ProdutosPagina.json_das_linhas(resultado, limit, skip, campos, next_after_codigo=proximo),
+                        media_type="application/json")
 
     except HTTPException:
         raise
@@ -124,8 +165,8 @@ async def buscar_produto(db: Session = Depends(get_db),
 
 
 @produtos_router.delete("/{id_produto}", status_code=status.HTTP_202_ACCEPTED)
-async def desabilitar_produto(id_produto: int, db:Session = Depends(get_db), controller: ProdutoController = Depends(get_produto_controller),
-                              user: dict = Depends(require_admin_or_gerente)):
+def desabilitar_produto(id_produto: int, db:Session = Depends(get_db), controller: ProdutoController = Depends(get_produto_controller),
+                        user: dict = Depends(require_admin_or_gerente)):
     """
     Desabilitar produto (soft delete)
 
@@ -153,7 +194,7 @@ async def desabilitar_produto(id_produto: int, db:Session = Depends(get_db), con
 
 
 @produtos_router.get("/contar")
-async def contar_produtos(db: Session = Depends(get_db), controller: ProdutoController = Depends(get_produto_controller)):
+def contar_produtos(db: Session = Depends(get_db), controller: ProdutoController = Depends(get_produto_controller)):
     try:
         resultado =controller.contar_produtos(db)
 
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Path
+from fastapi import APIRouter, HTTPException, status, Depends, Path, Request
 from src.controllers.venda_controller import VendaController
+from src.api.container import get_controllers
 from src.api.schemas import FinalizarVendaResponse, FinalizarVendaRequest, ItemCarrinhoResponse, ItemCarrinhoRequest, \
     CarrinhoResponse, AlterarQuantidadeRequest
 from src.api.middleware import require_vendedor_or_above, require_admin_or_gerente
-from src.database import get_db
+from src.database import executar_db, get_sessao
 from src.utils.logKit import get_logger
 from sqlalchemy.orm import Session
 
@@ -11,15 +12,15 @@ vendas_router = APIRouter(prefix="/sales", tags=["sales"])
 endpoint_vendas_log = get_logger("LoggerVendas", "WARNING")
 
 
-def get_venda_controller() -> VendaController:
-    return VendaController()
+async def get_venda_controller(request: Request) -> VendaController:
+    return get_controllers(request).venda
 
 
 @vendas_router.post("/cart/items", status_code=status.HTTP_201_CREATED, summary="Adicionar item ao carrinho")
 async def adicionar_ao_carrinho(item: ItemCarrinhoRequest,
                                 user: dict = Depends(require_vendedor_or_above),
                                 controller: VendaController = Depends(get_venda_controller),
-                                db: Session = Depends(get_db)):
+                                db: Session = Depends(get_sessao)):
     """
     ## Adiciona um produto ao carrinho de compras
 
@@ -46,9 +47,10 @@ async def adicionar_ao_carrinho(item: ItemCarrinhoRequest,
             f"Adicionando ao carrinho - Produto: {item.produto_id}, Qtd: {item.quantidade}"
         )
 
-        sucesso, resultado = controller.adicionar_item_carrinho(db=db, produto_id=item.produto_id,
-                                                                quantidade=item.quantidade,
-                                                                usuario_id=user['user_id'])
+        sucesso, resultado = await executar_db(db, controller.adicionar_item_carrinho,
+                                               produto_id=item.produto_id,
+                                               quantidade=item.quantidade,
+                                               usuario_id=user['user_id'])
 
         if not sucesso:
             if "não encontrado" in resultado.lower():
@@ -94,7 +96,7 @@ async def adicionar_ao_carrinho(item: ItemCarrinhoRequest,
 @vendas_router.get("/cart", status_code=status.HTTP_200_OK, response_model=CarrinhoResponse,
                    dependencies=[Depends(require_vendedor_or_above)], summary="Visualizar carrinho")
 async def ver_carrinho(controller: VendaController = Depends(get_venda_controller),
-                       db: Session = Depends(get_db),
+                       db: Session = Depends(get_sessao),
                        user: dict = Depends(require_vendedor_or_above)) -> CarrinhoResponse:
     """
     ## Retorna o carrinho atual com todos os itens
@@ -111,7 +113,7 @@ async def ver_carrinho(controller: VendaController = Depends(get_venda_controlle
     ```
     """
     try:
-        carrinho = controller.ver_carrinho(db=db, usuario_id=user['user_id'])
+        carrinho = await executar_db(db, controller.ver_carrinho, usuario_id=user['user_id'])
 
         if not carrinho:
             return CarrinhoResponse(
@@ -148,7 +150,7 @@ async def ver_carrinho(controller: VendaController = Depends(get_venda_controlle
 
 @vendas_router.delete("/cart/items/{produto_id}", status_code=status.HTTP_200_OK, summary="Remover item do carrinho")
 async def remover_do_carrinho(produto_id: int = Path(..., gt=0, description="ID do produto"),
-                              db: Session = Depends(get_db),
+                              db: Session = Depends(get_sessao),
                               controller: VendaController = Depends(get_venda_controller),
                               user: dict = Depends(require_vendedor_or_above)):
     """
@@ -167,7 +169,8 @@ async def remover_do_carrinho(produto_id: int = Path(..., gt=0, description="ID
     try:
         endpoint_vendas_log.info(f"User {user['username']} removendo produto {produto_id}")
 
-        sucesso, resultado = controller.remover_item_carrinho(db=db, produto_id=produto_id, usuario_id=user['user_id'])
+        sucesso, resultado = await executar_db(db, controller.remover_item_carrinho, produto_id=produto_id,
+                                               usuario_id=user['user_id'])
 
         if not sucesso:
             if "não encontrado" in resultado.lower():
@@ -203,7 +206,7 @@ async def remover_do_carrinho(produto_id: int = Path(..., gt=0, description="ID
 async def alterar_quantidade_carrinho(
         produto_id: int = Path(..., gt=0, description="ID do produto"),
         alteracao: AlterarQuantidadeRequest = ...,
-        db: Session = Depends(get_db),
+        db: Session = Depends(get_sessao),
         user: dict = Depends(require_vendedor_or_above),
         controller: VendaController = Depends(get_venda_controller)):
     """
@@ -230,8 +233,8 @@ async def alterar_quantidade_carrinho(
             f"Produto: {produto_id}, Nova qtd: {alteracao.nova_quantidade}"
         )
 
-        sucesso, resultado = controller.alterar_quantidade_carrinho(
-            db=db,
+        sucesso, resultado = await executar_db(
+            db, controller.alterar_quantidade_carrinho,
             produto_id=produto_id,
             nova_quantidade=alteracao.nova_quantidade,
             usuario_id=user['user_id'])
@@ -275,7 +278,7 @@ async def alterar_quantidade_carrinho(
 @vendas_router.post("/checkout", status_code=status.HTTP_201_CREATED, response_model=FinalizarVendaResponse,
                     summary="Finalizar venda")
 async def finalizar_venda(venda: FinalizarVendaRequest, controller: VendaController = Depends(get_venda_controller),
-                          db: Session = Depends(get_db),
+                          db: Session = Depends(get_sessao),
                           user: dict = Depends(require_vendedor_or_above)) -> FinalizarVendaResponse:
     """
     ## Finaliza a venda e processa pagamento
@@ -311,8 +314,8 @@ async def finalizar_venda(venda: FinalizarVendaRequest, controller: VendaControl
             f"Pagamento: {venda.forma_pagamento}, Desconto: {venda.percentual_desconto}%"
         )
 
-        sucesso, resultado, dados_venda = controller.finalizar_venda(
-            db=db,
+        sucesso, resultado, dados_venda = await executar_db(
+            db, controller.finalizar_venda,
             usuario_id=user['user_id'],
             cpf_cliente=venda.cpf_cliente,
             forma_pagamento=venda.forma_pagamento,
@@ -374,7 +377,7 @@ async def finalizar_venda(venda: FinalizarVendaRequest, controller: VendaControl
 
 )
 async def cancelar_venda(controller: VendaController = Depends(get_venda_controller),
-                         db: Session = Depends(get_db),
+                         db: Session = Depends(get_sessao),
                          user: dict = Depends(require_vendedor_or_above)):
     """
     ## Cancela a venda atual e limpa o carrinho
@@ -396,7 +399,7 @@ async def cancelar_venda(controller: VendaController = Depends(get_venda_control
     try:
         endpoint_vendas_log.info("Cancelando venda e limpando carrinho")
 
-        sucesso, resultado = controller.cancelar_carrinho(db=db, usuario_id=user['user_id'])
+        sucesso, resultado = await executar_db(db, controller.cancelar_carrinho, usuario_id=user['user_id'])
 
         if not sucesso:
             if "vazio" in resultado.lower():
@@ -1,10 +1,10 @@
 from .cliente_schema import ClienteCreate, ClienteUpdate, ClienteResponse
-from .produto_schema import ProdutoCreated
+from .produto_schema import ProdutoCreated, ProdutoResumo, ProdutosPagina
 from .estoque_schema import EstoqueReposicaoResponse, DisponibilidadeResponse, ReservasResponse, EstoqueReposicaoRequest
 from .venda_schema import FinalizarVendaResponse, FinalizarVendaRequest, AlterarQuantidadeRequest, ItemCarrinhoRequest, \
     ItemCarrinhoResponse, CarrinhoResponse
 
-__all__ = ["ClienteCreate", "ClienteUpdate", "ClienteResponse", "ProdutoCreated",
+__all__ = ["ClienteCreate", "ClienteUpdate", "ClienteResponse", "ProdutoCreated", "ProdutoResumo", "ProdutosPagina",
            "EstoqueReposicaoRequest", "DisponibilidadeResponse", "ReservasResponse",
            "EstoqueReposicaoResponse", "FinalizarVendaResponse", "FinalizarVendaRequest", "AlterarQuantidadeRequest",
            "ItemCarrinhoRequest", "CarrinhoResponse", "ItemCarrinhoResponse"
@@ -3,7 +3,8 @@ Esquemas pydantic para produto
 """
 from pydantic import BaseModel, Field, field_validator, model_validator
 from decimal import Decimal, ROUND_DOWN
-from typing import Optional
+from typing import List, Optional
+from typing_extensions import TypedDict
 
 
 @field_validator('vlr_compra', 'valor')
@@ -78,4 +79,64 @@ class ProdutoUpdate(BaseModel):
                 "valor": 3800.00,
                 "vlr_compra": 2900.00,
             }
-        }
\ No newline at end of file
+        }
+
+
+class ProdutoResumo(TypedDict, total=False):
+    """
+    Produto nas respostas de busca
+
+    Dict com só os campos selecionados (`fields=`), montado direto das linhas
+    da projeção: o serializer compilado do pydantic-core escreve dicts sem
+    instanciar um model por linha.
+    """
+    codigo: int
+    nome: str
+    modelo: Optional[str]
+    categoria: str
+    valor: float
+    quantidade_estoque: int
+    relevancia: float  # só na busca por `q`
+
+
+# Campos aceitos em `fields=` (mesmos nomes de src/database/busca.py: COLUNAS_PRODUTO)
+CAMPOS_PRODUTO = tuple(campo for campo in ProdutoResumo.__annotations__ if campo != "relevancia")
+
+
+class ProdutosPagina(BaseModel):
+    """Página de produtos; `next_skip` nulo na última página"""
+    itens: List[ProdutoResumo]
+    limit: int
+    skip: int
+    next_skip: Optional[int] = None
+    next_after_codigo: Optional[int] = None  # cursor, só nas listagens por nome/modelo/categoria
+    q: Optional[str] = None
+
+    @classmethod
+    def json_das_linhas(cls, linhas: list, limit: int, skip: int, chaves: Optional[List[str]] = None,
+                        **extras) -> bytes:
+        """
+        JSON da página a partir das linhas do banco (`limit + 1` linhas indicam próxima página)
+
+        `chaves`: colunas enviadas, as primeiras de cada linha (padrão: todas);
+        colunas a mais no fim, como o codigo lido só para o cursor, ficam de fora.
+
+        Usa o serializer compilado do pydantic-core direto para bytes, sem
+        validar de novo nem passar pelo jsonable_encoder do FastAPI.
+        """
+        chaves = chaves or (linhas[0]._fields if linhas else ())
+        itens = [dict(zip(chaves, linha)) for linha in linhas[:limit]]
+        pagina = cls.model_construct(itens=itens, limit=limit, skip=skip,
+                                     next_skip=skip + limit if len(linhas) > limit else None, **extras)
+        return cls.__pydantic_serializer__.to_json(pagina, exclude_unset=True)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "itens": [{"codigo": 1, "nome": "Notebook Dell", "modelo": "Inspiron 15",
+                           "categoria": "Eletrônicos", "valor": 3500.00, "quantidade_estoque": 10}],
+                "limit": 100,
+                "skip": 0,
+                "next_skip": None,
+            }
+        }
@@ -10,6 +10,14 @@ DATA_DIR = ROOT_DIR / "database"
 JWT_SECRET_KEY = getenv("JWT_SECRET_KEY", "dev-key-change-me")
 WT_ALGORITHM = getenv("JWT_ALGORITHM", "HS256")
 JWT_ACCESS_TOKEN_EXPIRE_MINUTES = int(getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+# Tokens já verificados mantidos em memória até o `exp` (0 desativa o cache)
+JWT_CACHE_TAMANHO = int(getenv("JWT_CACHE_TAMANHO", "4096"))
+
+# bcrypt: custo (log2 das iterações) e onde os hashes rodam
+# BCRYPT_EXECUTOR: thread (bcrypt libera o GIL), process ou inline (na própria thread)
+BCRYPT_ROUNDS = int(getenv('BCRYPT_ROUNDS', '12'))
+BCRYPT_EXECUTOR = getenv('BCRYPT_EXECUTOR', 'thread').lower()
+BCRYPT_WORKERS = int(getenv('BCRYPT_WORKERS', '0'))  # 0 = número de núcleos
 
 
 ENVIRONMENT = getenv('ENVIRONMENT', 'development')  # production, staging, development
@@ -22,4 +30,57 @@ DATABASE_URL = getenv('DATABASE_URL','sqlite:///./data/loja.db')
 
 # Configurações de pool (para PostgreSQL/MySQL)
 DB_POOL_SIZE = int(getenv('DB_POOL_SIZE', '10'))
-DB_MAX_OVERFLOW = int(getenv('DB_MAX_OVERFLOW', '20'))
\ No newline at end of file
+DB_MAX_OVERFLOW = int(getenv('DB_MAX_OVERFLOW', '20'))
+DB_POOL_TIMEOUT = float(getenv('DB_POOL_TIMEOUT', '30'))  # segundos esperando conexão livre
+DB_POOL_RECYCLE = int(getenv('DB_POOL_RECYCLE', '3600'))  # segundos até reabrir a conexão
+DB_POOL_LIFO = getenv('DB_POOL_LIFO', 'False').lower() == 'true'
+DB_PRE_PING = getenv('DB_PRE_PING', 'checkout').lower()  # checkout, ocioso ou desligado
+DB_PRE_PING_OCIOSO = float(getenv('DB_PRE_PING_OCIOSO', '30'))  # segundos parada antes do ping (modo ocioso)
+DB_PGBOUNCER = getenv('DB_PGBOUNCER', 'False').lower() == 'true'  # PgBouncer em transaction pooling
+DB_AQUECER = int(getenv('DB_AQUECER', '0'))  # conexões abertas no startup
+
+# Réplicas de leitura (URLs separadas por vírgula; vazio = tudo no primário)
+DB_REPLICA_URLS = [url.strip() for url in getenv('DB_REPLICA_URLS', '').split(',') if url.strip()]
+DB_REPLICA_QUARENTENA = float(getenv('DB_REPLICA_QUARENTENA', '30'))  # segundos fora após erro de conexão
+DB_REPLICA_LEITURA_PROPRIA = float(getenv('DB_REPLICA_LEITURA_PROPRIA', '5'))  # segundos no primário após escrever
+
+# SQLite: perfil de PRAGMAs (desempenho: WAL, synchronous=NORMAL, cache/mmap, temp_store em memória).
+# Opt-in: com synchronous=NORMAL os últimos commits podem se perder numa queda de energia
+DB_SQLITE_PERFIL = getenv('DB_SQLITE_PERFIL', 'padrao').lower()  # padrao ou desempenho
+DB_SQLITE_BUSY_TIMEOUT = int(getenv('DB_SQLITE_BUSY_TIMEOUT', '5000'))  # ms esperando a trava de escrita
+DB_SQLITE_CACHE_KB = int(getenv('DB_SQLITE_CACHE_KB', '65536'))  # cache de páginas por conexão
+DB_SQLITE_MMAP_MB = int(getenv('DB_SQLITE_MMAP_MB', '256'))
+# Transações de escrita com BEGIN IMMEDIATE (evita o deadlock no upgrade da trava de leitura)
+DB_SQLITE_BEGIN_IMMEDIATE = getenv('DB_SQLITE_BEGIN_IMMEDIATE', 'False').lower() == 'true'
+
+# Cache em processo de nome/categoria/valor/ativo dos produtos (estoque nunca é cacheado)
+PRODUTO_CACHE_TAMANHO = int(getenv('PRODUTO_CACHE_TAMANHO', '10000'))  # 0 desativa o cache
+PRODUTO_CACHE_TTL = float(getenv('PRODUTO_CACHE_TTL', '300'))  # segundos
+PRODUTO_CACHE_SINCRONIZACAO = float(getenv('PRODUTO_CACHE_SINCRONIZACAO', '1'))  # segundos entre leituras de versão
+
+# /ready responde 503 quando a fração do pool em uso chega a este valor
+DB_PRONTIDAO_SATURACAO = float(getenv('DB_PRONTIDAO_SATURACAO', '0.9'))
+
+# Threads que executam as rotas síncronas (cada uma usa no máximo uma conexão do pool)
+API_THREADPOOL_TAMANHO = int(getenv('API_THREADPOOL_TAMANHO', str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+
+# Instrumentação SQL (sempre ligada): contagem e tempo por requisição (Server-Timing),
+# log de queries lentas e histogramas por fingerprint
+SLOW_QUERY_THRESHOLD = float(getenv('SLOW_QUERY_THRESHOLD', '0.5'))  # segundos
+SQL_AMOSTRAGEM = float(getenv('SQL_AMOSTRAGEM', '0.1'))  # fração dos statements nos histogramas
+SQL_HISTOGRAMA_JANELA = float(getenv('SQL_HISTOGRAMA_JANELA', '300'))  # segundos
+
+# /metrics (Prometheus): com vários workers, cada processo grava seu snapshot em METRICAS_DIR
+# a cada METRICAS_INTERVALO segundos e o /metrics soma todos (vazio = só o processo atual)
+METRICAS_DIR = getenv('METRICAS_DIR', '')
+METRICAS_INTERVALO = float(getenv('METRICAS_INTERVALO', '5'))
+
+# Modo assíncrono do banco (AsyncSession: asyncpg no PostgreSQL, aiosqlite no SQLite)
+DB_ASYNC = getenv('DB_ASYNC', 'False').lower() == 'true'
+
+# Expiração de reservas e carrinhos (workers em background)
+EXPIRACAO_WORKER_ATIVO = getenv('EXPIRACAO_WORKER_ATIVO', 'True').lower() == 'true'
+RESERVA_EXPIRACAO_INTERVALO = float(getenv('RESERVA_EXPIRACAO_INTERVALO', '60'))
+RESERVA_EXPIRACAO_LOTE = int(getenv('RESERVA_EXPIRACAO_LOTE', '500'))
+CARRINHO_EXPIRACAO_INTERVALO = float(getenv('CARRINHO_EXPIRACAO_INTERVALO', '60'))
+CARRINHO_EXPIRACAO_LOTE = int(getenv('CARRINHO_EXPIRACAO_LOTE', '200'))
@@ -126,6 +126,11 @@ class AuthController:
                 self.auth_log.warning(f"Tentativa de login com senha incorreta: {username}")
                 return False, "Credenciais inválidas", None
 
+            # Custo do bcrypt mudou desde o cadastro: refaz o hash com a senha recém-validada
+            if self.password_handler.precisa_rehash(usuario.senha_hash):
+                usuario.senha_hash = self.password_handler.hash_password(senha)
+                self.auth_log.info(f"Hash de senha atualizado para o custo atual: {username}")
+
             # Atualizar último acesso
             usuario.ultimo_acesso = datetime.utcnow()
             db.commit()
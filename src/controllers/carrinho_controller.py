@@ -1,54 +1,66 @@
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import and_, select, update
 from sqlalchemy.orm import Session
-from src.database.models import Carrinho, ItemCarrinho, Produtos
+from src.database.models import Carrinho, ItemCarrinho, Reserva
+from src.database.cache_produtos import obter_produto
+from src.database.carregamento import CARRINHO_COM_ITENS, CARRINHO_COM_PRODUTOS
+from src.database.configuracao import marcar_escrita
 from src.controllers.estoque_controller import EstoqueController
+from src.services.metricas import CARRINHOS_CRIADOS, RESERVAS_EXPIRADAS
 from src.utils.logKit.config_logging import get_logger
 
 
 class CarrinhoController:
     """Controller para gerenciar carrinhos de compras persistidos"""
 
-    def __init__(self):
+    def __init__(self, estoque_controller: Optional[EstoqueController] = None):
         self.carrinho_log = get_logger("LoggerCarrinhoController", "DEBUG")
-        self.estoque_controller = EstoqueController()
+        self.estoque_controller = estoque_controller or EstoqueController()
 
-    def _limpar_carrinhos_expirados(self, db: Session) -> int:
+    @staticmethod
+    def _somar_subtotal(carrinho: Carrinho, novo, anterior=0) -> None:
         """
-        Marca carrinhos expirados e libera reservas
+        Soma a variação do subtotal de um item no próprio UPDATE do carrinho
+        (subtotal = subtotal + novo - anterior)
 
-        Returns:
-            Quantidade de carrinhos expirados
+        Não percorre `carrinho.itens` (lazy='raise'; e a coleção carregada antes
+        de um `db.add(item)` não teria o item novo). Atômico no banco, sem SELECT extra.
         """
-        try:
-            agora = datetime.now()
+        carrinho.subtotal = Carrinho.subtotal + (Decimal(str(novo)) - Decimal(str(anterior)))
 
-            carrinhos_expirados = db.query(Carrinho).filter(Carrinho.status == 'ATIVO',
-                                                            Carrinho.expira_em < agora).all()
+    def expirar_carrinhos_em_lote(self, db: Session, carrinho_ids: List[int]) -> Tuple[int, int, int]:
+        """
+        Marca carrinhos como EXPIRADO e libera suas reservas (sem commit)
 
-            count = 0
-            for carrinho in carrinhos_expirados:
+        As reservas ativas dos donos dos carrinhos para os produtos dos itens
+        são liberadas de uma vez via EstoqueController.liberar_reservas_em_lote.
 
-                for item in carrinho.itens:
-                    self.estoque_controller.liberar_reserva(db=db, produto_id=item.produto_id,
-                                                            usuario_id=carrinho.usuario_id)
-                carrinho.status = 'EXPIRADO'
-                count += 1
+        Returns:
+            (carrinhos_expirados, reservas_liberadas, unidades_liberadas)
+        """
+        if not carrinho_ids:
+            return 0, 0, 0
 
-                self.carrinho_log.info(
-                    f"Carrinho expirado: ID {carrinho.id_carrinho} - "
-                    f"Usuário {carrinho.usuario_id}"
-                )
+        reserva_ids = db.execute(
+            select(Reserva.id_reserva).distinct()
+            .join(ItemCarrinho, ItemCarrinho.produto_id == Reserva.produto_id)
+            .join(Carrinho, and_(Carrinho.id_carrinho == ItemCarrinho.carrinho_id,
+                                 Carrinho.usuario_id == Reserva.usuario_id))
+            .where(Carrinho.id_carrinho.in_(carrinho_ids), Reserva.ativa == True)
+        ).scalars().all()
 
-            if count > 0:
-                db.commit()
+        liberado = self.estoque_controller.liberar_reservas_em_lote(db, list(reserva_ids))
 
-            return count
+        resultado = db.execute(
+            update(Carrinho)
+            .where(Carrinho.id_carrinho.in_(carrinho_ids), Carrinho.status == 'ATIVO')
+            .values(status='EXPIRADO', atualizado_em=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
 
-        except Exception:
-            db.rollback()
-            self.carrinho_log.exception("Erro ao limpar carrinhos expirados")
-            return 0
+        return resultado.rowcount, len(reserva_ids), sum(liberado.values())
 
     def obter_ou_criar_carrinho(
             self, db: Session, usuario_id: int) -> Tuple[bool, Carrinho, str]:
@@ -63,11 +75,17 @@ class CarrinhoController:
             (novo: bool, carrinho: Carrinho, mensagem: str)
         """
         try:
-
-            self._limpar_carrinhos_expirados(db)
-
             carrinho = db.query(Carrinho).filter(Carrinho.usuario_id == usuario_id, Carrinho.status == 'ATIVO').first()
 
+            if carrinho and carrinho.expirou:
+                # Expira só o carrinho deste usuário; a varredura global fica com o worker
+                carrinho_id = carrinho.id_carrinho
+                _, reservas, _ = self.expirar_carrinhos_em_lote(db, [carrinho_id])
+                db.commit()
+                RESERVAS_EXPIRADAS.inc(reservas)
+                self.carrinho_log.info(f"Carrinho expirado: ID {carrinho_id} - Usuário {usuario_id}")
+                carrinho = None
+
             if carrinho:
                 carrinho.renovar_expiracao()
                 db.commit()
@@ -79,6 +97,7 @@ class CarrinhoController:
 
             db.add(carrinho)
             db.commit()
+            CARRINHOS_CRIADOS.inc()
             db.refresh(carrinho)
 
             self.carrinho_log.info(f"Novo carrinho criado: ID {carrinho.id_carrinho} para usuário {usuario_id}")
@@ -95,20 +114,22 @@ class CarrinhoController:
 
         Fluxo:
         1. Obter/criar carrinho ativo
-        2. Verificar se produto existe e está ativo
-        3. Reservar estoque
+        2. Verificar se produto existe e está ativo (cache de atributos)
+        3. Reservar estoque (atômico: falha se não houver saldo)
         4. Adicionar ao carrinho (ou atualizar quantidade se já existe)
         5. Recalcular subtotal
         """
+        marcar_escrita(db)
         try:
             if quantidade <= 0:
                 return False, "Quantidade deve ser maior que zero"
 
             novo, carrinho, msg = self.obter_ou_criar_carrinho(db, usuario_id)
 
-            produto = db.query(Produtos).filter(Produtos.codigo == produto_id, Produtos.ativo == True).first()
+            # Nome/valor/ativo vêm do cache; o saldo é decidido pelo UPDATE da reserva
+            produto = obter_produto(db, produto_id)
 
-            if not produto:
+            if not produto or not produto.ativo:
                 return False, "Produto não encontrado ou desativado"
 
             item_existente = db.query(ItemCarrinho).filter(ItemCarrinho.carrinho_id == carrinho.id_carrinho,
@@ -117,37 +138,31 @@ class CarrinhoController:
             if item_existente:
                 nova_quantidade = item_existente.quantidade + quantidade
 
-                disponivel, _ = self.estoque_controller.verificar_disponibilidade(db, produto_id, quantidade, usuario_id)
-
-                if not disponivel:
-                    return False, "Estoque insuficiente para adicionar esta quantidade"
-
+                # Reserva atômica: checa saldo e reserva no mesmo UPDATE
                 sucesso, _ = self.estoque_controller.reservar_estoque(db, produto_id, quantidade, usuario_id)
 
                 if not sucesso:
-                    return False, "Não foi possível reservar o estoque"
+                    return False, "Estoque insuficiente para adicionar esta quantidade"
 
+                subtotal_anterior = item_existente.subtotal
                 item_existente.quantidade = nova_quantidade
                 item_existente.calcular_subtotal()
+                diferenca = (item_existente.subtotal, subtotal_anterior)
 
                 self.carrinho_log.info(
                     f"Quantidade atualizada no carrinho: Produto {produto_id} - "
                     f"Nova quantidade: {nova_quantidade}")
             else:
 
-                disponivel, _ = self.estoque_controller.verificar_disponibilidade(db, produto_id, quantidade, usuario_id)
-
-                if not disponivel:
-                    return False, "Estoque insuficiente"
-
                 sucesso, _ = self.estoque_controller.reservar_estoque(db, produto_id, quantidade, usuario_id)
 
                 if not sucesso:
-                    return False, "Não foi possível reservar o estoque"
+                    return False, "Estoque insuficiente"
 
                 item = ItemCarrinho(carrinho_id=carrinho.id_carrinho, produto_id=produto_id, quantidade=quantidade,
                                     preco_unitario=produto.valor)
                 item.calcular_subtotal()
+                diferenca = (item.subtotal, 0)
 
                 db.add(item)
 
@@ -156,7 +171,7 @@ class CarrinhoController:
                     f"Quantidade: {quantidade}"
                 )
 
-            carrinho.calcular_subtotal()
+            self._somar_subtotal(carrinho, *diferenca)
             carrinho.renovar_expiracao()
 
             db.commit()
@@ -170,6 +185,7 @@ class CarrinhoController:
 
     def remover_item(self, db: Session, usuario_id: int, produto_id: int) -> Tuple[bool, str]:
         """Remove item do carrinho e libera reserva"""
+        marcar_escrita(db)
         try:
 
             carrinho = db.query(Carrinho).filter(Carrinho.usuario_id == usuario_id, Carrinho.status == 'ATIVO').first()
@@ -183,10 +199,11 @@ class CarrinhoController:
             if not item:
                 return False, "Item não encontrado no carrinho"
 
+            subtotal_item = item.subtotal
             self.estoque_controller.liberar_reserva(db=db, produto_id=produto_id, usuario_id=usuario_id)
 
             db.delete(item)
-            carrinho.calcular_subtotal()
+            self._somar_subtotal(carrinho, 0, subtotal_item)
             carrinho.renovar_expiracao()
 
             db.commit()
@@ -205,6 +222,7 @@ class CarrinhoController:
     def alterar_quantidade(self, db: Session, usuario_id: int, produto_id: int, nova_quantidade: int
                            ) -> Tuple[bool, str]:
         """Altera quantidade de um item no carrinho"""
+        marcar_escrita(db)
         try:
             if nova_quantidade <= 0:
                 return False, "Quantidade deve ser maior que zero"
@@ -235,10 +253,11 @@ class CarrinhoController:
 
                 self.estoque_controller.reservar_estoque(db, produto_id, nova_quantidade, usuario_id)
 
+            subtotal_anterior = item.subtotal
             item.quantidade = nova_quantidade
             item.calcular_subtotal()
 
-            carrinho.calcular_subtotal()
+            self._somar_subtotal(carrinho, item.subtotal, subtotal_anterior)
             carrinho.renovar_expiracao()
 
             db.commit()
@@ -253,9 +272,9 @@ class CarrinhoController:
     def obter_carrinho(self, db: Session, usuario_id: int) -> Optional[Carrinho]:
         """Retorna carrinho ativo do usuário"""
         try:
-            self._limpar_carrinhos_expirados(db)
-
-            carrinho = db.query(Carrinho).filter(Carrinho.usuario_id == usuario_id, Carrinho.status == 'ATIVO').first()
+            carrinho = db.query(Carrinho).options(*CARRINHO_COM_PRODUTOS).filter(
+                Carrinho.usuario_id == usuario_id, Carrinho.status == 'ATIVO', Carrinho.expira_em >= datetime.now()
+            ).first()
 
             return carrinho
 
@@ -265,8 +284,10 @@ class CarrinhoController:
 
     def limpar_carrinho(self, db: Session, usuario_id: int) -> Tuple[bool, str]:
         """Limpa carrinho (cancela e libera todas as reservas)"""
+        marcar_escrita(db)
         try:
-            carrinho = db.query(Carrinho).filter(Carrinho.usuario_id == usuario_id, Carrinho.status == 'ATIVO').first()
+            carrinho = db.query(Carrinho).options(*CARRINHO_COM_ITENS).filter(
+                Carrinho.usuario_id == usuario_id, Carrinho.status == 'ATIVO').first()
 
             if not carrinho:
                 return True, "Carrinho já estava vazio"
@@ -1,8 +1,10 @@
 from typing import Optional
 from datetime import datetime
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from src.database import Clientes
+from src.database.replicas import somente_leitura
 from src.utils import validar_cpf, maior_idade
 from src.utils.logKit import get_logger
 
@@ -115,11 +117,36 @@ class ClienteController:
             self.cliente_log.exception("Erro ao desativar cliente")
             return "Erro interno ao desativar cliente"
 
-    def listar_clientes(self, db: Session):
-        """Listar todos os cliente ativos"""
+    @somente_leitura
+    def listar_clientes(self, db: Session, limite: Optional[int] = None, apos_id: Optional[int] = None,
+                        pular: int = 0):
+        """
+        Listar clientes ativos em ordem de id
+
+        A página é montada no banco (índice ativo + id_cliente). Com `apos_id`
+        (keyset) o custo depende só do tamanho da página; `pular` (offset)
+        continua disponível, mas o banco ainda percorre as linhas puladas.
+
+        Args:
+            limite: Tamanho da página (None = todos)
+            apos_id: Retorna só clientes com id maior que este (cursor)
+            pular: Registros a pular antes da página
+        """
 
         try:
-            cliente = db.query(Clientes).filter(Clientes.ativo == True).all()
+            query = db.query(Clientes).filter(Clientes.ativo == True)
+
+            if apos_id is not None:
+                query = query.filter(Clientes.id_cliente > apos_id)
+
+            query = query.order_by(Clientes.id_cliente)
+
+            if pular:
+                query = query.offset(pular)
+            if limite is not None:
+                query = query.limit(limite)
+
+            cliente = query.all()
 
             if not cliente:
                 return  "Sem clientes cadastrados"
@@ -127,4 +154,14 @@ class ClienteController:
             return cliente
         except Exception:
             self.cliente_log.exception("Erro ao listar clientes")
-            return "Erro interno ao listar clientes"
\ No newline at end of file
+            return "Erro interno ao listar clientes"
+
+    @somente_leitura
+    def contar_clientes(self, db: Session) -> Optional[int]:
+        """Total de clientes ativos (percorre o índice inteiro: use só quando precisar do total)"""
+
+        try:
+            return db.query(func.count(Clientes.id_cliente)).filter(Clientes.ativo == True).scalar()
+        except Exception:
+            self.cliente_log.exception("Erro ao contar clientes")
+            return None
@@ -1,57 +1,64 @@
 from datetime import datetime, timedelta
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, Dict
+from sqlalchemy import case, func, insert, select, update
 from sqlalchemy.orm import Session
 from src.utils.logKit.config_logging import get_logger
 from src.database import Produtos, MovimentacaoEstoque, Reserva
+from src.database.cache_produtos import obter_produto
+from src.services.metricas import RESERVAS_CRIADAS
 
 
 class EstoqueController:
     def __init__(self):
         self.estoque_log = get_logger("LoggerEstoqueController", "DEBUG")
 
-    def _limpar_reservas_expiradas(self, db: Session) -> int:
+    def liberar_reservas_em_lote(self, db: Session, reserva_ids: List[int]) -> Dict[int, int]:
         """
-        Remove reservas expiradas do banco
+        Libera um lote de reservas com operações set-based (sem commit)
 
-        Returns:
-            Quantidade de reservas limpas
-        """
-        try:
-            agora = datetime.now()
-
-            reservas_expiradas = db.query(Reserva).filter(Reserva.ativa == True, Reserva.expira_em < agora).all()
-
-            count = 0
-            for reserva in reservas_expiradas:
-
-                produto = db.query(Produtos).filter(Produtos.codigo == reserva.produto_id).first()
-
-                if produto:
-                    produto.quantidade_reservada -= reserva.quantidade
-
-                    # Garantir que não fique negativo
-                    if produto.quantidade_reservada < 0:
-                        produto.quantidade_reservada = 0
-
-                # Marcar reserva como inativa
-                reserva.ativa = False
-                count += 1
+        Desativa as reservas com um único UPDATE e devolve as quantidades aos
+        produtos com um único UPDATE agrupado por produto.
 
-                self.estoque_log.info(
-                    f"Reserva expirada: Produto {reserva.produto_id} - "
-                    f"{reserva.quantidade} unidades liberadas (User: {reserva.usuario_id})"
-                )
-
-            if count > 0:
-                db.commit()
-                self.estoque_log.info(f"{count} reservas expiradas limpas")
-
-            return count
+        Args:
+            db: Sessão do banco
+            reserva_ids: IDs das reservas a liberar
 
-        except Exception as e:
-            db.rollback()
-            self.estoque_log.exception("Erro ao limpar reservas expiradas")
-            return 0
+        Returns:
+            Dicionário {produto_id: quantidade_liberada}
+        """
+        if not reserva_ids:
+            return {}
+
+        por_produto = dict(
+            db.execute(
+                select(Reserva.produto_id, func.sum(Reserva.quantidade))
+                .where(Reserva.id_reserva.in_(reserva_ids), Reserva.ativa == True)
+                .group_by(Reserva.produto_id)
+            ).all()
+        )
+
+        if not por_produto:
+            return {}
+
+        db.execute(
+            update(Reserva)
+            .where(Reserva.id_reserva.in_(reserva_ids), Reserva.ativa == True)
+            .values(ativa=False)
+            .execution_options(synchronize_session=False)
+        )
+
+        liberado = case(por_produto, value=Produtos.codigo, else_=0)
+        db.execute(
+            update(Produtos)
+            .where(Produtos.codigo.in_(list(por_produto)))
+            .values(quantidade_reservada=case(
+                (Produtos.quantidade_reservada > liberado, Produtos.quantidade_reservada - liberado),
+                else_=0
+            ))
+            .execution_options(synchronize_session=False)
+        )
+
+        return {int(produto_id): int(quantidade) for produto_id, quantidade in por_produto.items()}
 
     def repor_estoque(self, db: Session, id_item: int, qtd: int, usuario_id: Optional[int] = None) -> str:
         """Adiciona quantidade ao estoque"""
@@ -97,9 +104,9 @@ class EstoqueController:
         """Verifica se produto esta habilitado"""
         try:
 
-            produto = db.query(Produtos).filter(Produtos.codigo == id_produto, Produtos.ativo == True).first()
+            produto = obter_produto(db, id_produto)
 
-            if not produto:
+            if not produto or not produto.ativo:
                 self.estoque_log.warning(f"Produto: {id_produto} não localizado")
                 return False, "Produto não localizado ou não habilitado"
 
@@ -118,50 +125,75 @@ class EstoqueController:
             (disponível: bool, quantidade_disponivel: int)
         """
         try:
-            self._limpar_reservas_expiradas(db)
+            # Só o saldo (nunca cacheado), sem carregar o produto inteiro
+            quantidade_disponivel = db.execute(
+                select(Produtos.quantidade_estoque - Produtos.quantidade_reservada)
+                .where(Produtos.codigo == produto_id)
+            ).scalar_one_or_none()
 
-            produto = db.query(Produtos).filter(Produtos.codigo == produto_id).first()
-
-            if not produto:
+            if quantidade_disponivel is None:
                 self.estoque_log.warning(f"Produto não localizado em estoque")
                 return False, 0
 
-            quantidade_disponivel = produto.quantidade_estoque - produto.quantidade_reservada
-            self.estoque_log.info(f"Produto verificado: {produto.nome} Usuario:{usuario} ")
+            self.estoque_log.info(f"Produto verificado: {produto_id} Usuario:{usuario} ")
             return quantidade_disponivel >= quantidade, quantidade_disponivel
 
         except Exception:
             return False, 0
 
+    def _incrementar_reservado(self, db: Session, produto_id: int, quantidade: int) -> bool:
+        """
+        Soma `quantidade` em quantidade_reservada somente se houver saldo livre
+
+        UPDATE condicional (WHERE estoque - reservado >= quantidade): a checagem
+        e o incremento acontecem no mesmo comando, sem janela para overselling.
+        Com RETURNING é um único round trip; sem RETURNING a linha é travada
+        com SELECT ... FOR UPDATE e o resultado vem do rowcount.
+
+        Returns:
+            True se a quantidade foi reservada
+        """
+        condicional = (
+            update(Produtos)
+            .where(Produtos.codigo == produto_id,
+                   Produtos.quantidade_estoque - Produtos.quantidade_reservada >= quantidade)
+            .values(quantidade_reservada=Produtos.quantidade_reservada + quantidade)
+            .execution_options(synchronize_session=False)
+        )
+
+        if db.get_bind().dialect.update_returning:
+            return db.execute(condicional.returning(Produtos.codigo)).first() is not None
+
+        db.execute(select(Produtos.codigo).where(Produtos.codigo == produto_id).with_for_update())
+        return db.execute(condicional).rowcount == 1
+
     def reservar_estoque(self, db: Session, produto_id: int, quantidade: int, usuario_id: int,
                          minutos_expiracao: int = 30) -> Tuple[bool, Optional[int]]:
         """
         Reserva estoque temporariamente (para carrinho)
         Reserva expira em 30 minutos
+
+        A reserva é atômica: ver `_incrementar_reservado`
         """
         try:
 
             if quantidade <= 0:
                 self.estoque_log.warning("Quantidade inválida para reserva")
-                return False
-
-            self._limpar_reservas_expiradas(db)
-
-            produto = db.query(Produtos).filter(Produtos.codigo == produto_id).first()
-
-            if not produto:
-                self.estoque_log.warning(f"Produto: {produto_id} não encotrado")
                 return False, None
 
-            estoque_real = produto.quantidade_estoque
-            reservado = produto.quantidade_reservada
-            disponivel = estoque_real - reservado
-
-            if disponivel < quantidade:
-                self.estoque_log.warning(
-                    f"Reserva negada: Produto {produto_id} - "
-                    f"Solicitado: {quantidade}, Disponível: {disponivel}"
-                )
+            if not self._incrementar_reservado(db, produto_id, quantidade):
+                saldo = db.execute(
+                    select(Produtos.quantidade_estoque - Produtos.quantidade_reservada)
+                    .where(Produtos.codigo == produto_id)
+                ).scalar_one_or_none()
+
+                if saldo is None:
+                    self.estoque_log.warning(f"Produto: {produto_id} não encotrado")
+                else:
+                    self.estoque_log.warning(
+                        f"Reserva negada: Produto {produto_id} - "
+                        f"Solicitado: {quantidade}, Disponível: {saldo}"
+                    )
                 return False, None
 
             expira_em = datetime.now() + timedelta(minutes=minutos_expiracao)
@@ -172,21 +204,23 @@ class EstoqueController:
                 quantidade=quantidade,
                 expira_em=expira_em
             )
-            produto.quantidade_reservada += quantidade
 
             db.add(reserva)
+            db.flush()
+            reserva_id = reserva.id_reserva
             db.commit()
-            db.refresh(reserva)
+            RESERVAS_CRIADAS.inc()
 
             self.estoque_log.info(
                 f"Reserva criada: {quantidade} unidades do produto {produto_id} "
-                f"para usuário {usuario_id} (ID Reserva: {reserva.id_reserva}, "
+                f"para usuário {usuario_id} (ID Reserva: {reserva_id}, "
                 f"expira em {minutos_expiracao}min)"
             )
 
-            return True, reserva.id_reserva
+            return True, reserva_id
 
         except Exception as e:
+            db.rollback()
             self.estoque_log.exception(f"Erro ao reservar produto {produto_id}")
             return False, None
 
@@ -342,6 +376,101 @@ class EstoqueController:
             self.estoque_log.exception("Erro ao realizar saída de estoque")
             return False, f'Erro: {e}'
 
+    def baixar_estoque_em_lote(self, db: Session, quantidades: Dict[int, int], usuario_id: int,
+                               venda_id: Optional[int] = None) -> Tuple[bool, str, Dict[int, str]]:
+        """
+        Baixa de estoque de vários produtos numa única unidade de trabalho (sem commit)
+
+        Versão em lote de `saida_estoque` usada no checkout:
+        1. Lê (e trava) todos os produtos num único SELECT ... FOR UPDATE
+        2. Um UPDATE condicional para todos os produtos (estoque e reservado)
+        3. Um UPDATE desativando as reservas do usuário para esses produtos
+        4. Um INSERT em lote das movimentações
+
+        O commit (ou rollback) fica com quem chama.
+
+        Args:
+            db: Sessão do banco
+            quantidades: {produto_id: quantidade}
+            usuario_id: ID do usuário
+            venda_id: ID da venda (para as movimentações)
+
+        Returns:
+            (sucesso: bool, mensagem: str, nomes: {produto_id: nome})
+        """
+        if not quantidades:
+            return False, "Nenhum produto informado", {}
+
+        produto_ids = list(quantidades)
+        produtos = db.execute(
+            select(Produtos.codigo, Produtos.nome, Produtos.quantidade_estoque)
+            .where(Produtos.codigo.in_(produto_ids))
+            .with_for_update()
+        ).all()
+
+        estoques = {codigo: estoque for codigo, _, estoque in produtos}
+        nomes = {codigo: nome for codigo, nome, _ in produtos}
+
+        faltantes = [pid for pid in produto_ids if pid not in estoques]
+        if faltantes:
+            return False, f"Produto não encontrado: {faltantes[0]}", {}
+
+        insuficientes = [pid for pid in produto_ids if estoques[pid] < quantidades[pid]]
+        if insuficientes:
+            pid = insuficientes[0]
+            self.estoque_log.error(
+                f"ERRO CRÍTICO: Estoque insuficiente! "
+                f"Produto: {nomes[pid]} (ID: {pid}), "
+                f"Estoque: {estoques[pid]}, Solicitado: {quantidades[pid]}"
+            )
+            return False, "Estoque insuficiente", {}
+
+        quantidade = case(quantidades, value=Produtos.codigo, else_=0)
+        resultado = db.execute(
+            update(Produtos)
+            .where(Produtos.codigo.in_(produto_ids), Produtos.quantidade_estoque >= quantidade)
+            .values(
+                quantidade_estoque=Produtos.quantidade_estoque - quantidade,
+                quantidade_reservada=case(
+                    (Produtos.quantidade_reservada >= quantidade, Produtos.quantidade_reservada - quantidade),
+                    else_=0
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        if resultado.rowcount != len(produto_ids):
+            # Outro checkout consumiu o estoque entre a leitura e o UPDATE
+            return False, "Estoque insuficiente", {}
+
+        db.execute(
+            update(Reserva)
+            .where(Reserva.usuario_id == usuario_id, Reserva.produto_id.in_(produto_ids), Reserva.ativa == True)
+            .values(ativa=False)
+            .execution_options(synchronize_session=False)
+        )
+
+        db.execute(insert(MovimentacaoEstoque), [
+            {
+                "produto_id": pid,
+                "tipo": 'SAIDA',
+                "quantidade": -qtd,
+                "estoque_anterior": estoques[pid],
+                "estoque_posterior": estoques[pid] - qtd,
+                "usuario_id": usuario_id,
+                "venda_id": venda_id,
+                "observacao": f"Venda finalizada (ID: {venda_id})",
+            }
+            for pid, qtd in quantidades.items()
+        ])
+
+        self.estoque_log.info(
+            f"Saída de estoque em lote: {len(produto_ids)} produtos, "
+            f"{sum(quantidades.values())} unidades (Venda: {venda_id})"
+        )
+
+        return True, f"Saída realizada: {len(produto_ids)} produtos", nomes
+
     def obter_reservas_usuario(self, db: Session, usuario_id: int) -> List[Reserva]:
         """
         Retorna todas as reservas ativas de um usuário
@@ -352,10 +481,9 @@ class EstoqueController:
         - Limpar carrinho
         """
         try:
-            # Limpar expiradas primeiro
-            self._limpar_reservas_expiradas(db)
-
-            reservas = db.query(Reserva).filter(Reserva.usuario_id == usuario_id, Reserva.ativa == True).order_by(
+            # Reservas vencidas ainda não varridas pelo worker de expiração ficam de fora
+            reservas = db.query(Reserva).filter(Reserva.usuario_id == usuario_id, Reserva.ativa == True,
+                                                Reserva.expira_em >= datetime.now()).order_by(
                 Reserva.data_criacao.desc()).all()
 
             return reservas
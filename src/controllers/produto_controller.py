@@ -1,5 +1,9 @@
-from typing import List
+from typing import List, Optional, Sequence
+from sqlalchemy import Row, select
 from src.database import Produtos
+from src.database.busca import COLUNAS_PRODUTO, colunas_produto, indexar_produto, pesquisar, remover_produto
+from src.database.cache_produtos import invalidar_produto, registrar_alteracao
+from src.database.replicas import somente_leitura
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from src.utils.logKit.config_logging import get_logger
@@ -35,6 +39,8 @@ class ProdutoController:
                 vlr_compra=vlr_compra
             )
             db.add(produto)
+            db.flush()
+            indexar_produto(db, produto)
             db.commit()
             db.refresh(produto)
             self.produto_log.info(f"Produto: {nome} cadastrado com sucesso")
@@ -77,7 +83,10 @@ class ProdutoController:
             for key, valor in kwargs.items():
                 setattr(produto, key, valor)
 
+            indexar_produto(db, produto)
+            registrar_alteracao(db, id_produto)
             db.commit()
+            invalidar_produto(db, id_produto)
 
             self.produto_log.info(f"Produto {id_produto} editado: {kwargs} com sucesso")
             return "Produto editado com sucesso"
@@ -86,41 +95,55 @@ class ProdutoController:
             self.produto_log.exception(f'Erro ao editar produto {id_produto}')
             return f"Erro interno ao editar produto"
 
-    def busca_produto(self, db: Session, coluna: str, dado_busca: str) -> str | List:
-        """Busca produtos por coluna"""
-        try:
-            if coluna == 'nome':
-                produtos = db.query(Produtos).filter(
-                    Produtos.nome == dado_busca,
-                    Produtos.ativo == True
-                ).all()
-            elif coluna == 'modelo':
-                produtos = db.query(Produtos).filter(
-                    Produtos.modelo == dado_busca,
-                    Produtos.ativo == True
-                ).all()
-            elif coluna == 'categoria':
-                produtos = db.query(Produtos).filter(
-                    Produtos.categoria == dado_busca,
-                    Produtos.ativo == True
-                ).all()
-            else:
-                return "Coluna não localizada"
+    def _listar(self, db: Session, filtro, limite: Optional[int], pular: int,
+                campos: Optional[Sequence[str]], apos_codigo: Optional[int]) -> List[Row]:
+        """
+        Projeção só das colunas pedidas (sem carregar o ORM), produtos ativos em ordem de código
 
-            if not produtos:
-                return "Dado não localizado"
+        Com `apos_codigo` (keyset) o custo depende só do tamanho da página;
+        `pular` (offset) continua disponível, mas o banco percorre as linhas puladas.
+        """
+        consulta = select(*colunas_produto(campos)).where(filtro, Produtos.ativo.is_(True))
+        if apos_codigo is not None:
+            consulta = consulta.where(Produtos.codigo > apos_codigo)
+        consulta = consulta.order_by(Produtos.codigo).offset(pular).limit(limite)
+        return db.execute(consulta).all()
+
+    @somente_leitura
+    def busca_produto(self, db: Session, coluna: str, dado_busca: str, limite: Optional[int] = None,
+                      pular: int = 0, campos: Optional[Sequence[str]] = None,
+                      apos_codigo: Optional[int] = None) -> str | List[Row]:
+        """
+        Busca produtos ativos por igualdade em nome, modelo ou categoria
 
-            resultado = [
-                f"ID:{p.codigo} | Produto: {p.nome} | Modelo {p.modelo} | Estoque: {p.quantidade_estoque} | Valor: {p.valor}"
-                for p in produtos
-            ]
+        Retorna linhas com as colunas de `campos` (todas de COLUNAS_PRODUTO se
+        vazio); lista vazia se nada casar. `apos_codigo`: só códigos maiores (cursor).
+        """
+        try:
+            if coluna not in ('nome', 'modelo', 'categoria'):
+                return "Coluna não localizada"
 
-            return resultado
+            return self._listar(db, COLUNAS_PRODUTO[coluna] == dado_busca, limite, pular, campos, apos_codigo)
 
         except Exception as e:
             self.produto_log.exception(f"Erro ao buscar dado '{dado_busca}'")
             return f'Erro ao buscar: {e}'
 
+    @somente_leitura
+    def pesquisar_produtos(self, db: Session, termo: str, limite: int = 20, pular: int = 0,
+                           campos: Optional[Sequence[str]] = None) -> str | List[Row]:
+        """
+        Busca por prefixo em nome, modelo e categoria, sem acento e por relevância
+
+        Ver src/database/busca.py. Retorna linhas com as colunas de `campos` mais
+        `relevancia`; lista vazia se nada casar.
+        """
+        try:
+            return pesquisar(db, termo, limite, pular, campos)
+        except Exception:
+            self.produto_log.exception(f"Erro ao pesquisar produtos: '{termo}'")
+            return "Erro interno ao pesquisar produtos"
+
     def desabilitar_produto(self, db: Session, idbusca: int) -> str:
         """Desativa produto (soft delete)"""
         try:
@@ -130,7 +153,10 @@ class ProdutoController:
                 return "Produto não localizado"
 
             produto.ativo = False
+            remover_produto(db, idbusca)
+            registrar_alteracao(db, idbusca)
             db.commit()
+            invalidar_produto(db, idbusca)
             self.produto_log.info(f"Produto {idbusca} ({produto.nome}) desativado")
             return "Produto desativado com sucesso"
 
@@ -139,28 +165,22 @@ class ProdutoController:
             self.produto_log.exception(f"Erro ao deletar produto: {idbusca}")
             return f'Falha ao desativar: {e}'
 
-    def filtro_categoria(self, db: Session, categoria: str) -> str:
-        """Filtra produtos por categoria"""
+    @somente_leitura
+    def filtro_categoria(self, db: Session, categoria: str, limite: Optional[int] = None, pular: int = 0,
+                         campos: Optional[Sequence[str]] = None,
+                         apos_codigo: Optional[int] = None) -> str | List[Row]:
+        """Filtra produtos ativos por categoria (mesma projeção de `busca_produto`)"""
         try:
-            produtos = db.query(Produtos).filter(Produtos.categoria == categoria, Produtos.ativo.is_(True)).all()
-
-            if not produtos:
-                return f"Nenhum produto encontrado na categoria: {categoria}"
-
-            resultado = [
-                f"Produto: {p.nome} | Modelo: {p.modelo} | "
-                f"Categoria: {p.categoria} | Valor: R$ {p.valor:.2f} | "
-                f"Estoque: {p.quantidade_estoque}"
-                for p in produtos
-            ]
+            produtos = self._listar(db, Produtos.categoria == categoria, limite, pular, campos, apos_codigo)
 
-            self.produto_log.info(f"Encontrados {len(resultado)} produtos")
-            return "\n".join(resultado)
+            self.produto_log.info(f"Encontrados {len(produtos)} produtos")
+            return produtos
 
         except Exception as e:
             self.produto_log.warning("Erro ao filtrar categoria")
             return f'Erro ao filtrar: {e}'
 
+    @somente_leitura
     def contar_produtos(self, db: Session) -> int:
         try:
             qtd_produtos = db.query(Produtos).filter(Produtos.ativo.is_(True)).count()
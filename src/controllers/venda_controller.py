@@ -1,18 +1,24 @@
 from typing import Optional, Tuple
 from datetime import datetime
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from src.database.models import (Vendas, ItemVenda, Carrinho, Clientes, Produtos, MovimentacaoEstoque)
+from src.database.carregamento import CARRINHO_COM_ITENS, VENDA_COM_ITENS
+from src.database.configuracao import marcar_escrita
+from src.database.replicas import somente_leitura
 from src.controllers.estoque_controller import EstoqueController
 from src.controllers.carrinho_controller import CarrinhoController
+from src.services.metricas import VENDAS_FINALIZADAS
 from src.utils.logKit.config_logging import get_logger
 
 
 class VendaController:
-    def __init__(self):
+    def __init__(self, estoque_controller: Optional[EstoqueController] = None,
+                 carrinho_controller: Optional[CarrinhoController] = None):
         self.vendas_log = get_logger("LoggerVendasController", "DEBUG")
-        self.estoque_controller = EstoqueController()
-        self.carrinho_controller = CarrinhoController()
+        self.estoque_controller = estoque_controller or EstoqueController()
+        self.carrinho_controller = carrinho_controller or CarrinhoController(self.estoque_controller)
 
     def adicionar_item_carrinho(self, db: Session, usuario_id: int, produto_id: int, quantidade: int) -> Tuple[
         bool, str]:
@@ -59,10 +65,10 @@ class VendaController:
                3. Criar Venda
                4. Converter itens do carrinho em itens de venda
                5. Aplicar desconto (se houver)
-               6. Dar baixa no estoque
-               7. Registrar movimentações
+               6. Dar baixa no estoque (UPDATE único para todos os produtos)
+               7. Registrar itens e movimentações (INSERTs em lote)
                8. Marcar carrinho como FINALIZADO
-               9. Commit da transação
+               9. Commit único da transação (rollback em qualquer falha)
 
                Args:
                    db: Sessão do banco
@@ -74,9 +80,11 @@ class VendaController:
                Returns:
                    (sucesso: bool, mensagem: str, dados_venda: dict | None)
                """
+        marcar_escrita(db)
         try:
             # 1. Buscar carrinho ativo
-            carrinho = db.query(Carrinho).filter(Carrinho.usuario_id == usuario_id, Carrinho.status == 'ATIVO').first()
+            carrinho = db.query(Carrinho).options(*CARRINHO_COM_ITENS).filter(
+                Carrinho.usuario_id == usuario_id, Carrinho.status == 'ATIVO').first()
 
             if not carrinho:
                 self.vendas_log.warning(f"Carrinho vazio para usuário {usuario_id}")
@@ -102,9 +110,9 @@ class VendaController:
                 cliente_id = cliente.id_cliente
 
             from src.database.models import Usuarios
-            vendedor = db.query(Usuarios).filter(Usuarios.id_usuario == usuario_id).first()
-
-            vendedor_nome = vendedor.username if vendedor else None
+            vendedor_nome = db.execute(
+                select(Usuarios.username).where(Usuarios.id_usuario == usuario_id)
+            ).scalar_one_or_none()
 
             subtotal = float(carrinho.subtotal)
 
@@ -122,39 +130,32 @@ class VendaController:
             db.add(venda)
             db.flush()
 
-            for item_carrinho in carrinho.itens:
-                item_venda = ItemVenda(id_venda=venda.id_venda, produto_id=item_carrinho.produto_id,
-                                       nome_produto=item_carrinho.produto.nome, quantidade=item_carrinho.quantidade,
-                                       preco_unitario=item_carrinho.preco_unitario, subtotal=item_carrinho.subtotal
-                                       )
-
-                db.add(item_venda)
+            itens = list(carrinho.itens)
+            quantidades = {item.produto_id: item.quantidade for item in itens}
 
-                sucesso, msg_estoque = self.estoque_controller.saida_estoque(db=db, id_produto=item_carrinho.produto_id,
-                                                                             quantidade=item_carrinho.quantidade,
-                                                                             usuario_id=usuario_id,
-                                                                             venda_id=venda.id_venda
-                                                                             )
+            sucesso, msg_estoque, nomes = self.estoque_controller.baixar_estoque_em_lote(
+                db=db, quantidades=quantidades, usuario_id=usuario_id, venda_id=venda.id_venda
+            )
 
-                if not sucesso:
-                    db.rollback()
-                    self.vendas_log.error(
-                        f"Erro na baixa de estoque: Produto {item_carrinho.produto_id} - {msg_estoque}"
-                    )
-                    return False, f"Erro no estoque: {msg_estoque}", None
+            if not sucesso:
+                db.rollback()
+                self.vendas_log.error(f"Erro na baixa de estoque: {msg_estoque}")
+                return False, f"Erro no estoque: {msg_estoque}", None
+
+            db.execute(insert(ItemVenda), [
+                {
+                    "id_venda": venda.id_venda,
+                    "produto_id": item.produto_id,
+                    "nome_produto": nomes[item.produto_id],
+                    "quantidade": item.quantidade,
+                    "preco_unitario": item.preco_unitario,
+                    "subtotal": item.subtotal,
+                }
+                for item in itens
+            ])
 
             carrinho.status = 'FINALIZADO'
 
-            db.commit()
-            db.refresh(venda)
-
-            self.vendas_log.info(
-                f"Venda finalizada: ID {venda.id_venda} - "
-                f"Vendedor: {vendedor_nome} (ID: {usuario_id}) - "
-                f"Total: R$ {venda.total:.2f} - "
-                f"Itens: {len(carrinho.itens)}"
-            )
-
             venda_dados = {
                 "id_venda": venda.id_venda,
                 "total": float(venda.total),
@@ -163,10 +164,20 @@ class VendaController:
                 "forma_pagamento": venda.forma_pagamento,
                 "data_hora": venda.data_hora.isoformat(),
                 "vendedor_nome": venda.vendedor_nome,
-                "total_itens": len(carrinho.itens)
+                "total_itens": len(itens)
             }
 
-            return True, f"Venda finalizada com sucesso! ID: {venda.id_venda}", venda_dados
+            db.commit()
+            VENDAS_FINALIZADAS.inc()
+
+            self.vendas_log.info(
+                f"Venda finalizada: ID {venda_dados['id_venda']} - "
+                f"Vendedor: {vendedor_nome} (ID: {usuario_id}) - "
+                f"Total: R$ {venda_dados['total']:.2f} - "
+                f"Itens: {len(itens)}"
+            )
+
+            return True, f"Venda finalizada com sucesso! ID: {venda_dados['id_venda']}", venda_dados
 
         except IntegrityError as ie:
             db.rollback()
@@ -186,7 +197,7 @@ class VendaController:
             Venda com itens carregados ou None
         """
         try:
-            venda = db.query(Vendas).filter(
+            venda = db.query(Vendas).options(*VENDA_COM_ITENS).filter(
                 Vendas.id_venda == id_venda
             ).first()
 
@@ -211,9 +222,10 @@ class VendaController:
         Returns:
             (sucesso: bool, mensagem: str)
         """
+        marcar_escrita(db)
         try:
             # Buscar venda
-            venda = db.query(Vendas).filter(Vendas.id_venda == id_venda).first()
+            venda = db.query(Vendas).options(*VENDA_COM_ITENS).filter(Vendas.id_venda == id_venda).first()
 
             if not venda:
                 return False, "Venda não encontrada"
@@ -259,6 +271,7 @@ class VendaController:
             self.vendas_log.exception(f"Erro ao cancelar venda {id_venda}")
             return False, f"Erro: {e}"
 
+    @somente_leitura
     def listar_vendas(self, db: Session, vendedor_id: Optional[int] = None, cliente_id: Optional[int] = None,
                       data_inicio: Optional[datetime] = None, data_fim: Optional[datetime] = None,
                       limite: int = 100) -> list:
@@ -299,6 +312,7 @@ class VendaController:
             self.vendas_log.exception("Erro ao listar vendas")
             return []
 
+    @somente_leitura
     def obter_estatisticas_vendas(self, db: Session, vendedor_id: Optional[int] = None,
                                   data_inicio: Optional[datetime] = None, data_fim: Optional[datetime] = None) -> dict:
         """
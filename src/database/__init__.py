@@ -2,7 +2,7 @@
 Exporta os componentes principais do módulo database
 """
 
-from src.database.connection import engine, get_db
+from src.database.connection import engine, get_db, get_async_db, get_sessao, executar_db
 from src.database.session import SessionLocal
 from src.database.models import (
     Base,
@@ -19,6 +19,9 @@ from src.database.models import (
 __all__ = [
     'engine',
     'get_db',
+    'get_async_db',
+    'get_sessao',
+    'executar_db',
     'SessionLocal',
     'Base',
     'Usuarios',
@@ -0,0 +1,157 @@
+"""
+Busca de produtos por prefixo, sem acento e ordenada por relevância
+
+Cada palavra digitada casa com o início de uma palavra do nome, modelo ou
+categoria ("note del" acha "Notebook Dell"); acentos e maiúsculas são
+ignorados dos dois lados. Nome pesa mais que modelo, que pesa mais que
+categoria. Só produtos ativos aparecem.
+
+- PostgreSQL: índices GIN de expressão declarados em models.py (tsvector
+  ponderado + trigramas do nome, que também acha trechos no meio da
+  palavra). O próprio banco os mantém: a sincronização abaixo não faz nada.
+- SQLite: tabela FTS5 `produtos_busca` (rowid = codigo). O ProdutoController
+  chama `indexar_produto` no cadastro/edição e `remover_produto` na
+  desativação, na mesma transação. Carga direta na tabela produtos
+  (scripts, fixtures, migração): `reconstruir_indice`.
+
+Usage:
+    itens = pesquisar(db, "note dell", limite=20, pular=0)
+"""
+
+import re
+import unicodedata
+
+from typing import Optional, Sequence
+
+from sqlalchemy import Float, Row, cast, column, delete, func, insert, literal_column, select, table, text
+from sqlalchemy.orm import Session
+
+from src.database.models import DOCUMENTO_BUSCA, NOME_SEM_ACENTO, Produtos
+
+# Palavras consideradas por busca (o resto é ignorado)
+MAX_TERMOS = 8
+
+# Pesos do bm25 no SQLite, na ordem das colunas (nome, modelo, categoria)
+PESOS_FTS = (10.0, 4.0, 1.0)
+
+PRODUTOS_BUSCA = table("produtos_busca", column("rowid"), column("nome"), column("modelo"), column("categoria"))
+
+_PALAVRA = re.compile(r"[^\W_]+")
+
+# Colunas que buscas e listagens de produto podem projetar (`campos`), na ordem da resposta.
+# valor sai como float (formato da API), sem criar Decimal por linha; o CAST é no banco
+# porque o SQLite devolve int para valores inteiros de NUMERIC.
+COLUNAS_PRODUTO = {
+    "codigo": Produtos.codigo,
+    "nome": Produtos.nome,
+    "modelo": Produtos.modelo,
+    "categoria": Produtos.categoria,
+    "valor": cast(Produtos.valor, Float).label("valor"),
+    "quantidade_estoque": Produtos.quantidade_estoque,
+}
+
+
+def colunas_produto(campos: Optional[Sequence[str]] = None) -> list:
+    """Colunas da projeção (todas se `campos` vazio). KeyError para campo desconhecido"""
+    return [COLUNAS_PRODUTO[campo] for campo in campos] if campos else list(COLUNAS_PRODUTO.values())
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculo e sem acento ("Eletrônicos" -> "eletronicos")"""
+    decomposto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def termos(texto: str) -> list[str]:
+    """Palavras normalizadas da busca; pontuação e aspas viram separador"""
+    return _PALAVRA.findall(normalizar(texto))[:MAX_TERMOS]
+
+
+def _dialeto(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+# ==================== Sincronização (SQLite) ====================
+
+def indexar_produto(db: Session, produto: Produtos) -> None:
+    """(Re)indexa o produto; inativo sai do índice. Não faz commit"""
+    if _dialeto(db) != "sqlite":
+        return
+    remover_produto(db, produto.codigo)
+    if produto.ativo is not False:
+        db.execute(insert(PRODUTOS_BUSCA).values(rowid=produto.codigo, nome=produto.nome,
+                                                 modelo=produto.modelo or "", categoria=produto.categoria))
+
+
+def remover_produto(db: Session, codigo: int) -> None:
+    if _dialeto(db) != "sqlite":
+        return
+    db.execute(delete(PRODUTOS_BUSCA).where(PRODUTOS_BUSCA.c.rowid == codigo))
+
+
+def reconstruir_indice(db: Session) -> int:
+    """Refaz o índice a partir da tabela produtos. Retorna produtos indexados (não faz commit)"""
+    if _dialeto(db) != "sqlite":
+        return 0
+    db.execute(delete(PRODUTOS_BUSCA))
+    resultado = db.execute(insert(PRODUTOS_BUSCA).from_select(
+        ["rowid", "nome", "modelo", "categoria"],
+        select(Produtos.codigo, Produtos.nome, func.coalesce(Produtos.modelo, ""), Produtos.categoria)
+        .where(Produtos.ativo.is_(True))))
+    # Junta os segmentos do FTS5 depois de carga grande
+    db.execute(text("INSERT INTO produtos_busca(produtos_busca) VALUES ('optimize')"))
+    return resultado.rowcount
+
+
+# ==================== Consulta ====================
+
+def _consulta_sqlite(palavras: list[str], colunas: list, limite: int, pular: int):
+    fts = literal_column("produtos_busca")
+    consulta = " ".join(f'"{palavra}"*' for palavra in palavras)
+    rank = func.bm25(fts, *PESOS_FTS)  # menor = mais relevante
+
+    # Ordena e pagina só dentro do FTS5; o join com produtos pega as 20 linhas da página
+    pagina = (select(PRODUTOS_BUSCA.c.rowid, rank.label("rank"))
+              .where(fts.op("MATCH")(consulta))
+              .order_by(rank, PRODUTOS_BUSCA.c.rowid)
+              .limit(limite).offset(pular)
+              .subquery())
+
+    return (select(*colunas, (-pagina.c.rank).label("relevancia"))
+            .join_from(pagina, Produtos, Produtos.codigo == pagina.c.rowid)
+            .where(Produtos.ativo.is_(True))
+            .order_by(pagina.c.rank, Produtos.codigo))
+
+
+def _consulta_postgres(palavras: list[str], colunas: list, limite: int, pular: int):
+    consulta = func.to_tsquery(literal_column("'simple'::regconfig"),
+                               " & ".join(f"{palavra}:*" for palavra in palavras))
+    frase = " ".join(palavras)
+    # Trecho no meio do nome ("book" em "notebook") pelo índice de trigramas
+    trecho = NOME_SEM_ACENTO.like(f"%{frase}%")
+    relevancia = func.ts_rank(DOCUMENTO_BUSCA, consulta) + func.similarity(NOME_SEM_ACENTO, frase)
+
+    return (select(*colunas, relevancia.label("relevancia"))
+            .where(DOCUMENTO_BUSCA.op("@@")(consulta) | trecho, Produtos.ativo.is_(True))
+            .order_by(relevancia.desc(), Produtos.codigo)
+            .limit(limite).offset(pular))
+
+
+def consulta_busca(dialeto: str, texto: str, limite: int = 20, pular: int = 0,
+                   campos: Optional[Sequence[str]] = None):
+    """SELECT paginado da busca para o dialeto (None: nada a buscar)"""
+    palavras = termos(texto)
+    if not palavras:
+        return None
+    if dialeto == "postgresql":
+        return _consulta_postgres(palavras, colunas_produto(campos), limite, pular)
+    return _consulta_sqlite(palavras, colunas_produto(campos), limite, pular)
+
+
+def pesquisar(db: Session, texto: str, limite: int = 20, pular: int = 0,
+              campos: Optional[Sequence[str]] = None) -> list[Row]:
+    """Produtos ativos que casam com a busca, mais relevantes primeiro (colunas de `campos` + relevancia)"""
+    consulta = consulta_busca(_dialeto(db), texto, limite, pular, campos)
+    if consulta is None:
+        return []
+    return db.execute(consulta).all()
@@ -0,0 +1,207 @@
+"""
+Cache em processo dos atributos de produto (read-through, LRU + TTL)
+
+Guarda só nome, categoria, valor e ativo: o que carrinho e estoque
+consultam a cada item e quase nunca muda. Estoque e reservas NUNCA passam
+por aqui (mudam a cada venda e são decididos por UPDATE condicional).
+
+Invalidação por versão (tabela produtos_versao, compartilhada entre workers):
+- `editar_produto`/`desabilitar_produto` chamam `registrar_alteracao` na
+  transação da alteração e `invalidar` depois do commit (mesmo processo:
+  efeito imediato).
+- Os outros workers, no máximo a cada PRODUTO_CACHE_SINCRONIZACAO segundos,
+  leem as versões maiores que a última vista e descartam esses produtos.
+  Uma consulta por intervalo por processo, não por requisição.
+- TTL (PRODUTO_CACHE_TTL) limita o resto: alteração feita fora dos
+  controllers (SQL manual, outro sistema) aparece no máximo depois dele.
+
+Um cache por engine (bancos diferentes não compartilham entradas).
+
+Usage:
+    produto = obter_produto(db, produto_id)
+    if produto is None or not produto.ativo:
+        ...
+"""
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Callable, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from src.config import PRODUTO_CACHE_SINCRONIZACAO, PRODUTO_CACHE_TAMANHO, PRODUTO_CACHE_TTL
+from src.database.models import ProdutoVersao, Produtos
+from src.services.metricas import registro
+
+CONSULTAS_CACHE = registro.contador(
+    "product_cache_lookups_total", "Consultas ao cache de produtos", ("resultado",))
+INVALIDACOES_CACHE = registro.contador(
+    "product_cache_invalidations_total", "Entradas descartadas do cache de produtos", ("origem",))
+
+# Linha de produtos_versao com o contador global
+VERSAO_GLOBAL = 0
+
+
+@dataclass(frozen=True)
+class AtributosProduto:
+    codigo: int
+    nome: str
+    categoria: str
+    valor: Decimal
+    ativo: bool
+
+
+class CacheProdutos:
+    """LRU com TTL dos atributos de produto, sincronizado pela tabela produtos_versao"""
+
+    def __init__(self, tamanho: int = PRODUTO_CACHE_TAMANHO, ttl: float = PRODUTO_CACHE_TTL,
+                 sincronizacao: float = PRODUTO_CACHE_SINCRONIZACAO,
+                 relogio: Callable[[], float] = time.monotonic) -> None:
+        self.tamanho = tamanho
+        self.ttl = ttl
+        self.sincronizacao = sincronizacao
+        self._relogio = relogio
+        self._entradas: OrderedDict[int, tuple[float, AtributosProduto]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._versao_vista: Optional[int] = None
+        self._proxima_sincronizacao = 0.0
+        # Incrementado a cada invalidação: um miss só guarda o que leu se nada
+        # foi invalidado durante a leitura (senão guardaria o valor antigo até o TTL)
+        self._invalidacoes = 0
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def obter(self, db: Session, produto_id: int) -> Optional[AtributosProduto]:
+        """Atributos do produto (None se não existe); vai ao banco só no miss"""
+        if self.tamanho <= 0:
+            return self._carregar(db, produto_id)
+
+        self._sincronizar(db)
+        agora = self._relogio()
+        with self._lock:
+            entrada = self._entradas.get(produto_id)
+            if entrada is not None:
+                if entrada[0] > agora:
+                    self._entradas.move_to_end(produto_id)
+                    CONSULTAS_CACHE.inc(resultado="hit")
+                    return entrada[1]
+                del self._entradas[produto_id]
+                INVALIDACOES_CACHE.inc(origem="ttl")
+
+        CONSULTAS_CACHE.inc(resultado="miss")
+        with self._lock:
+            geracao = self._invalidacoes
+        atributos = self._carregar(db, produto_id)
+        if atributos is not None:
+            with self._lock:
+                if self._invalidacoes != geracao:
+                    return atributos
+                self._entradas[produto_id] = (agora + self.ttl, atributos)
+                self._entradas.move_to_end(produto_id)
+                while len(self._entradas) > self.tamanho:
+                    self._entradas.popitem(last=False)
+        return atributos
+
+    @staticmethod
+    def _carregar(db: Session, produto_id: int) -> Optional[AtributosProduto]:
+        linha = db.execute(
+            select(Produtos.codigo, Produtos.nome, Produtos.categoria, Produtos.valor, Produtos.ativo)
+            .where(Produtos.codigo == produto_id)
+        ).first()
+        return AtributosProduto(*linha) if linha is not None else None
+
+    def invalidar(self, produto_id: int, origem: str = "local") -> None:
+        with self._lock:
+            self._invalidacoes += 1
+            if self._entradas.pop(produto_id, None) is not None:
+                INVALIDACOES_CACHE.inc(origem=origem)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._invalidacoes += 1
+            self._entradas.clear()
+            self._versao_vista = None
+
+    def _sincronizar(self, db: Session) -> None:
+        """Descarta produtos alterados por outros workers desde a última versão vista"""
+        agora = self._relogio()
+        with self._lock:
+            if agora < self._proxima_sincronizacao:
+                return
+            # Uma thread por intervalo; as outras seguem com o que está no cache
+            self._proxima_sincronizacao = agora + self.sincronizacao
+            vista = self._versao_vista
+
+        if vista is None:
+            atual = db.execute(
+                select(ProdutoVersao.versao).where(ProdutoVersao.produto_id == VERSAO_GLOBAL)
+            ).scalar_one_or_none() or 0
+            with self._lock:
+                # Versões anteriores ao início do cache não importam: tudo foi lido depois delas
+                self._versao_vista = atual if self._versao_vista is None else self._versao_vista
+            return
+
+        alterados = db.execute(
+            select(ProdutoVersao.produto_id, ProdutoVersao.versao).where(ProdutoVersao.versao > vista)
+        ).all()
+        if not alterados:
+            return
+        for produto_id, _ in alterados:
+            if produto_id != VERSAO_GLOBAL:
+                self.invalidar(produto_id, origem="versao")
+        with self._lock:
+            self._versao_vista = max(self._versao_vista or 0, max(versao for _, versao in alterados))
+
+
+_caches: "weakref.WeakKeyDictionary[Engine, CacheProdutos]" = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def cache_para(db: Session) -> CacheProdutos:
+    """Cache do banco da sessão (criado no primeiro uso)"""
+    engine = db.get_bind()
+    engine = getattr(engine, "engine", engine)  # sessão ligada a uma Connection
+    cache = _caches.get(engine)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.setdefault(engine, CacheProdutos())
+    return cache
+
+
+def obter_produto(db: Session, produto_id: int) -> Optional[AtributosProduto]:
+    return cache_para(db).obter(db, produto_id)
+
+
+def registrar_alteracao(db: Session, produto_id: int) -> int:
+    """
+    Incrementa a versão do produto na transação da alteração (não faz commit)
+
+    O UPDATE no contador global trava a linha até o commit: as versões ficam
+    na mesma ordem dos commits e nenhum worker pula uma alteração.
+    """
+    db.execute(update(ProdutoVersao).where(ProdutoVersao.produto_id == VERSAO_GLOBAL)
+               .values(versao=ProdutoVersao.versao + 1))
+    versao = db.execute(
+        select(ProdutoVersao.versao).where(ProdutoVersao.produto_id == VERSAO_GLOBAL)
+    ).scalar_one()
+
+    if db.execute(update(ProdutoVersao).where(ProdutoVersao.produto_id == produto_id)
+                  .values(versao=versao)).rowcount == 0:
+        db.execute(insert(ProdutoVersao).values(produto_id=produto_id, versao=versao))
+    return versao
+
+
+def invalidar_produto(db: Session, produto_id: int) -> None:
+    """Descarta o produto do cache deste processo (chamar depois do commit)"""
+    cache_para(db).invalidar(produto_id)
+
+
+registro.medidor("product_cache_entries", "Produtos no cache em processo",
+                 funcao=lambda: {(): sum(len(cache) for cache in list(_caches.values()))})
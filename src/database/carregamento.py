@@ -0,0 +1,30 @@
+"""
+Estratégias de carregamento de relacionamentos por consulta
+
+Todos os relacionamentos são `lazy='raise'` nos models: nenhum é carregado
+por acidente (N+1 vira erro em vez de consulta silenciosa). Cada método de
+controller declara aqui o que precisa e passa para `.options(...)`;
+relacionamento fora das opções continua levantando ao ser acessado.
+
+Uso:
+    db.query(Carrinho).options(*CARRINHO_COM_PRODUTOS).filter(...).first()
+"""
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from src.database.models import Carrinho, ItemCarrinho, Vendas
+
+# Carrinho + itens + produto de cada item (nome na listagem do carrinho)
+CARRINHO_COM_PRODUTOS = (
+    selectinload(Carrinho.itens).joinedload(ItemCarrinho.produto),
+)
+
+# Carrinho + itens na mesma consulta (subtotal ao alterar o carrinho, checkout e limpeza)
+CARRINHO_COM_ITENS = (
+    joinedload(Carrinho.itens),
+)
+
+# Venda + itens (detalhe e cancelamento de venda)
+VENDA_COM_ITENS = (
+    selectinload(Vendas.itens),
+)
@@ -0,0 +1,285 @@
+"""
+Configuração do engine e do pool de conexões
+
+Toda a construção do engine (síncrono e assíncrono) passa por
+`ConfiguracaoEngine`, lida do ambiente em `ConfiguracaoEngine.do_ambiente()`:
+
+- pool_size / max_overflow / pool_timeout / pool_recycle
+- pool_lifo: reusa a conexão devolvida por último; as ociosas no fundo da
+  fila podem ser fechadas pelo servidor/proxy sem afetar o tráfego
+- pre_ping:
+    - "checkout": SELECT 1 a cada checkout (pool_pre_ping do SQLAlchemy)
+    - "ocioso": SELECT 1 só se a conexão ficou parada mais que `pre_ping_ocioso` segundos
+    - "desligado": sem ping (conexões quebradas só aparecem no primeiro erro)
+- pgbouncer: compatível com PgBouncer em transaction pooling (asyncpg sem
+  cache de prepared statements e com nomes únicos)
+- aquecer: conexões abertas no startup (`aquecer_pool`), para o primeiro
+  pico não pagar o handshake
+
+SQLite (`configurar_sqlite`, aplicado em toda conexão nova):
+
+- sqlite_perfil "desempenho": WAL (leitores não bloqueiam o escritor),
+  synchronous=NORMAL (fsync só no checkpoint, seguro com WAL), busy_timeout,
+  cache_size/mmap_size e temp_store=MEMORY; "padrao" (o default) só liga
+  foreign_keys. O perfil desempenho é opt-in: com synchronous=NORMAL os
+  últimos commits podem se perder numa queda de energia
+- sqlite_begin_immediate: transações de escrita abrem com BEGIN IMMEDIATE.
+  O BEGIN fica adiado até o primeiro statement: se for escrita, ou se a
+  sessão foi marcada com `marcar_escrita` (lê antes de escrever), a trava de
+  escrita é pega já no início. Sem isso o pysqlite só abre a transação no
+  primeiro INSERT/UPDATE: o SELECT anterior roda fora dela e dois checkouts
+  simultâneos podem gravar a partir da mesma leitura
+"""
+
+import time
+from dataclasses import dataclass, replace
+from uuid import uuid4
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool, QueuePool
+
+from src.config import (DATABASE_URL, DB_AQUECER, DB_MAX_OVERFLOW, DB_PGBOUNCER, DB_POOL_LIFO, DB_POOL_RECYCLE,
+                        DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_PRE_PING, DB_PRE_PING_OCIOSO, DB_SQLITE_BEGIN_IMMEDIATE,
+                        DB_SQLITE_BUSY_TIMEOUT, DB_SQLITE_CACHE_KB, DB_SQLITE_MMAP_MB, DB_SQLITE_PERFIL, DEBUG,
+                        ENVIRONMENT)
+from src.database.instrumentacao import QueuePoolMedido
+
+PRE_PING_ESTRATEGIAS = ("checkout", "ocioso", "desligado")
+PERFIS_SQLITE = ("padrao", "desempenho")
+# Primeira palavra dos statements que escrevem (decide BEGIN IMMEDIATE)
+_ESCRITAS = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+@dataclass(frozen=True)
+class ConfiguracaoEngine:
+    """Parâmetros do engine e do pool (ver docstring do módulo)"""
+    url: str
+    pool_size: int = 10
+    max_overflow: int = 20
+    pool_timeout: float = 30
+    pool_recycle: int = 3600
+    pool_lifo: bool = False
+    pre_ping: str = "checkout"
+    pre_ping_ocioso: float = 30
+    pgbouncer: bool = False
+    aquecer: int = 0
+    sem_pool: bool = False
+    echo: bool = False
+    sqlite_perfil: str = "padrao"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_kb: int = 65536
+    sqlite_mmap_mb: int = 256
+    sqlite_begin_immediate: bool = False
+
+    def __post_init__(self):
+        if self.pre_ping not in PRE_PING_ESTRATEGIAS:
+            raise ValueError(f"DB_PRE_PING inválido: {self.pre_ping} (use {', '.join(PRE_PING_ESTRATEGIAS)})")
+        if self.sqlite_perfil not in PERFIS_SQLITE:
+            raise ValueError(f"DB_SQLITE_PERFIL inválido: {self.sqlite_perfil} (use {', '.join(PERFIS_SQLITE)})")
+        if self.pool_size <= 0 or self.max_overflow < 0:
+            raise ValueError("DB_POOL_SIZE deve ser maior que zero e DB_MAX_OVERFLOW não pode ser negativo")
+
+    @classmethod
+    def do_ambiente(cls, url: str = DATABASE_URL) -> "ConfiguracaoEngine":
+        """Configuração a partir de src.config (testing: sem pool, como antes)"""
+        return cls(url=url, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT,
+                   pool_recycle=DB_POOL_RECYCLE, pool_lifo=DB_POOL_LIFO, pre_ping=DB_PRE_PING,
+                   pre_ping_ocioso=DB_PRE_PING_OCIOSO, pgbouncer=DB_PGBOUNCER, aquecer=DB_AQUECER,
+                   sem_pool=ENVIRONMENT == 'testing',
+                   echo=DEBUG and ENVIRONMENT not in ('production', 'testing'), sqlite_perfil=DB_SQLITE_PERFIL,
+                   sqlite_busy_timeout_ms=DB_SQLITE_BUSY_TIMEOUT, sqlite_cache_kb=DB_SQLITE_CACHE_KB,
+                   sqlite_mmap_mb=DB_SQLITE_MMAP_MB, sqlite_begin_immediate=DB_SQLITE_BEGIN_IMMEDIATE)
+
+    def para_url(self, url: str) -> "ConfiguracaoEngine":
+        return replace(self, url=url)
+
+    def usa_fila(self) -> bool:
+        """Se o dialeto usa QueuePool para esta URL (SQLite em memória e aiosqlite não usam)"""
+        url = make_url(self.url)
+        return not self.sem_pool and issubclass(url.get_dialect().get_pool_class(url), QueuePool)
+
+    def argumentos(self, assincrono: bool = False) -> dict:
+        """kwargs de create_engine/create_async_engine"""
+        argumentos = {"echo": self.echo, "pool_pre_ping": self.pre_ping == "checkout"}
+        url = make_url(self.url)
+
+        if self.sem_pool:
+            argumentos["poolclass"] = NullPool
+        elif self.usa_fila():
+            argumentos.update(pool_size=self.pool_size, max_overflow=self.max_overflow,
+                              pool_timeout=self.pool_timeout, pool_recycle=self.pool_recycle,
+                              pool_use_lifo=self.pool_lifo)
+            if not assincrono:
+                # Mede a espera por conexão (db_pool_wait_seconds no /metrics)
+                argumentos["poolclass"] = QueuePoolMedido
+
+        if url.get_backend_name() == "sqlite" and not assincrono:
+            argumentos["connect_args"] = {"check_same_thread": False}
+
+        if self.pgbouncer and url.get_backend_name() == "postgresql":
+            # Transaction pooling: cada transação pode cair numa conexão de servidor diferente,
+            # então prepared statements nomeados (cache do asyncpg) não sobrevivem entre transações
+            if assincrono:
+                argumentos["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0,
+                                              "prepared_statement_name_func": _nome_prepared_statement}
+
+        return argumentos
+
+    def pragmas_sqlite(self) -> list[str]:
+        """PRAGMAs executados em cada conexão SQLite nova"""
+        pragmas = ["PRAGMA foreign_keys=ON"]
+        if self.sqlite_perfil == "desempenho":
+            pragmas += [
+                f"PRAGMA busy_timeout={self.sqlite_busy_timeout_ms}",
+                "PRAGMA journal_mode=WAL",
+                "PRAGMA synchronous=NORMAL",
+                f"PRAGMA cache_size=-{self.sqlite_cache_kb}",
+                f"PRAGMA mmap_size={self.sqlite_mmap_mb * 1024 * 1024}",
+                "PRAGMA temp_store=MEMORY",
+            ]
+        return pragmas
+
+
+def _nome_prepared_statement() -> str:
+    """Nome único: com PgBouncer a numeração do asyncpg (__asyncpg_stmt_N__) colide entre clientes"""
+    return f"__asyncpg_{uuid4().hex}__"
+
+
+def criar_engine(configuracao: ConfiguracaoEngine) -> Engine:
+    engine = create_engine(configuracao.url, **configuracao.argumentos())
+    configurar_pre_ping(engine, configuracao)
+    configurar_sqlite(engine, configuracao)
+    return engine
+
+
+def configurar_pre_ping(engine: Engine, configuracao: ConfiguracaoEngine) -> None:
+    """Estratégia "ocioso": ping no checkout só de conexões paradas há mais de `pre_ping_ocioso` segundos"""
+    if configuracao.pre_ping != "ocioso":
+        return
+
+    limite = configuracao.pre_ping_ocioso
+
+    @event.listens_for(engine, "checkin")
+    def marcar_devolucao(dbapi_connection, connection_record):
+        if connection_record is not None:
+            connection_record.info["devolvida_em"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def ping_se_ociosa(dbapi_connection, connection_record, connection_proxy):
+        devolvida_em = connection_record.info.get("devolvida_em")
+        if devolvida_em is None or time.monotonic() - devolvida_em < limite:
+            return
+        try:
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+            finally:
+                cursor.close()
+        except Exception as erro:
+            # O pool descarta a conexão e tenta outra
+            raise exc.DisconnectionError(f"Conexão ociosa inválida: {erro}") from erro
+
+
+def configurar_sqlite(engine: Engine, configuracao: ConfiguracaoEngine, assincrono: bool = False) -> None:
+    """PRAGMAs do perfil em toda conexão nova e, se ativado, BEGIN IMMEDIATE (só pysqlite)"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = configuracao.pragmas_sqlite()
+
+    @event.listens_for(engine, "connect")
+    def aplicar_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    if configuracao.sqlite_begin_immediate and not assincrono:
+        _configurar_begin_immediate(engine)
+
+
+def _configurar_begin_immediate(engine: Engine) -> None:
+    # Receita do SQLAlchemy para pysqlite: o driver não emite BEGIN sozinho
+    # (isolation_level=None) e o BEGIN é emitido aqui, adiado até o primeiro statement
+    @event.listens_for(engine, "connect")
+    def desligar_begin_do_driver(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def adiar_begin(conn):
+        conn.info["sqlite_begin"] = "BEGIN"  # vira IMMEDIATE em `_propagar_escrita` ou no 1º statement
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def emitir_begin(conn, cursor, statement, parameters, context, executemany):
+        begin = conn.info.pop("sqlite_begin", None)
+        if begin is None:
+            return
+        if begin == "BEGIN" and statement.lstrip()[:7].upper().startswith(_ESCRITAS):
+            begin = "BEGIN IMMEDIATE"
+        cursor.execute(begin)
+
+    @event.listens_for(engine, "commit")
+    @event.listens_for(engine, "rollback")
+    def descartar_begin_pendente(conn):
+        # Transação sem statements: nada foi emitido no banco
+        conn.info.pop("sqlite_begin", None)
+
+
+@event.listens_for(Session, "after_begin")
+def _propagar_escrita(session, transaction, connection):
+    if session.info.get("escrita") and connection.dialect.name == "sqlite" and "sqlite_begin" in connection.info:
+        connection.info["sqlite_begin"] = "BEGIN IMMEDIATE"
+
+
+def marcar_escrita(db: Session) -> None:
+    """
+    Marca a sessão como de escrita: com DB_SQLITE_BEGIN_IMMEDIATE, as transações
+    dela começam com BEGIN IMMEDIATE mesmo quando o primeiro statement é um SELECT
+
+    Sem efeito em outros bancos ou com a opção desligada.
+    """
+    if isinstance(db, Session):
+        db.info["escrita"] = True
+
+
+def aquecer_pool(engine: Engine, conexoes: int) -> int:
+    """
+    Abre até `conexoes` conexões ao mesmo tempo e devolve todas ao pool
+
+    Limitado ao pool_size (overflow é fechado na devolução). Retorna quantas foram abertas.
+    """
+    pool = engine.pool
+    if not isinstance(pool, QueuePool) or conexoes <= 0:
+        return 0
+
+    abertas = []
+    try:
+        for _ in range(min(conexoes, pool.size())):
+            abertas.append(engine.raw_connection())
+    finally:
+        for conexao in abertas:
+            conexao.close()
+    return len(abertas)
+
+
+def estado_pool(engine: Engine) -> dict:
+    """Ocupação do pool para o /ready (QueuePool; outros pools não têm limite a reportar)"""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"tipo": type(pool).__name__}
+
+    capacidade = pool.size() + pool._max_overflow
+    em_uso = pool.checkedout()
+    return {
+        "tipo": type(pool).__name__,
+        "tamanho": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "em_uso": em_uso,
+        "ociosas": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "saturacao": round(em_uso / capacidade, 3) if capacidade > 0 else 0.0,
+    }
@@ -0,0 +1,265 @@
+"""
+Instrumentação SQL sempre ligada
+
+Construída sobre os eventos `before_cursor_execute`/`after_cursor_execute`:
+
+- Por requisição: número de statements e tempo total no banco, acumulados
+  num ContextVar (o middleware de Server-Timing cria e lê o acumulador)
+- Log estruturado de queries lentas (acima de SLOW_QUERY_THRESHOLD), com o
+  fingerprint do statement normalizado
+- Histogramas rolantes por fingerprint, amostrados (SQL_AMOSTRAGEM) para
+  manter o custo limitado
+- Métricas do pool (/metrics): conexões em uso, overflow e espera por conexão
+
+Uso:
+    instrumentar_engine(engine)
+    metricas_sql.snapshot()  # {fingerprint: {"statement", "count", "p50_ms", ...}}
+"""
+
+import hashlib
+import random
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import lru_cache
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+from src.config import SLOW_QUERY_THRESHOLD, SQL_AMOSTRAGEM, SQL_HISTOGRAMA_JANELA
+from src.services.metricas import registro
+from src.utils.logKit import get_logger
+
+sql_log = get_logger("LoggerSQL", "WARNING")
+
+# Limites dos buckets em ms (o último bucket é +inf)
+LIMITES_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+# Fingerprints distintos mantidos; os excedentes caem em OUTROS
+MAX_FINGERPRINTS = 1000
+OUTROS = "outros"
+
+
+# ==================== Por requisição ====================
+
+class EstatisticasRequisicao:
+    """Statements executados e tempo total no banco durante uma requisição"""
+
+    __slots__ = ("consultas", "tempo_db")
+
+    def __init__(self) -> None:
+        self.consultas = 0
+        self.tempo_db = 0.0
+
+
+# Objeto mutável: threads do threadpool (cópia do contexto) acumulam no mesmo acumulador
+estatisticas_requisicao: ContextVar[EstatisticasRequisicao | None] = ContextVar("estatisticas_requisicao",
+                                                                                 default=None)
+
+
+# ==================== Fingerprint ====================
+
+_COMENTARIOS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%\(\w+\)s|%s|(?<!:):\w+|\$\d+|\?")
+_LISTAS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALORES = re.compile(r"(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+")
+_ESPACOS = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> tuple[str, str]:
+    """
+    Normaliza o statement e devolve (id curto, statement normalizado)
+
+    Literais e parâmetros viram `?`, listas `IN (?, ?, ...)` e múltiplas
+    linhas de VALUES colapsam em `(...)`. Cacheado: o SQLAlchemy repete as
+    mesmas strings (os valores vão nos parâmetros).
+    """
+    normalizado = _COMENTARIOS.sub(" ", statement)
+    normalizado = _LITERAIS.sub("?", normalizado)
+    normalizado = _LISTAS.sub("(...)", normalizado)
+    normalizado = _VALORES.sub(r"\1", normalizado)
+    normalizado = _ESPACOS.sub(" ", normalizado).strip()
+    return hashlib.blake2b(normalizado.encode(), digest_size=8).hexdigest(), normalizado
+
+
+# ==================== Histogramas rolantes ====================
+
+class HistogramaRolante:
+    """
+    Histograma de latência numa janela deslizante
+
+    A janela é dividida em `fatias`; cada fatia acumula contagens por bucket
+    e é zerada quando volta a ser usada, então o snapshot cobre só os
+    últimos `janela` segundos (com resolução de janela/fatias).
+    """
+
+    __slots__ = ("largura", "_fatias")
+
+    def __init__(self, janela: float = 300.0, fatias: int = 10) -> None:
+        self.largura = janela / fatias
+        # [índice da fatia no tempo, contagens por bucket, soma em ms]
+        self._fatias = [[-1, [0] * (len(LIMITES_MS) + 1), 0.0] for _ in range(fatias)]
+
+    def registrar(self, duracao_ms: float, agora: float) -> None:
+        indice = int(agora // self.largura)
+        fatia = self._fatias[indice % len(self._fatias)]
+        if fatia[0] != indice:
+            fatia[0] = indice
+            fatia[1] = [0] * (len(LIMITES_MS) + 1)
+            fatia[2] = 0.0
+        fatia[1][bisect_left(LIMITES_MS, duracao_ms)] += 1
+        fatia[2] += duracao_ms
+
+    def resumo(self, agora: float) -> dict:
+        """Contagens agregadas da janela e quantis estimados (limite superior do bucket)"""
+        atual = int(agora // self.largura)
+        buckets = [0] * (len(LIMITES_MS) + 1)
+        soma = 0.0
+        for indice, contagens, soma_fatia in self._fatias:
+            if atual - indice < len(self._fatias):
+                buckets = [a + b for a, b in zip(buckets, contagens)]
+                soma += soma_fatia
+
+        total = sum(buckets)
+        return {"count": total, "sum_ms": soma, "buckets": buckets,
+                "p50_ms": _quantil(buckets, total, 0.50),
+                "p95_ms": _quantil(buckets, total, 0.95),
+                "p99_ms": _quantil(buckets, total, 0.99)}
+
+
+def _quantil(buckets: list[int], total: int, q: float) -> float | None:
+    if not total:
+        return None
+    acumulado = 0
+    for limite, contagem in zip((*LIMITES_MS, float("inf")), buckets):
+        acumulado += contagem
+        if acumulado >= q * total:
+            return limite
+    return float("inf")
+
+
+class MetricasSQL:
+    """Histogramas rolantes por fingerprint (amostrados)"""
+
+    def __init__(self, amostragem: float = SQL_AMOSTRAGEM, janela: float = SQL_HISTOGRAMA_JANELA) -> None:
+        self.amostragem = amostragem
+        self.janela = janela
+        self._histogramas: dict[str, HistogramaRolante] = {}
+        self._statements: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._random = random.random
+
+    def deve_amostrar(self) -> bool:
+        return self.amostragem >= 1 or self._random() < self.amostragem
+
+    def registrar(self, statement: str, duracao: float, agora: float | None = None) -> None:
+        chave, normalizado = fingerprint(statement)
+        agora = time.monotonic() if agora is None else agora
+
+        with self._lock:
+            histograma = self._histogramas.get(chave)
+            if histograma is None:
+                if len(self._histogramas) >= MAX_FINGERPRINTS:
+                    chave, normalizado = OUTROS, OUTROS
+                    histograma = self._histogramas.get(chave)
+                if histograma is None:
+                    histograma = self._histogramas[chave] = HistogramaRolante(self.janela)
+                    self._statements[chave] = normalizado
+            histograma.registrar(duracao * 1000, agora)
+
+    def snapshot(self, agora: float | None = None) -> dict[str, dict]:
+        """Resumo da janela por fingerprint (count é o número de amostras)"""
+        agora = time.monotonic() if agora is None else agora
+        with self._lock:
+            return {chave: {"statement": self._statements[chave], **histograma.resumo(agora)}
+                    for chave, histograma in self._histogramas.items()}
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._histogramas.clear()
+            self._statements.clear()
+
+
+metricas_sql = MetricasSQL()
+
+
+# ==================== Eventos do engine ====================
+
+def antes_de_executar(conn, cursor, statement, params, context, executemany):
+    # Início guardado no ExecutionContext: um por statement, sem pilha em conn.info
+    # para desalinhar quando um statement falha
+    if context is not None:
+        context.inicio_instrumentacao = time.perf_counter()
+
+
+def depois_de_executar(conn, cursor, statement, params, context, executemany):
+    if context is None:
+        return
+    duracao = time.perf_counter() - context.inicio_instrumentacao
+
+    estatisticas = estatisticas_requisicao.get()
+    if estatisticas is not None:
+        estatisticas.consultas += 1
+        estatisticas.tempo_db += duracao
+
+    if duracao > SLOW_QUERY_THRESHOLD:
+        chave, normalizado = fingerprint(statement)
+        sql_log.warning("Query lenta (%.0f ms): %s", duracao * 1000, normalizado[:200],
+                        extra={"fingerprint": chave, "duration_ms": round(duracao * 1000, 3),
+                               "statement": normalizado})
+
+    if metricas_sql.deve_amostrar():
+        metricas_sql.registrar(statement, duracao)
+
+
+def instrumentar_engine(engine) -> None:
+    """Registra os eventos de instrumentação (para AsyncEngine, passar `engine.sync_engine`)"""
+    if not event.contains(engine, "before_cursor_execute", antes_de_executar):
+        event.listen(engine, "before_cursor_execute", antes_de_executar)
+        event.listen(engine, "after_cursor_execute", depois_de_executar)
+
+
+# ==================== Pool de conexões (/metrics) ====================
+
+ESPERA_POOL = registro.histograma(
+    "db_pool_wait_seconds", "Espera por uma conexão do pool (checkout)", ("pool",),
+    limites=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0))
+
+# Pools exportados no /metrics: nome -> pool
+_pools: dict[str, QueuePool] = {}
+
+
+def _estatisticas_pools(leitura: str) -> dict[tuple[str, ...], float]:
+    return {(nome,): getattr(pool, leitura)() for nome, pool in list(_pools.items())}
+
+
+registro.medidor("db_pool_checked_out", "Conexões do pool em uso", ("pool",),
+                 funcao=lambda: _estatisticas_pools("checkedout"))
+registro.medidor("db_pool_overflow", "Conexões de overflow abertas (negativo: pool ainda não cheio)", ("pool",),
+                 funcao=lambda: _estatisticas_pools("overflow"))
+registro.medidor("db_pool_size", "Tamanho configurado do pool", ("pool",),
+                 funcao=lambda: _estatisticas_pools("size"))
+
+
+class QueuePoolMedido(QueuePool):
+    """QueuePool que mede a espera por conexão (`_do_get` é onde o checkout bloqueia)"""
+
+    nome_metrica = "principal"
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            ESPERA_POOL.observar(time.perf_counter() - inicio, pool=self.nome_metrica)
+
+
+def instrumentar_pool(engine, nome: str = "principal") -> None:
+    """Exporta conexões em uso/overflow do pool do engine (só QueuePool e derivados)"""
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        if isinstance(pool, QueuePoolMedido):
+            pool.nome_metrica = nome
+        _pools[nome] = pool
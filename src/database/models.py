@@ -1,5 +1,5 @@
 from sqlalchemy import (Column, Integer, String, Numeric, DateTime, Boolean, CheckConstraint, Index, Text, Date,
-                        ForeignKey, UniqueConstraint)
+                        ForeignKey, UniqueConstraint, DDL, event, func, text)
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.dialects.postgresql import ENUM
 from sqlalchemy.orm import relationship, validates
@@ -53,7 +53,7 @@ class Usuarios(Base):
     data_cadastro = Column(DateTime, default=datetime.now, nullable=False)
     ultimo_acesso = Column(DateTime)
 
-    vendas = relationship('Vendas', back_populates='vendedor', lazy='selectin')
+    vendas = relationship('Vendas', back_populates='vendedor', lazy='raise')
 
     __table_args__ = (
         Index('idx_usuario_ativo_tipo', 'ativo', 'tipo_usuario'),
@@ -98,11 +98,11 @@ class Clientes(Base):
     ativo = Column(Boolean, default=True, nullable=False)
     data_cadastro = Column(DateTime, default=datetime.now, nullable=False)
 
-    vendas = relationship('Vendas', back_populates='cliente', lazy='selectin')
+    vendas = relationship('Vendas', back_populates='cliente', lazy='raise')
 
     __table_args__ = (
         CheckConstraint("LENGTH(cpf) = 11", name='check_cpf_length'),
-        Index('idx_cliente_ativo', 'ativo')
+        Index('idx_cliente_ativo_id', 'ativo', 'id_cliente')  # listagem paginada por id (keyset)
     )
 
     def __repr__(self):
@@ -153,8 +153,9 @@ class Produtos(Base):
     dt_cadastro = Column(DateTime, default=datetime.now, nullable=False)
 
     # Relacionamentos
-    itens_venda = relationship('ItemVenda', back_populates='produto', lazy='selectin')
-    movimentacoes = relationship('MovimentacaoEstoque', back_populates='produto', lazy='selectin')
+    # Histórico cresce sem limite: carregar só sob demanda (ver src/database/carregamento.py)
+    itens_venda = relationship('ItemVenda', back_populates='produto', lazy='raise')
+    movimentacoes = relationship('MovimentacaoEstoque', back_populates='produto', lazy='raise')
 
     # Constraints
     __table_args__ = (
@@ -192,6 +193,71 @@ class Produtos(Base):
         return self.quantidade_estoque < 10
 
 
+# ==================== BUSCA DE PRODUTOS ====================
+# Consultas e sincronização em src/database/busca.py
+
+def sem_acento(coluna):
+    """Texto minúsculo e sem acento no PostgreSQL (f_unaccent é o wrapper IMMUTABLE de unaccent)"""
+    return func.f_unaccent(func.lower(func.coalesce(coluna, text("''"))))
+
+
+# PostgreSQL: documento ponderado (nome > modelo > categoria) e trigramas do nome, mantidos pelo banco.
+# Literais (text) em vez de binds: a expressão da consulta precisa ser igual à do índice.
+DOCUMENTO_BUSCA = (
+    func.setweight(func.to_tsvector(text("'simple'::regconfig"), sem_acento(Produtos.nome)),
+                   text("'A'")).op("||")(
+        func.setweight(func.to_tsvector(text("'simple'::regconfig"), sem_acento(Produtos.modelo)),
+                       text("'B'"))).op("||")(
+        func.setweight(func.to_tsvector(text("'simple'::regconfig"), sem_acento(Produtos.categoria)),
+                       text("'C'")))
+)
+NOME_SEM_ACENTO = sem_acento(Produtos.nome)
+
+Index("idx_produto_busca_documento", DOCUMENTO_BUSCA, postgresql_using="gin").ddl_if(dialect="postgresql")
+Index("idx_produto_busca_nome_trgm", NOME_SEM_ACENTO.label("nome_sem_acento"), postgresql_using="gin",
+      postgresql_ops={"nome_sem_acento": "gin_trgm_ops"}).ddl_if(dialect="postgresql")
+
+for _ddl in (
+        "CREATE EXTENSION IF NOT EXISTS unaccent",
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT "
+        "AS $$ SELECT public.unaccent('public.unaccent', $1) $$"):
+    event.listen(Produtos.__table__, "before_create", DDL(_ddl).execute_if(dialect="postgresql"))
+
+# SQLite: tabela FTS5 (rowid = codigo) mantida pelo ProdutoController; acentos removidos pelo tokenizer
+event.listen(Produtos.__table__, "after_create", DDL(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS produtos_busca USING fts5("
+    "nome, modelo, categoria, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+).execute_if(dialect="sqlite"))
+event.listen(Produtos.__table__, "after_drop",
+             DDL("DROP TABLE IF EXISTS produtos_busca").execute_if(dialect="sqlite"))
+
+
+class ProdutoVersao(Base):
+    """
+    Versão dos atributos cacheados de cada produto (src/database/cache_produtos.py)
+
+    A linha produto_id = 0 é o contador global: cada alteração o incrementa
+    (a trava da linha ordena as alterações) e grava o novo valor na linha do
+    produto. Os workers buscam só as linhas com versão maior que a última vista.
+    """
+    __tablename__ = 'produtos_versao'
+
+    produto_id = Column(Integer, primary_key=True, autoincrement=False)
+    versao = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('idx_produto_versao_versao', 'versao'),
+    )
+
+    def __repr__(self):
+        return f"<ProdutoVersao(produto_id={self.produto_id}, versao={self.versao})>"
+
+
+event.listen(ProdutoVersao.__table__, "after_create",
+             DDL("INSERT INTO produtos_versao (produto_id, versao) VALUES (0, 0)"))
+
+
 class Vendas(Base):
     """
     Tabela de vendas realizadas
@@ -220,9 +286,9 @@ class Vendas(Base):
     vendedor_nome = Column(String(50))
 
     # Relacionamentos
-    cliente = relationship('Clientes', back_populates='vendas')
-    vendedor = relationship('Usuarios', back_populates='vendas')
-    itens = relationship('ItemVenda', back_populates='venda', cascade='all, delete-orphan', lazy='selectin')
+    cliente = relationship('Clientes', back_populates='vendas', lazy='raise')
+    vendedor = relationship('Usuarios', back_populates='vendas', lazy='raise')
+    itens = relationship('ItemVenda', back_populates='venda', cascade='all, delete-orphan', lazy='raise')
 
     # Constraints
     __table_args__ = (
@@ -295,9 +361,9 @@ class Carrinho(Base):
     status = Column(status_carrinho_enum, default='ATIVO', nullable=False, index=True)
 
     # Relacionamentos
-    usuario = relationship("Usuarios")
+    usuario = relationship("Usuarios", lazy='raise')
     itens = relationship("ItemCarrinho", back_populates="carrinho",
-                         cascade="all, delete-orphan", lazy='joined')
+                         cascade="all, delete-orphan", lazy='raise')
 
     __table_args__ = (
         CheckConstraint('subtotal >= 0', name='check_carrinho_subtotal_positivo'),
@@ -354,8 +420,8 @@ class ItemCarrinho(Base):
     preco_unitario = Column(Numeric(10, 2), nullable=False)  # Snapshot do preço
     subtotal = Column(Numeric(10, 2), nullable=False)
     adicionado_em = Column(DateTime, default=datetime.now, nullable=False)
-    carrinho = relationship("Carrinho", back_populates="itens")
-    produto = relationship("Produtos")
+    carrinho = relationship("Carrinho", back_populates="itens", lazy='raise')
+    produto = relationship("Produtos", lazy='raise')
 
     __table_args__ = (
         CheckConstraint('quantidade > 0', name='check_item_quantidade_positiva'),
@@ -396,8 +462,8 @@ class ItemVenda(Base):
     quantidade = Column(Integer, nullable=False)
     preco_unitario = Column(Numeric(10, 2), nullable=False)
     subtotal = Column(Numeric(10, 2), nullable=False)
-    venda = relationship('Vendas', back_populates='itens')
-    produto = relationship('Produtos', back_populates='itens_venda', lazy='selectin')
+    venda = relationship('Vendas', back_populates='itens', lazy='raise')
+    produto = relationship('Produtos', back_populates='itens_venda', lazy='raise')
 
     __table_args__ = (
         CheckConstraint('quantidade > 0', name='check_quantidade_positiva'),
@@ -445,8 +511,8 @@ class Reserva(Base):
     ativa = Column(Boolean, default=True, nullable=False, index=True)
 
     # Relacionamentos
-    produto = relationship('Produtos')
-    usuario = relationship('Usuarios')
+    produto = relationship('Produtos', lazy='raise')
+    usuario = relationship('Usuarios', lazy='raise')
 
     __table_args__ = (
         CheckConstraint('quantidade > 0', name='check_reserva_quantidade_positiva'),
@@ -504,9 +570,9 @@ class MovimentacaoEstoque(Base):
     venda_id = Column(Integer, ForeignKey('vendas.id_venda', ondelete='SET NULL'))
 
     # Relacionamentos
-    produto = relationship('Produtos', back_populates='movimentacoes')
-    usuario = relationship('Usuarios')
-    venda = relationship('Vendas')
+    produto = relationship('Produtos', back_populates='movimentacoes', lazy='raise')
+    usuario = relationship('Usuarios', lazy='raise')
+    venda = relationship('Vendas', lazy='raise')
 
     # Constraints
     __table_args__ = (
@@ -551,7 +617,7 @@ class LogAuditoria(Base):
     data_hora = Column(DateTime, default=datetime.now, nullable=False, index=True)
 
     # Relacionamentos
-    usuario = relationship('Usuarios')
+    usuario = relationship('Usuarios', lazy='raise')
 
     # Constraints
     __table_args__ = (
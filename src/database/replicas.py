@@ -0,0 +1,230 @@
+"""
+Roteamento de leituras para réplicas
+
+Métodos de controller marcados com `@somente_leitura` (listagens, buscas e
+relatórios) rodam numa réplica escolhida em round-robin; o resto continua
+no primário. Sem réplicas configuradas (DB_REPLICA_URLS vazio) tudo vai
+para o primário, como antes.
+
+- Saúde: réplica com erro de conexão fica em quarentena por
+  DB_REPLICA_QUARENTENA segundos; passada a quarentena, um SELECT 1 decide se
+  volta. Sem réplica saudável a leitura vai para o primário. Se a réplica cai
+  durante o método, ele é repetido no primário (só leitura: seguro repetir).
+- Read-your-writes: depois de um commit com escrita, as leituras do mesmo
+  usuário (contexto da requisição) vão para o primário por
+  DB_REPLICA_LEITURA_PROPRIA segundos, tempo maior que o atraso de replicação.
+  O registro é por processo: com vários workers, use afinidade por usuário
+  ou aceite a janela só no worker que recebeu a escrita.
+
+Usage:
+    class VendaController:
+        @somente_leitura
+        def listar_vendas(self, db: Session, ...):
+            ...
+"""
+
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from src.database.configuracao import ConfiguracaoEngine, criar_engine
+from src.database.instrumentacao import instrumentar_engine, instrumentar_pool
+from src.utils.logKit.config_logging import get_logger
+from src.utils.logKit.context import current_request
+
+replica_log = get_logger("LoggerReplicas", "WARNING")
+
+# Usuários com escrita recente guardados (os mais antigos saem primeiro)
+MAX_USUARIOS_ESCRITA = 10_000
+
+
+class RoteadorReplicas:
+    """Réplicas de leitura com round-robin, quarentena e janela de read-your-writes"""
+
+    def __init__(self, replicas: list[Engine], quarentena: float = 30, leitura_propria: float = 5,
+                 relogio: Callable[[], float] = time.monotonic) -> None:
+        self.replicas = list(replicas)
+        self.quarentena = quarentena
+        self.leitura_propria = leitura_propria
+        self._relogio = relogio
+        self._proxima = itertools.count()
+        self._indisponivel_ate: dict[Engine, float] = {}
+        self._falhas: dict[Engine, int] = {}
+        self._escritas: OrderedDict[int, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+        for replica in self.replicas:
+            event.listen(replica, "handle_error", self._ao_erro)
+
+    # ==================== Saúde ====================
+
+    def _ao_erro(self, contexto) -> None:
+        # Só falhas de conexão (queda ou conexão recusada); erros de SQL não tiram a réplica
+        if contexto.is_disconnect or contexto.connection is None:
+            self.marcar_indisponivel(contexto.engine, contexto.original_exception)
+
+    def marcar_indisponivel(self, replica: Engine, erro: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._indisponivel_ate[replica] = self._relogio() + self.quarentena
+            self._falhas[replica] = self._falhas.get(replica, 0) + 1
+        replica_log.warning(f"Réplica {replica.url!r} em quarentena por {self.quarentena}s: {erro}")
+
+    def falhas(self, replica: Engine) -> int:
+        return self._falhas.get(replica, 0)
+
+    def _saudavel(self, replica: Engine) -> bool:
+        indisponivel_ate = self._indisponivel_ate.get(replica)
+        if indisponivel_ate is None:
+            return True
+        if self._relogio() < indisponivel_ate:
+            return False
+
+        # Quarentena vencida: confere antes de devolver tráfego
+        try:
+            with replica.connect() as conexao:
+                conexao.execute(text("SELECT 1"))
+        except Exception as erro:
+            self.marcar_indisponivel(replica, erro)
+            return False
+        with self._lock:
+            self._indisponivel_ate.pop(replica, None)
+        replica_log.warning(f"Réplica {replica.url!r} de volta")
+        return True
+
+    def escolher(self) -> Optional[Engine]:
+        """Próxima réplica saudável em round-robin (None: usar o primário)"""
+        if not self.replicas:
+            return None
+        inicio = next(self._proxima)
+        for deslocamento in range(len(self.replicas)):
+            replica = self.replicas[(inicio + deslocamento) % len(self.replicas)]
+            if self._saudavel(replica):
+                return replica
+        return None
+
+    # ==================== Read-your-writes ====================
+
+    def registrar_escrita(self, usuario_id: int) -> None:
+        with self._lock:
+            self._escritas[usuario_id] = self._relogio() + self.leitura_propria
+            self._escritas.move_to_end(usuario_id)
+            if len(self._escritas) > MAX_USUARIOS_ESCRITA:
+                self._escritas.popitem(last=False)
+
+    def escreveu_recentemente(self, usuario_id: Optional[int]) -> bool:
+        if usuario_id is None:
+            return False
+        prazo = self._escritas.get(usuario_id)
+        return prazo is not None and self._relogio() < prazo
+
+
+class SessaoRoteada(Session):
+    """
+    Session que lê da réplica dentro de `@somente_leitura`
+
+    Escritas, flush e leituras fora dos métodos marcados usam o bind padrão
+    (primário). A réplica é escolhida uma vez por chamada, para que as
+    queries do mesmo método vejam o mesmo snapshot.
+    """
+
+    def __init__(self, *args, roteador: Optional[RoteadorReplicas] = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.roteador = roteador
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        replica = self.info.get("replica")
+        if replica is not None and not self._flushing:
+            return replica
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+@event.listens_for(SessaoRoteada, "after_flush")
+def _marcar_escrita_flush(session, flush_context):
+    session.info["escreveu"] = True
+
+
+@event.listens_for(SessaoRoteada, "do_orm_execute")
+def _marcar_escrita_dml(estado):
+    if estado.is_insert or estado.is_update or estado.is_delete:
+        estado.session.info["escreveu"] = True
+
+
+@event.listens_for(SessaoRoteada, "after_commit")
+def _registrar_escrita(session):
+    if not session.info.pop("escreveu", False) or session.roteador is None:
+        return
+    # O resto desta sessão (requisição) também lê do primário
+    session.info["leitura_no_primario"] = True
+    contexto = current_request()
+    if contexto is not None and contexto.user_id is not None:
+        session.roteador.registrar_escrita(contexto.user_id)
+
+
+@event.listens_for(SessaoRoteada, "after_rollback")
+def _descartar_escrita(session):
+    session.info.pop("escreveu", None)
+
+
+def _replica_para(db) -> Optional[Engine]:
+    roteador = getattr(db, "roteador", None)
+    if roteador is None or db.info.get("replica") is not None:
+        return None
+    # Escrita pendente nesta sessão ou recente do usuário: a réplica pode não ter o dado ainda
+    if db.info.get("escreveu") or db.info.get("leitura_no_primario") or db.new or db.dirty or db.deleted:
+        return None
+    contexto = current_request()
+    if roteador.escreveu_recentemente(contexto.user_id if contexto is not None else None):
+        return None
+    return roteador.escolher()
+
+
+def somente_leitura(metodo):
+    """
+    Roda o método de controller numa réplica (sessão `SessaoRoteada`)
+
+    A sessão é o primeiro argumento depois de `self` (posicional ou `db=`).
+    Se a réplica cair durante a chamada, o método é repetido no primário.
+    """
+    @wraps(metodo)
+    def wrapper(self, *args, **kwargs):
+        db = kwargs["db"] if "db" in kwargs else args[0]
+        replica = _replica_para(db)
+        if replica is None:
+            return metodo(self, *args, **kwargs)
+
+        falhas = db.roteador.falhas(replica)
+        db.info["replica"] = replica
+        try:
+            resultado = metodo(self, *args, **kwargs)
+        except Exception:
+            if db.roteador.falhas(replica) == falhas:
+                raise
+        finally:
+            db.info.pop("replica", None)
+
+        # Controllers costumam engolir o erro e devolver vazio: a quarentena nova é o sinal
+        if db.roteador.falhas(replica) != falhas:
+            replica_log.warning(f"{metodo.__qualname__}: réplica falhou, repetindo no primário")
+            return metodo(self, *args, **kwargs)
+        return resultado
+
+    return wrapper
+
+
+def criar_roteador(urls: list[str], configuracao: ConfiguracaoEngine, quarentena: float,
+                   leitura_propria: float) -> RoteadorReplicas:
+    """Engines das réplicas com a mesma configuração de pool do primário"""
+    replicas = []
+    for indice, url in enumerate(urls):
+        replica = criar_engine(configuracao.para_url(url))
+        instrumentar_engine(replica)
+        instrumentar_pool(replica, f"replica{indice}")
+        replicas.append(replica)
+    return RoteadorReplicas(replicas, quarentena=quarentena, leitura_propria=leitura_propria)
@@ -1,11 +1,32 @@
 from sqlalchemy.orm import sessionmaker, scoped_session, Session
 from typing import Generator
-from src.database.connection import engine
+from src.database.connection import engine, get_async_engine, roteador_replicas
+from src.database.replicas import SessaoRoteada
 
-SessionLocal = sessionmaker(autocommit=False,autoflush=False,bind=engine)
+# SessaoRoteada: métodos `@somente_leitura` leem das réplicas (DB_REPLICA_URLS), o resto usa `engine`
+SessionLocal = sessionmaker(class_=SessaoRoteada, autocommit=False, autoflush=False, bind=engine,
+                            roteador=roteador_replicas)
 
 ScopedSession = scoped_session(SessionLocal)
 
+_async_sessionmaker = None
+
+
+def get_async_sessionmaker():
+    """
+    Fábrica de AsyncSession (modo DB_ASYNC), criada sob demanda
+
+    expire_on_commit=False: objetos continuam legíveis depois do commit sem
+    novo SELECT (lazy load implícito não existe em AsyncSession).
+    """
+    global _async_sessionmaker
+
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        _async_sessionmaker = async_sessionmaker(bind=get_async_engine(), autoflush=False, expire_on_commit=False)
+
+    return _async_sessionmaker
+
 def get_session() -> Generator[Session, None, None]:
     """
     Retorna nova sessão do banco.
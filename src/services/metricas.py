@@ -0,0 +1,330 @@
+"""
+Métricas da aplicação no formato texto do Prometheus (sem dependências)
+
+Contadores, medidores (gauges) e histogramas com labels. Cada série tem o
+próprio lock (segurado só pelo incremento); o dicionário de séries só é
+travado quando uma combinação nova de labels aparece.
+
+Vários workers (gunicorn/uvicorn --workers): com METRICAS_DIR definido, cada
+processo grava periodicamente um snapshot em `<METRICAS_DIR>/<pid>.json` e o
+`/metrics` de qualquer worker soma os snapshots. Contadores e histogramas de
+workers mortos continuam na soma (valores monotônicos); gauges só contam
+processos vivos. O diretório deve ser limpo ao subir o servidor.
+
+Uso:
+    CARRINHOS_CRIADOS.inc()
+    with LATENCIA.medir(rota="/sales/checkout"):
+        ...
+    texto = registro.exportar()
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from operator import itemgetter
+from pathlib import Path
+from typing import Callable, Iterator
+
+from src.config import METRICAS_DIR, METRICAS_INTERVALO
+
+# Limites padrão dos histogramas de latência, em segundos
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nome: str, ajuda: str, labels: tuple[str, ...] = ()) -> None:
+        self.nome = nome
+        self.ajuda = ajuda
+        self.labels = tuple(labels)
+        self._series: dict[tuple[str, ...], list] = {}
+        # Atalho: valores dos labels como vieram (ex.: status=200) -> série já normalizada para str
+        self._atalhos: dict = {}
+        self._extrair = itemgetter(*self.labels) if self.labels else (lambda valores: ())
+        self._lock = threading.Lock()
+
+    def _serie(self, valores: dict[str, object]) -> list:
+        if len(valores) != len(self.labels):
+            raise self._labels_invalidos(valores)
+        try:
+            chave = self._extrair(valores)
+        except KeyError:
+            raise self._labels_invalidos(valores) from None
+
+        serie = self._atalhos.get(chave)
+        if serie is None:
+            # itemgetter devolve o valor sozinho quando há um label só
+            brutos = chave if len(self.labels) > 1 else (chave,) if self.labels else ()
+            with self._lock:
+                serie = self._series.setdefault(tuple(str(valor) for valor in brutos), self._nova_serie())
+                self._atalhos[chave] = serie
+        return serie
+
+    def _labels_invalidos(self, valores: dict[str, object]) -> ValueError:
+        return ValueError(f"{self.nome}: labels esperados {self.labels}, recebidos {tuple(valores)}")
+
+    def _nova_serie(self) -> list:
+        return [threading.Lock(), 0.0]
+
+    def snapshot(self) -> list:
+        """Valores atuais: [[labels, valor], ...] (histograma: [[labels, buckets, soma], ...])"""
+        return [[list(chave), serie[1]] for chave, serie in list(self._series.items())]
+
+
+class Contador(_Metrica):
+    """Contador monotônico"""
+
+    tipo = "counter"
+
+    def inc(self, valor: float = 1, **labels) -> None:
+        serie = self._serie(labels)
+        with serie[0]:
+            serie[1] += valor
+
+
+class Medidor(_Metrica):
+    """Gauge: valor que sobe e desce (ou lido de uma função no momento do snapshot)"""
+
+    tipo = "gauge"
+
+    def __init__(self, nome: str, ajuda: str, labels: tuple[str, ...] = (),
+                 funcao: Callable[[], dict[tuple[str, ...], float]] | None = None) -> None:
+        super().__init__(nome, ajuda, labels)
+        self.funcao = funcao
+
+    def inc(self, valor: float = 1, **labels) -> None:
+        serie = self._serie(labels)
+        with serie[0]:
+            serie[1] += valor
+
+    def dec(self, valor: float = 1, **labels) -> None:
+        self.inc(-valor, **labels)
+
+    def set(self, valor: float, **labels) -> None:
+        self._serie(labels)[1] = valor
+
+    def snapshot(self) -> list:
+        if self.funcao is None:
+            return super().snapshot()
+        return [[list(chave), valor] for chave, valor in self.funcao().items()]
+
+
+class Histograma(_Metrica):
+    """Histograma com buckets fixos (contagens não cumulativas internamente)"""
+
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, labels: tuple[str, ...] = (),
+                 limites: tuple[float, ...] = LIMITES_LATENCIA) -> None:
+        super().__init__(nome, ajuda, labels)
+        self.limites = tuple(limites)
+
+    def _nova_serie(self) -> list:
+        # [lock, contagem por bucket (+Inf no fim), soma]
+        return [threading.Lock(), [0] * (len(self.limites) + 1), 0.0]
+
+    def observar(self, valor: float, **labels) -> None:
+        serie = self._serie(labels)
+        indice = bisect_left(self.limites, valor)
+        with serie[0]:
+            serie[1][indice] += 1
+            serie[2] += valor
+
+    @contextmanager
+    def medir(self, **labels) -> Iterator[None]:
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **labels)
+
+    def snapshot(self) -> list:
+        return [[list(chave), list(serie[1]), serie[2]] for chave, serie in list(self._series.items())]
+
+
+class RegistroMetricas:
+    """Conjunto de métricas exportadas juntas (um processo)"""
+
+    def __init__(self, diretorio: str | Path | None = None) -> None:
+        self._metricas: dict[str, _Metrica] = {}
+        self.diretorio = Path(diretorio) if diretorio else None
+        self.pid = os.getpid()
+        self._parar = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def registrar(self, metrica: _Metrica) -> _Metrica:
+        if metrica.nome in self._metricas:
+            raise ValueError(f"Métrica já registrada: {metrica.nome}")
+        self._metricas[metrica.nome] = metrica
+        return metrica
+
+    def contador(self, nome: str, ajuda: str, labels: tuple[str, ...] = ()) -> Contador:
+        return self.registrar(Contador(nome, ajuda, labels))
+
+    def medidor(self, nome: str, ajuda: str, labels: tuple[str, ...] = (),
+                funcao: Callable[[], dict[tuple[str, ...], float]] | None = None) -> Medidor:
+        return self.registrar(Medidor(nome, ajuda, labels, funcao))
+
+    def histograma(self, nome: str, ajuda: str, labels: tuple[str, ...] = (),
+                   limites: tuple[float, ...] = LIMITES_LATENCIA) -> Histograma:
+        return self.registrar(Histograma(nome, ajuda, labels, limites))
+
+    # ==================== Snapshot e modo multiprocesso ====================
+
+    def snapshot(self) -> dict:
+        metricas = {}
+        for nome, metrica in self._metricas.items():
+            metricas[nome] = {"tipo": metrica.tipo, "ajuda": metrica.ajuda, "labels": list(metrica.labels),
+                              "valores": metrica.snapshot()}
+            if isinstance(metrica, Histograma):
+                metricas[nome]["limites"] = list(metrica.limites)
+        return {"pid": self.pid, "metricas": metricas}
+
+    def gravar_snapshot(self) -> None:
+        """Grava o snapshot deste processo em `<diretorio>/<pid>.json` (troca atômica)"""
+        if self.diretorio is None:
+            return
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        destino = self.diretorio / f"{self.pid}.json"
+        # Nome por thread: a thread de exportação e um /metrics podem gravar ao mesmo tempo
+        temporario = destino.with_name(f"{self.pid}.{threading.get_ident()}.tmp")
+        temporario.write_text(json.dumps(self.snapshot()), encoding="utf-8")
+        os.replace(temporario, destino)
+
+    def iniciar_exportacao(self, intervalo: float = METRICAS_INTERVALO) -> None:
+        """Modo multiprocesso: grava o snapshot a cada `intervalo` segundos numa thread de fundo"""
+        if self.diretorio is None or self._thread is not None:
+            return
+
+        self.pid = os.getpid()
+        anterior = self.diretorio / f"{self.pid}.json"
+        if anterior.exists():
+            # PID reaproveitado: o arquivo é de um processo morto e continua somando como tal
+            anterior.rename(self.diretorio / f"{self.pid}-{time.time_ns()}.json")
+
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._exportar_periodicamente, args=(intervalo,),
+                                        name="metricas-export", daemon=True)
+        self._thread.start()
+
+    def parar_exportacao(self) -> None:
+        if self._thread is None:
+            return
+        self._parar.set()
+        self._thread.join()
+        self._thread = None
+        self.gravar_snapshot()
+
+    def _exportar_periodicamente(self, intervalo: float) -> None:
+        while not self._parar.wait(intervalo):
+            try:
+                self.gravar_snapshot()
+            except OSError:
+                pass  # diretório indisponível: tenta de novo no próximo intervalo
+
+    def _snapshots(self) -> list[dict]:
+        if self.diretorio is None:
+            return [self.snapshot()]
+
+        self.gravar_snapshot()
+        snapshots = []
+        for arquivo in sorted(self.diretorio.glob("*.json")):
+            try:
+                snapshot = json.loads(arquivo.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue  # arquivo sendo trocado ou corrompido: fica para o próximo scrape
+            snapshot["vivo"] = arquivo.stem.isdigit() and _processo_vivo(int(arquivo.stem))
+            snapshots.append(snapshot)
+        return snapshots
+
+    # ==================== Exportação ====================
+
+    def agregar(self) -> dict[str, dict]:
+        """Soma os snapshots (um por processo) por métrica e labels"""
+        agregado: dict[str, dict] = {}
+        for snapshot in self._snapshots():
+            vivo = snapshot.get("vivo", True)
+            for nome, dados in snapshot["metricas"].items():
+                if dados["tipo"] == "gauge" and not vivo:
+                    continue
+                destino = agregado.setdefault(nome, {**dados, "valores": {}})
+                for valor in dados["valores"]:
+                    chave = tuple(valor[0])
+                    if dados["tipo"] == "histogram":
+                        atual = destino["valores"].setdefault(chave, [[0] * len(valor[1]), 0.0])
+                        atual[0] = [a + b for a, b in zip(atual[0], valor[1])]
+                        atual[1] += valor[2]
+                    else:
+                        destino["valores"][chave] = destino["valores"].get(chave, 0) + valor[1]
+        return agregado
+
+    def exportar(self) -> str:
+        """Texto no formato de exposição do Prometheus (0.0.4)"""
+        linhas = []
+        for nome, dados in self.agregar().items():
+            linhas.append(f"# HELP {nome} {dados['ajuda']}")
+            linhas.append(f"# TYPE {nome} {dados['tipo']}")
+            labels = dados["labels"]
+            for chave, valor in sorted(dados["valores"].items()):
+                pares = list(zip(labels, chave))
+                if dados["tipo"] == "histogram":
+                    buckets, soma = valor
+                    acumulado = 0
+                    for limite, contagem in zip((*dados["limites"], "+Inf"), buckets):
+                        acumulado += contagem
+                        linhas.append(f"{nome}_bucket{_labels(pares + [('le', _numero(limite))])} {acumulado}")
+                    linhas.append(f"{nome}_sum{_labels(pares)} {_numero(soma)}")
+                    linhas.append(f"{nome}_count{_labels(pares)} {acumulado}")
+                else:
+                    linhas.append(f"{nome}{_labels(pares)} {_numero(valor)}")
+        return "\n".join(linhas) + "\n"
+
+
+def _processo_vivo(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _numero(valor) -> str:
+    if isinstance(valor, str):
+        return valor
+    if valor == int(valor):
+        return str(int(valor))
+    return repr(float(valor))
+
+
+def _escapar(valor: object) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pares: list[tuple[str, object]]) -> str:
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{nome}="{_escapar(valor)}"' for nome, valor in pares) + "}"
+
+
+# ==================== Métricas da aplicação ====================
+
+registro = RegistroMetricas(METRICAS_DIR or None)
+
+LATENCIA_REQUISICOES = registro.histograma(
+    "http_request_duration_seconds", "Latência das requisições HTTP por rota", ("method", "route", "status"))
+REQUISICOES_EM_ANDAMENTO = registro.medidor(
+    "http_requests_in_flight", "Requisições HTTP em andamento")
+TEMPO_BCRYPT = registro.histograma(
+    "bcrypt_duration_seconds", "Tempo de hash/verificação bcrypt (inclui espera no executor)", ("operacao",),
+    limites=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+CARRINHOS_CRIADOS = registro.contador("loja_carrinhos_criados_total", "Carrinhos criados")
+RESERVAS_CRIADAS = registro.contador("loja_reservas_criadas_total", "Reservas de estoque criadas")
+RESERVAS_EXPIRADAS = registro.contador("loja_reservas_expiradas_total",
+                                       "Reservas liberadas por expiração (reserva ou carrinho vencido)")
+VENDAS_FINALIZADAS = registro.contador("loja_vendas_finalizadas_total", "Vendas finalizadas")
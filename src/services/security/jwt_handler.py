@@ -1,10 +1,16 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException, status
-from typing import Optional
+from typing import Optional, Tuple
+import hashlib
+import threading
+import time
 import jwt
 from jwt.exceptions import InvalidTokenError, ExpiredSignatureError
 import os
 
+from src.config import JWT_CACHE_TAMANHO
+
 
 class JWTHandler:
     """Gerenciador  de tokens JWT"""
@@ -14,6 +20,11 @@ class JWTHandler:
     ACCESS_TOKEN_EXPIRE_MINUTES = 60
     REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+    # LRU de tokens já verificados: sha256(chave + token) -> (exp, payload)
+    CACHE_TAMANHO = JWT_CACHE_TAMANHO
+    _cache: "OrderedDict[bytes, Tuple[float, dict]]" = OrderedDict()
+    _cache_lock = threading.Lock()
+
     @classmethod
     def create_access_token(cls, data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """
@@ -73,9 +84,72 @@ class JWTHandler:
         except InvalidTokenError:
             return {"error": "invalid"}
 
+    @classmethod
+    def _chave_cache(cls, token: str) -> bytes:
+        """Hash do token (inclui a chave de assinatura: trocar a chave invalida o cache)"""
+        return hashlib.sha256(f"{cls.SECRET_KEY}:{token}".encode()).digest()
+
+    @classmethod
+    def _buscar_cache(cls, chave: bytes) -> Optional[dict]:
+        """Payload de um token já verificado, se ainda não expirou"""
+        with cls._cache_lock:
+            entrada = cls._cache.get(chave)
+            if entrada is None:
+                return None
+
+            expira_em, payload = entrada
+            if expira_em <= time.time():
+                del cls._cache[chave]
+                return None
+
+            cls._cache.move_to_end(chave)
+            return payload
+
+    @classmethod
+    def _guardar_cache(cls, chave: bytes, payload: dict) -> None:
+        """Guarda o payload verificado até o `exp` do token, descartando o menos usado"""
+        expira_em = payload.get("exp")
+        if cls.CACHE_TAMANHO <= 0 or not isinstance(expira_em, (int, float)):
+            return
+
+        with cls._cache_lock:
+            cls._cache[chave] = (expira_em, payload)
+            cls._cache.move_to_end(chave)
+            while len(cls._cache) > cls.CACHE_TAMANHO:
+                cls._cache.popitem(last=False)
+
+    @classmethod
+    def limpar_cache(cls) -> None:
+        """Esvazia o cache de tokens verificados"""
+        with cls._cache_lock:
+            cls._cache.clear()
+
     @classmethod
     def verify_token(cls, token: str, token_type: str = "access") -> Optional[dict]:
-        """Verifica se token é valido e do tipo correto"""
+        """
+        Verifica se token é valido e do tipo correto
+
+        Tokens repetidos vêm do cache (sem HMAC nem parse de datas) até o
+        `exp`; o tipo é conferido sempre.
+        """
+        chave = cls._chave_cache(token)
+        payload = cls._buscar_cache(chave)
+
+        if payload is None:
+            payload = cls._verificar_assinatura(token)
+            cls._guardar_cache(chave, payload)
+
+        if payload.get("type") != token_type:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                                detail="Tipo de token inválido",
+                                headers={"WWW-Authenticate": "Bearer"}
+                                )
+
+        return dict(payload)
+
+    @classmethod
+    def _verificar_assinatura(cls, token: str) -> dict:
+        """Decodifica o token e converte expirado/inválido em 401"""
 
         payload = cls.decode_token(token)
 
@@ -91,10 +165,4 @@ class JWTHandler:
                                 headers={"WWW-Authenticate": "Bearer"}
                                 )
 
-        if payload.get("type") != token_type:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
-                                detail="Tipo de token inválido",
-                                headers={"WWW-Authenticate": "Bearer"}
-                                )
-
         return payload
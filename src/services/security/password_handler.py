@@ -1,5 +1,58 @@
+import asyncio
+import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from typing import Optional, Tuple
+
 import bcrypt
-from typing import Tuple
+
+from src.config import BCRYPT_EXECUTOR, BCRYPT_ROUNDS, BCRYPT_WORKERS
+from src.services.metricas import TEMPO_BCRYPT
+
+
+def _gerar_hash(password: bytes, rounds: int) -> bytes:
+    """Hash bcrypt (função de módulo para poder rodar em ProcessPoolExecutor)"""
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+
+def _conferir_hash(password: bytes, hashed_password: bytes) -> bool:
+    """Verificação bcrypt (função de módulo para poder rodar em ProcessPoolExecutor)"""
+    return bcrypt.checkpw(password, hashed_password)
+
+
+class ExecutorInline(Executor):
+    """Executor que roda a tarefa na própria thread (comportamento antigo)"""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def criar_executor(tipo: str = BCRYPT_EXECUTOR, workers: int = BCRYPT_WORKERS) -> Executor:
+    """
+    Cria o executor de hashing
+
+    - thread: bcrypt libera o GIL, então threads usam vários núcleos
+    - process: isola o custo de CPU em outros processos (spawn, seguro com threads)
+    - inline: sem pool, roda na thread de quem chamou
+
+    O pool limita quantos hashes rodam ao mesmo tempo (padrão: núcleos), para
+    que uma rajada de logins não tome a CPU do resto do tráfego.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    if tipo == 'thread':
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+    if tipo == 'process':
+        return ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+    if tipo == 'inline':
+        return ExecutorInline()
+
+    raise ValueError(f"BCRYPT_EXECUTOR inválido: {tipo} (use thread, process ou inline)")
 
 
 class PasswordHandler:
@@ -10,9 +63,36 @@ class PasswordHandler:
     - Salt automatico unico por senha
     - Computacionalmente custoso (proteção contra brute force)
     - irreversivel (não descriptografa)
+
+    Os hashes rodam num executor plugável (ver `criar_executor`); as versões
+    `*_async` aguardam o resultado sem bloquear o event loop. O tempo de cada
+    operação (com a espera no executor) vai para `bcrypt_duration_seconds`.
     """
-    @staticmethod
-    def hash_password(password: str) -> str:
+    ROUNDS = BCRYPT_ROUNDS
+
+    _executor: Optional[Executor] = None
+
+    @classmethod
+    def get_executor(cls) -> Executor:
+        """Executor atual (criado sob demanda a partir da configuração)"""
+        if cls._executor is None:
+            cls._executor = criar_executor()
+        return cls._executor
+
+    @classmethod
+    def configurar_executor(cls, executor: Optional[Executor]) -> None:
+        """Troca o executor de hashing (None volta ao padrão da configuração)"""
+        anterior, cls._executor = cls._executor, executor
+        if anterior is not None and anterior is not executor:
+            anterior.shutdown(wait=False)
+
+    @classmethod
+    def encerrar_executor(cls) -> None:
+        """Encerra o executor (shutdown da aplicação)"""
+        cls.configurar_executor(None)
+
+    @classmethod
+    def hash_password(cls, password: str) -> str:
         """
         Gera hash bcrypt da senha
 
@@ -22,12 +102,11 @@ class PasswordHandler:
         Returns:
             Hash bcrypt como string (já inclui o salt)
         """
-        salt =bcrypt.gensalt()
-        password = bcrypt.hashpw(password.encode(), salt)
-        return password.decode("utf-8")
+        with TEMPO_BCRYPT.medir(operacao="hash"):
+            return cls.get_executor().submit(_gerar_hash, password.encode(), cls.ROUNDS).result().decode("utf-8")
 
-    @staticmethod
-    def verify_password(password: str, hashed_password: str) -> bool:
+    @classmethod
+    def verify_password(cls, password: str, hashed_password: str) -> bool:
         """
         Verifica se senha corresponde ao hash
 
@@ -39,11 +118,46 @@ class PasswordHandler:
             True se senha correta, False caso contrário
         """
         try:
-            return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+            with TEMPO_BCRYPT.medir(operacao="verify"):
+                return cls.get_executor().submit(
+                    _conferir_hash, password.encode('utf-8'), hashed_password.encode('utf-8')
+                ).result()
 
         except Exception:
             return False
 
+    @classmethod
+    async def hash_password_async(cls, password: str) -> str:
+        """Versão assíncrona de `hash_password`"""
+        with TEMPO_BCRYPT.medir(operacao="hash"):
+            future = cls.get_executor().submit(_gerar_hash, password.encode(), cls.ROUNDS)
+            return (await asyncio.wrap_future(future)).decode("utf-8")
+
+    @classmethod
+    async def verify_password_async(cls, password: str, hashed_password: str) -> bool:
+        """Versão assíncrona de `verify_password`"""
+        try:
+            with TEMPO_BCRYPT.medir(operacao="verify"):
+                future = cls.get_executor().submit(
+                    _conferir_hash, password.encode('utf-8'), hashed_password.encode('utf-8')
+                )
+                return await asyncio.wrap_future(future)
+
+        except Exception:
+            return False
+
+    @classmethod
+    def precisa_rehash(cls, hashed_password: str) -> bool:
+        """
+        Indica se o hash foi gerado com custo diferente do configurado
+
+        Formato bcrypt: $2b$<custo>$<salt+hash>
+        """
+        try:
+            return int(hashed_password.split('$')[2]) != cls.ROUNDS
+        except (IndexError, ValueError):
+            return False
+
     @staticmethod
     def validar_forca_senha(password: str) -> Tuple[bool, str]:
         """
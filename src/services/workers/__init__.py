@@ -0,0 +1,5 @@
+from .base import MetricasExpiracao, PeriodicWorker
+from .carrinhos import CarrinhoExpiracaoWorker
+from .reservas import ReservaExpiracaoWorker
+
+__all__ = ["CarrinhoExpiracaoWorker", "MetricasExpiracao", "PeriodicWorker", "ReservaExpiracaoWorker"]
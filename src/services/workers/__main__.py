@@ -0,0 +1,57 @@
+"""
+Execução dos workers de expiração fora da API (cron)
+
+Uso:
+    python -m src.services.workers reservas            # uma rodada e sai
+    python -m src.services.workers carrinhos --lote 200
+    python -m src.services.workers reservas --loop     # roda continuamente
+"""
+import argparse
+import asyncio
+import sys
+
+from src.services.workers import CarrinhoExpiracaoWorker, ReservaExpiracaoWorker
+
+WORKERS = {
+    "carrinhos": CarrinhoExpiracaoWorker,
+    "reservas": ReservaExpiracaoWorker,
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.services.workers",
+                                     description="Executa os workers de expiração")
+    parser.add_argument("worker", choices=sorted(WORKERS), help="Worker a executar")
+    parser.add_argument("--lote", type=int, default=None, help="Tamanho do lote")
+    parser.add_argument("--intervalo", type=float, default=None, help="Intervalo em segundos (com --loop)")
+    parser.add_argument("--loop", action="store_true", help="Executa continuamente em vez de uma única rodada")
+    return parser
+
+
+def run(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    kwargs = {}
+    if args.lote is not None:
+        kwargs["tamanho_lote"] = args.lote
+    if args.intervalo is not None:
+        kwargs["intervalo_segundos"] = args.intervalo
+
+    worker = WORKERS[args.worker](**kwargs)
+
+    if args.loop:
+        try:
+            asyncio.run(worker.executar_periodicamente())
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    metricas = worker.executar_uma_vez()
+    print(f"{args.worker}: {metricas.carrinhos_expirados} carrinhos expirados, "
+          f"{metricas.reservas_liberadas} reservas liberadas ({metricas.unidades_liberadas} unidades) "
+          f"em {metricas.lotes} lotes / {metricas.duracao_ms:.0f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,118 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Optional
+from sqlalchemy.orm import Session
+from src.services.metricas import RESERVAS_EXPIRADAS
+from src.utils.logKit.config_logging import get_logger
+
+
+@dataclass
+class MetricasExpiracao:
+    """Contadores de uma execução (ou do acumulado) de um worker de expiração"""
+    carrinhos_expirados: int = 0
+    reservas_liberadas: int = 0
+    unidades_liberadas: int = 0
+    lotes: int = 0
+    duracao_ms: float = 0.0
+    executado_em: datetime = field(default_factory=datetime.now)
+
+    def somar(self, outra: "MetricasExpiracao") -> None:
+        self.carrinhos_expirados += outra.carrinhos_expirados
+        self.reservas_liberadas += outra.reservas_liberadas
+        self.unidades_liberadas += outra.unidades_liberadas
+        self.lotes += outra.lotes
+        self.duracao_ms += outra.duracao_ms
+        self.executado_em = outra.executado_em
+
+
+class PeriodicWorker(ABC):
+    """
+    Tarefa periódica executada fora do caminho das requisições
+
+    Cada execução abre sua própria sessão, roda `executar` numa thread
+    (SQLAlchemy síncrono) e guarda as métricas em `ultimo_resultado`
+    (última rodada) e `totais` (acumulado desde o início do processo).
+
+    Usage:
+        worker = ReservaExpiracaoWorker(intervalo_segundos=60)
+        worker.iniciar()          # dentro do event loop (lifespan do FastAPI)
+        await worker.parar()
+    """
+
+    nome: str = "worker"
+
+    def __init__(self, intervalo_segundos: float, session_factory: Optional[Callable[[], Session]] = None):
+        if intervalo_segundos <= 0:
+            raise ValueError("Intervalo deve ser maior que zero")
+
+        self.intervalo_segundos = intervalo_segundos
+        self._session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+        self.ultimo_resultado: Optional[MetricasExpiracao] = None
+        self.totais = MetricasExpiracao()
+        self.worker_log = get_logger(f"Logger{self.__class__.__name__}", "INFO")
+
+    @abstractmethod
+    def executar(self, db: Session) -> MetricasExpiracao:
+        """Executa uma rodada do trabalho usando a sessão informada"""
+
+    def _nova_sessao(self) -> Session:
+        if self._session_factory is None:
+            from src.database.session import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def executar_uma_vez(self) -> MetricasExpiracao:
+        """Abre sessão, executa uma rodada e fecha a sessão (uso em cron/CLI)"""
+        db = self._nova_sessao()
+        inicio = time.perf_counter()
+        try:
+            metricas = self.executar(db)
+            metricas.duracao_ms = (time.perf_counter() - inicio) * 1000
+            self.ultimo_resultado = metricas
+            self.totais.somar(metricas)
+            RESERVAS_EXPIRADAS.inc(metricas.reservas_liberadas)
+            return metricas
+        except Exception:
+            db.rollback()
+            self.worker_log.exception(f"Erro na execução do worker '{self.nome}'")
+            raise
+        finally:
+            db.close()
+
+    async def executar_periodicamente(self) -> None:
+        """Executa uma rodada a cada `intervalo_segundos` até ser cancelado"""
+        while True:
+            try:
+                await asyncio.to_thread(self.executar_uma_vez)
+            except Exception:
+                # Já registrado em executar_uma_vez; o worker segue para a próxima rodada
+                pass
+            await asyncio.sleep(self.intervalo_segundos)
+
+    @property
+    def em_execucao(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def iniciar(self) -> asyncio.Task:
+        """Agenda o loop periódico no event loop atual"""
+        if not self.em_execucao:
+            self._task = asyncio.create_task(self.executar_periodicamente(), name=f"worker-{self.nome}")
+            self.worker_log.info(f"Worker '{self.nome}' iniciado (intervalo: {self.intervalo_segundos}s)")
+        return self._task
+
+    async def parar(self) -> None:
+        """Cancela o loop periódico e aguarda o término"""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.worker_log.info(f"Worker '{self.nome}' parado")
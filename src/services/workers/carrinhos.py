@@ -0,0 +1,70 @@
+from datetime import datetime
+from typing import Callable, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from src.config import CARRINHO_EXPIRACAO_INTERVALO, CARRINHO_EXPIRACAO_LOTE
+from src.controllers.carrinho_controller import CarrinhoController
+from src.database.models import Carrinho
+from src.services.workers.base import MetricasExpiracao, PeriodicWorker
+
+
+class CarrinhoExpiracaoWorker(PeriodicWorker):
+    """
+    Expira carrinhos ATIVO vencidos e libera suas reservas em lote
+
+    Cada lote (carrinhos + reservas + produtos) roda numa única transação.
+    """
+
+    nome = "carrinhos"
+
+    def __init__(self, intervalo_segundos: float = CARRINHO_EXPIRACAO_INTERVALO,
+                 tamanho_lote: int = CARRINHO_EXPIRACAO_LOTE,
+                 session_factory: Optional[Callable[[], Session]] = None):
+        super().__init__(intervalo_segundos, session_factory)
+
+        if tamanho_lote <= 0:
+            raise ValueError("Tamanho do lote deve ser maior que zero")
+
+        self.tamanho_lote = tamanho_lote
+        self.carrinho_controller = CarrinhoController()
+
+    def executar(self, db: Session, agora: Optional[datetime] = None) -> MetricasExpiracao:
+        """
+        Expira todos os carrinhos vencidos até `agora`
+
+        Returns:
+            Métricas da rodada (carrinhos expirados, reservas/unidades liberadas, lotes)
+        """
+        agora = agora or datetime.now()
+        metricas = MetricasExpiracao()
+
+        while True:
+            carrinho_ids = db.execute(
+                select(Carrinho.id_carrinho)
+                .where(Carrinho.status == 'ATIVO', Carrinho.expira_em < agora)
+                .order_by(Carrinho.expira_em)
+                .limit(self.tamanho_lote)
+                .with_for_update(skip_locked=True)
+            ).scalars().all()
+
+            if not carrinho_ids:
+                break
+
+            expirados, reservas, unidades = self.carrinho_controller.expirar_carrinhos_em_lote(db, carrinho_ids)
+            db.commit()
+
+            metricas.lotes += 1
+            metricas.carrinhos_expirados += expirados
+            metricas.reservas_liberadas += reservas
+            metricas.unidades_liberadas += unidades
+
+            if len(carrinho_ids) < self.tamanho_lote:
+                break
+
+        if metricas.carrinhos_expirados > 0:
+            self.worker_log.info(
+                f"{metricas.carrinhos_expirados} carrinhos expirados - "
+                f"{metricas.reservas_liberadas} reservas liberadas ({metricas.unidades_liberadas} unidades)"
+            )
+
+        return metricas
@@ -0,0 +1,74 @@
+from datetime import datetime
+from typing import Callable, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from src.config import RESERVA_EXPIRACAO_INTERVALO, RESERVA_EXPIRACAO_LOTE
+from src.controllers.estoque_controller import EstoqueController
+from src.database.models import Reserva
+from src.services.workers.base import MetricasExpiracao, PeriodicWorker
+
+
+class ReservaExpiracaoWorker(PeriodicWorker):
+    """
+    Libera reservas expiradas em lotes set-based
+
+    Por lote: um SELECT dos IDs vencidos, um UPDATE em `reservas` e um
+    UPDATE agrupado em `produtos`, seguidos de um único commit.
+    """
+
+    nome = "reservas"
+
+    def __init__(self, intervalo_segundos: float = RESERVA_EXPIRACAO_INTERVALO,
+                 tamanho_lote: int = RESERVA_EXPIRACAO_LOTE,
+                 session_factory: Optional[Callable[[], Session]] = None):
+        super().__init__(intervalo_segundos, session_factory)
+
+        if tamanho_lote <= 0:
+            raise ValueError("Tamanho do lote deve ser maior que zero")
+
+        self.tamanho_lote = tamanho_lote
+        self.estoque_controller = EstoqueController()
+
+    def executar(self, db: Session, agora: Optional[datetime] = None) -> MetricasExpiracao:
+        """
+        Libera todas as reservas vencidas até `agora`
+
+        Returns:
+            Métricas da rodada (reservas/unidades liberadas, lotes)
+        """
+        agora = agora or datetime.now()
+        metricas = MetricasExpiracao()
+
+        while True:
+            reserva_ids = db.execute(
+                select(Reserva.id_reserva)
+                .where(Reserva.ativa == True, Reserva.expira_em < agora)
+                .order_by(Reserva.expira_em)
+                .limit(self.tamanho_lote)
+                .with_for_update(skip_locked=True)
+            ).scalars().all()
+
+            if not reserva_ids:
+                break
+
+            liberado = self.estoque_controller.liberar_reservas_em_lote(db, reserva_ids)
+            db.commit()
+
+            metricas.lotes += 1
+            metricas.reservas_liberadas += len(reserva_ids)
+            metricas.unidades_liberadas += sum(liberado.values())
+            self.worker_log.debug(
+                f"Lote de {len(reserva_ids)} reservas expiradas liberado "
+                f"({sum(liberado.values())} unidades em {len(liberado)} produtos)"
+            )
+
+            if len(reserva_ids) < self.tamanho_lote:
+                break
+
+        if metricas.reservas_liberadas > 0:
+            self.worker_log.info(
+                f"{metricas.reservas_liberadas} reservas expiradas liberadas "
+                f"({metricas.unidades_liberadas} unidades, {metricas.lotes} lotes)"
+            )
+
+        return metricas
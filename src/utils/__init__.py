@@ -1,5 +1,15 @@
-from .file_helpers import gerar_arquivo, verificar_arquivo_vazio, duplicado
 from .validators import validar_telefone, validar_email, validar_cpf, maior_idade
 
 __all__ = ["gerar_arquivo", "verificar_arquivo_vazio", "duplicado", "validar_cpf", "validar_telefone", "validar_email",
            "maior_idade"]
+
+# file_helpers usa pandas: carregado só no primeiro acesso, para que quem importa
+# apenas os validadores (controllers/API) não pague o import do pandas
+_FILE_HELPERS = {"gerar_arquivo", "verificar_arquivo_vazio", "duplicado"}
+
+
+def __getattr__(name: str):
+    if name in _FILE_HELPERS:
+        from . import file_helpers
+        return getattr(file_helpers, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
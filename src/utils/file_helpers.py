@@ -1,6 +1,5 @@
 from pathlib import Path
 import os
-import pandas as pd
 import json
 
 
@@ -22,6 +21,8 @@ def duplicado(arquivo, **kwargs) -> bool:
     extensao = os.path.splitext(arquivo)[1].lower()
 
     if extensao == '.csv':
+        import pandas as pd  # import pesado: só quando há CSV para ler
+
         dados = pd.read_csv(arquivo, encoding='utf-8', sep=',').to_dict(orient='records')
     elif extensao == '.jsonl':
         if verificar_arquivo_vazio(arquivo):
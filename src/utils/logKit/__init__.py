@@ -1,14 +1,32 @@
-from src.utils.logKit.config_logging import get_logger
-from src.utils.logKit.filters import MaxLevelFilter
+from src.utils.logKit.config_logging import configure_levels, get_logger
+from src.utils.logKit.context import RequestContext, bind_request, current_request, reset_request
+from src.utils.logKit.filters import (DedupFilter, MaxLevelFilter, RateLimitFilter, RequestContextFilter,
+                                     SamplingFilter)
 from src.utils.logKit.formatters import JSONLogFormatter
-from src.utils.logKit.handlers import MyRichHandler
 from src.utils.logKit.settings import LogLevel, change_settings
 
 __all__ = [
+    "DedupFilter",
     "JSONLogFormatter",
     "LogLevel",
     "MaxLevelFilter",
     "MyRichHandler",
+    "RateLimitFilter",
+    "RequestContext",
+    "RequestContextFilter",
+    "SamplingFilter",
+    "bind_request",
     "change_settings",
+    "configure_levels",
+    "current_request",
     "get_logger",
+    "reset_request",
 ]
+
+
+def __getattr__(name: str):
+    # MyRichHandler importa rich: só carrega quando usado (dictConfig usa o caminho completo)
+    if name == "MyRichHandler":
+        from src.utils.logKit.handlers import MyRichHandler
+        return MyRichHandler
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -79,6 +79,10 @@ def write_dotenv(path: Path, json_file_name: str = "logging.conf.json") -> None:
 
 def write_json(path: Path) -> Path:
     path = path.resolve()
+    # Filtros com estado (buckets, janela de dedup): dictConfig cria uma instância
+    # por nome e a compartilha entre os handlers, então cada handler tem os seus.
+    rate_limit = {"()": "src.utils.logKit.filters.RateLimitFilter", "rate": 10, "burst": 20}
+    dedup = {"()": "src.utils.logKit.filters.DedupFilter", "window": 1.0}
     # Use os importable module paths for custom classes
     data = json.dumps(
         {
@@ -104,17 +108,33 @@ def write_json(path: Path) -> Path:
                         "taskName",
                         "args",
                         "context",
+                        "suppressed",
+                        "request_id",
+                        "route",
+                        "user_id",
                     ],
                 },
                 "console": {"format": "%(message)s", "datefmt": "[%X]"},
             },
             "filters": {
-                "max_level_info": {"()": "utils.logKit.filters.MaxLevelFilter", "max_level": "INFO"}
+                "max_level_info": {"()": "src.utils.logKit.filters.MaxLevelFilter", "max_level": "INFO"},
+                "sample": {
+                    "()": "src.utils.logKit.filters.SamplingFilter",
+                    "rate": 1.0,
+                    "levels": {"DEBUG": 1.0},
+                    "loggers": {},
+                },
+                "rate_limit_console": rate_limit,
+                "dedup_console": dedup,
+                "rate_limit_file": rate_limit,
+                "dedup_file": dedup,
+                "request_context": {"()": "src.utils.logKit.filters.RequestContextFilter"},
             },
             "handlers": {
                 "queue": {
                     "class": "logging.handlers.QueueHandler",
-                    "queue": "ext://queue.Queue"
+                    "queue": "ext://queue.Queue",
+                    "filters": ["request_context"],
                 },
                 "console": {
                     "()": "src.utils.logKit.handlers.MyRichHandler",
@@ -129,6 +149,7 @@ def write_json(path: Path) -> Path:
                     "show_path": True,
                     "file": "stdout",
                     "level": "DEBUG",
+                    "filters": ["rate_limit_console", "dedup_console"],
                 },
                 "file": {
                     "class": "logging.handlers.RotatingFileHandler",
@@ -138,6 +159,7 @@ def write_json(path: Path) -> Path:
                     "backupCount": 5,
                     "encoding": "utf-8",
                     "level": "INFO",
+                    "filters": ["rate_limit_file", "dedup_file"],
                 },
             },
             "root": {"handlers": ["console", "queue"]},
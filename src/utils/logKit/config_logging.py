@@ -1,13 +1,24 @@
 import atexit
 import json
 import logging
+import threading
+from collections.abc import Mapping
 from logging.config import dictConfig
 from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
+from src.utils.logKit.filters import RequestContextFilter
+from src.utils.logKit.pipeline import install_queue_pipeline
 from src.utils.logKit.settings import (
     LogLevel,
     default_logger_level,
+    log_async,
+    log_batch_size,
+    log_file,
+    log_file_backups,
+    log_file_max_bytes,
+    log_outputs,
+    log_queue_size,
     logging_config_json,
     logs_dir,
     setup_logger_level,
@@ -18,6 +29,14 @@ from src.utils.logKit.settings import (
 _setup_logging_done: bool = False
 _default_queue_listener: QueueListener | None = None
 
+# Registro de loggers já configurados: nome -> (nível pedido em get_logger, logger)
+# Chamadas repetidas com o mesmo nível não tocam no logger (setLevel limpa o
+# cache de níveis de todos os loggers do processo)
+_registro: dict[str, tuple[LogLevel | None, logging.Logger]] = {}
+# Níveis definidos em runtime por configure_levels (prevalecem sobre o do código)
+_niveis_runtime: dict[str, LogLevel] = {}
+_registro_lock = threading.Lock()
+
 _logger = logging.getLogger(setup_logger_name)
 _logger.setLevel(setup_logger_level)
 
@@ -26,8 +45,11 @@ def _get_default_config() -> dict:
     """
     Retorna configuração padrão de logging caso o arquivo não exista
     Configuração minimalista para Railway
+
+    Com LOG_ASYNC, as saídas (LOG_OUTPUTS: stdout e/ou file) escrevem em lotes
+    e ficam atrás da fila montada em `_setup_logging`.
     """
-    return {
+    config = {
         "version": 1,
         "disable_existing_loggers": False,
         "formatters": {
@@ -49,6 +71,27 @@ def _get_default_config() -> dict:
         }
     }
 
+    if log_async:
+        saidas = {
+            "stdout": {
+                "()": "src.utils.logKit.pipeline.BatchedStreamHandler",
+                "formatter": "simple",
+                "stream": "ext://sys.stdout",
+                "level": "INFO"
+            },
+            "file": {
+                "()": "src.utils.logKit.pipeline.BatchedJSONLFileHandler",
+                "filename": str(log_file),
+                "max_bytes": log_file_max_bytes,
+                "backup_count": log_file_backups,
+                "level": "INFO"
+            },
+        }
+        config["handlers"] = {nome: saidas[nome] for nome in log_outputs if nome in saidas}
+        config["root"]["handlers"] = list(config["handlers"])
+
+    return config
+
 
 def _setup_logging() -> None:
     global _setup_logging_done, _default_queue_listener
@@ -127,6 +170,21 @@ def _setup_logging() -> None:
     except Exception as e:
         _logger.warning(f"Could not setup QueueHandler: {e}")
 
+    # Modo produção: todos os handlers do root passam a rodar na thread do listener
+    if log_async and _default_queue_listener is None:
+        try:
+            _default_queue_listener = install_queue_pipeline(queue_size=log_queue_size, batch_size=log_batch_size)
+            atexit.register(_stop_queue_listener)
+            _logger.debug("Root handlers moved behind a bounded queue (LOG_ASYNC)")
+        except Exception as e:
+            _logger.warning(f"Could not setup async logging pipeline: {e}")
+
+    # request_id/rota/usuário são lidos na thread que gera o log: filtro nos handlers do root
+    # (no modo assíncrono, o QueueHandler), antes de o registro ir para a fila
+    for handler in logging.getLogger().handlers:
+        if not any(isinstance(filtro, RequestContextFilter) for filtro in handler.filters):
+            handler.addFilter(RequestContextFilter())
+
     _setup_logging_done = True
 
 
@@ -138,10 +196,31 @@ def _stop_queue_listener() -> None:
     _default_queue_listener.stop()
 
 
+def _resolver_nivel(name: str, level: LogLevel | None) -> LogLevel:
+    """Nível efetivo de um logger: runtime > pedido em get_logger > padrão do ENV"""
+    if name in _niveis_runtime:
+        return _niveis_runtime[name]
+
+    if level is None:
+        _logger.debug(f"Level {default_logger_level!r} used by 'ENV' to configure {name!r} logger.")
+        return default_logger_level
+
+    try:
+        validate_level(level)
+        _logger.debug(f"Level {level!r} used by 'get_logger' to configure {name!r} logger.")
+        return level
+    except Exception as e:
+        _logger.warning(f"Could not set level: {e}")
+        return default_logger_level
+
+
 def get_logger(name: str = "", level: LogLevel | None = None) -> logging.Logger:
     """
     Obtém um logger configurado
 
+    O nome e o nível são resolvidos uma vez; chamadas seguintes com o mesmo
+    nível devolvem o logger memoizado sem chamar `setLevel`.
+
     Args:
         name: Nome do logger
         level: Nível de log (DEBUG, INFO, WARNING, ERROR, CRITICAL)
@@ -149,6 +228,10 @@ def get_logger(name: str = "", level: LogLevel | None = None) -> logging.Logger:
     Returns:
         Logger configurado
     """
+    registrado = _registro.get(name)
+    if registrado is not None and registrado[0] == level:
+        return registrado[1]
+
     if not _setup_logging_done:
         try:
             _setup_logging()
@@ -161,23 +244,37 @@ def get_logger(name: str = "", level: LogLevel | None = None) -> logging.Logger:
             )
             _logger.warning(f"Failed to setup logging, using basicConfig: {e}")
 
-    logger = logging.getLogger(name)
+    with _registro_lock:
+        logger = logging.getLogger(name)
+        nivel = logging.getLevelName(_resolver_nivel(name, level))
 
-    if level is not None:
-        try:
-            validate_level(level)
-            _logger.debug(
-                f"Level {level!r} used by 'get_logger' to configure {name!r} logger."
-            )
-            logger.setLevel(level)
-        except Exception as e:
-            _logger.warning(f"Could not set level: {e}")
-            logger.setLevel(default_logger_level)
-    else:
-        env_level = default_logger_level
-        _logger.debug(
-            f"Level {env_level!r} used by 'ENV' to configure {name!r} logger."
-        )
-        logger.setLevel(env_level)
+        if logger.level != nivel:
+            logger.setLevel(nivel)
+
+        _registro[name] = (level, logger)
+
+    return logger
+
+
+def configure_levels(levels: Mapping[str, LogLevel]) -> None:
+    """
+    Altera o nível de vários loggers em runtime
+
+    Valida todos os níveis antes de aplicar e invalida o cache de níveis do
+    `logging` uma única vez para o lote. Os níveis definidos aqui prevalecem
+    sobre os passados depois a `get_logger`.
+
+    Args:
+        levels: Nome do logger -> nível ("" é o root)
+
+    Raises:
+        ValueError: Se algum nível for inválido (nada é alterado)
+    """
+    niveis = {name: validate_level(level) for name, level in levels.items()}
 
-    return logger
\ No newline at end of file
+    with _registro_lock:
+        _niveis_runtime.update(niveis)
+        for name, level in niveis.items():
+            # Atribuição direta: setLevel limparia o cache a cada logger do lote
+            logging.getLogger(name).level = logging.getLevelName(level)
+        logging.Logger.manager._clear_cache()
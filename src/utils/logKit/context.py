@@ -0,0 +1,37 @@
+"""
+Contexto da requisição para os logs (request_id, rota, usuário)
+
+O middleware da API cria um RequestContext por requisição e o publica num
+ContextVar; o RequestContextFilter copia os campos para cada LogRecord. O
+objeto é mutável de propósito: dependencies que rodam no threadpool (cópia
+do contexto) ainda conseguem preencher `user_id` para o resto da requisição.
+"""
+
+from contextvars import ContextVar, Token
+
+
+class RequestContext:
+    """Campos de correlação de uma requisição"""
+
+    __slots__ = ("request_id", "route", "user_id")
+
+    def __init__(self, request_id: str, route: str | None = None, user_id: int | None = None) -> None:
+        self.request_id = request_id
+        self.route = route
+        self.user_id = user_id
+
+
+request_context: ContextVar[RequestContext | None] = ContextVar("request_context", default=None)
+
+
+def bind_request(context: RequestContext) -> Token:
+    """Publica o contexto da requisição atual; devolve o token para `reset_request`"""
+    return request_context.set(context)
+
+
+def reset_request(token: Token) -> None:
+    request_context.reset(token)
+
+
+def current_request() -> RequestContext | None:
+    return request_context.get()
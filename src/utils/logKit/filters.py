@@ -1,4 +1,11 @@
 import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from src.utils.logKit.context import request_context
 
 
 class MaxLevelFilter(logging.Filter):
@@ -16,4 +23,177 @@ class MaxLevelFilter(logging.Filter):
         # se o número do level do log for menor ou igual ao max_level que
         # definimos no filter o log passa.
         # INFO 20 só aceitará loggers INFO e DEBUG.
-        return record.levelno <= self.max_level
\ No newline at end of file
+        return record.levelno <= self.max_level
+
+
+def _level_number(level: str) -> int:
+    return logging.getLevelNamesMapping().get(level.upper(), 50)
+
+
+def _add_summary(record: logging.LogRecord, suppressed: int, text: str) -> None:
+    """Anexa o resumo dos registros suprimidos à mensagem (e como extra `suppressed`)"""
+    record.msg = f"{record.getMessage()} ({text % suppressed})"
+    record.args = ()
+    record.suppressed = suppressed
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Amostragem probabilística por logger/level
+
+    Passa só uma fração dos registros até `max_level` (WARNING e acima passam
+    sempre, no padrão). A taxa vem, nesta ordem, de `loggers` (nome exato do
+    logger), de `levels` (nome do level) ou de `rate`.
+
+    JSON config:
+        "sample": {"()": "src.utils.logKit.filters.SamplingFilter", "rate": 1.0,
+                   "levels": {"DEBUG": 0.01}, "loggers": {"LoggerEstoqueController": 0.1}}
+    """
+
+    def __init__(self, rate: float = 1.0, levels: Mapping[str, float] | None = None,
+                 loggers: Mapping[str, float] | None = None, max_level: str = "INFO",
+                 seed: int | None = None) -> None:
+        super().__init__()
+        self.rate = rate
+        self.levels = {_level_number(level): taxa for level, taxa in (levels or {}).items()}
+        self.loggers = dict(loggers or {})
+        self.max_level = _level_number(max_level)
+        self._random = random.Random(seed).random
+        self._rates: dict[tuple[str, int], float] = {}
+
+    def _rate_for(self, record: logging.LogRecord) -> float:
+        chave = (record.name, record.levelno)
+        taxa = self._rates.get(chave)
+        if taxa is None:
+            taxa = self.loggers.get(record.name, self.levels.get(record.levelno, self.rate))
+            self._rates[chave] = taxa
+        return taxa
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+
+        taxa = self._rate_for(record)
+        return taxa >= 1 or self._random() < taxa
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket por template de mensagem
+
+    O template é o ponto de chamada (logger + arquivo + linha), o que também
+    agrupa mensagens montadas com f-string. Cada template pode emitir `rate`
+    registros por segundo, com rajadas de até `burst`; o primeiro registro
+    que passa depois de uma supressão leva "N suprimidas" na mensagem.
+
+    JSON config:
+        "rate_limit": {"()": "src.utils.logKit.filters.RateLimitFilter", "rate": 10, "burst": 20}
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 20, max_level: str = "INFO") -> None:
+        super().__init__()
+        if rate <= 0 or burst < 1:
+            raise ValueError("RateLimitFilter: rate must be > 0 and burst >= 1")
+
+        self.rate = rate
+        self.burst = burst
+        self.max_level = _level_number(max_level)
+        self._clock = time.monotonic
+        self._lock = threading.Lock()
+        # template -> [tokens, último reabastecimento, suprimidos]
+        self._buckets: dict[tuple[str, str, int], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+
+        chave = (record.name, record.pathname, record.lineno)
+        agora = self._clock()
+
+        with self._lock:
+            bucket = self._buckets.get(chave)
+            if bucket is None:
+                bucket = self._buckets[chave] = [float(self.burst), agora, 0]
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (agora - bucket[1]) * self.rate)
+                bucket[1] = agora
+
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+
+            bucket[0] -= 1
+            suprimidos, bucket[2] = bucket[2], 0
+
+        if suprimidos:
+            _add_summary(record, suprimidos, "%d suprimidas")
+        return True
+
+
+class DedupFilter(logging.Filter):
+    """
+    Descarta mensagens idênticas repetidas dentro de uma janela
+
+    Mesma mensagem (logger + level + texto final) dentro de `window`
+    segundos é suprimida; a primeira repetição depois da janela passa com
+    "repetida N vezes". Guarda no máximo `max_entries` mensagens recentes.
+
+    JSON config:
+        "dedup": {"()": "src.utils.logKit.filters.DedupFilter", "window": 1.0}
+    """
+
+    def __init__(self, window: float = 1.0, max_entries: int = 1024, max_level: str = "CRITICAL") -> None:
+        super().__init__()
+        self.window = window
+        self.max_entries = max_entries
+        self.max_level = _level_number(max_level)
+        self._clock = time.monotonic
+        self._lock = threading.Lock()
+        # mensagem -> [início da janela, suprimidos]
+        self._seen: OrderedDict[tuple[str, int, str], list] = OrderedDict()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+
+        chave = (record.name, record.levelno, record.getMessage())
+        agora = self._clock()
+
+        with self._lock:
+            visto = self._seen.get(chave)
+            if visto is not None and agora - visto[0] < self.window:
+                visto[1] += 1
+                return False
+
+            suprimidos = visto[1] if visto is not None else 0
+            self._seen[chave] = [agora, 0]
+            self._seen.move_to_end(chave)
+            while len(self._seen) > self.max_entries:
+                self._seen.popitem(last=False)
+
+        if suprimidos:
+            _add_summary(record, suprimidos, "repetida %d vezes")
+        return True
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Injeta request_id, route e user_id da requisição atual em cada registro
+
+    Os campos ficam None fora de uma requisição. Precisa rodar na thread que
+    gerou o log: no pipeline assíncrono vai no QueueHandler, não nos handlers
+    de saída (que rodam na thread do listener).
+
+    JSON config:
+        "request_context": {"()": "src.utils.logKit.filters.RequestContextFilter"}
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        contexto = request_context.get()
+        if contexto is None:
+            record.request_id = record.route = record.user_id = None
+        else:
+            record.request_id = contexto.request_id
+            record.route = contexto.route
+            record.user_id = contexto.user_id
+        return True
@@ -1,9 +1,15 @@
 import logging
 import json
 from datetime import datetime
-from typing import Any
+from operator import itemgetter
+from typing import Any, Literal
 from zoneinfo import ZoneInfo
 
+try:
+    import orjson
+except ImportError:  # encoder opcional: sem orjson usa o json da stdlib
+    orjson = None
+
 TZ_IDENTIFIER = "America/Sao_Paulo"
 TZ = ZoneInfo(TZ_IDENTIFIER)
 
@@ -32,53 +38,127 @@ LOG_RECORD_KEYS = [
     "message",
 ]
 
+# Campos de correlação da requisição (RequestContextFilter); omitidos quando None
+CONTEXT_KEYS = [
+    "request_id",
+    "route",
+    "user_id",
+]
+
+# Atributos padrão do LogRecord e de contexto (o resto é extra, vindo de `extra=` ou de filtros)
+_STANDARD_KEYS = frozenset(LOG_RECORD_KEYS) | frozenset(CONTEXT_KEYS) | {"asctime"}
+# Atributos que todo LogRecord desta versão do Python tem desde o construtor
+_RECORD_INIT_KEYS = tuple(vars(logging.LogRecord("", logging.INFO, "", 0, "", (), None)))
+# Atributos que podem ser None (omitidos da saída, como no formato original)
+_NULLABLE_KEYS = frozenset({"exc_info", "exc_text", "stack_info", "funcName", "thread", "threadName",
+                            "process", "processName", "taskName"})
+
+# Extras não declarados em include_keys: incluir, ignorar ou levantar ValueError
+UnknownExtras = Literal["include", "ignore", "raise"]
+
 
 class JSONLogFormatter(logging.Formatter):
-    def __init__(self, include_keys: list[str] | None = None, datefmt: str = "%Y-%m-%dT%H:%M:%S%z") -> None:
+    """
+    Formatter JSON (uma linha por registro)
+
+    O plano de chaves é montado uma vez no construtor; por registro sobra um
+    dict comprehension, o timestamp (cacheado por segundo) e o encoder
+    (orjson quando instalado, json da stdlib como fallback).
+    """
+
+    def __init__(self, include_keys: list[str] | None = None, datefmt: str | None = "%Y-%m-%dT%H:%M:%S%z",
+                 unknown_extras: UnknownExtras = "include") -> None:
         super().__init__()
-        self.include_keys = (include_keys if include_keys is not None else LOG_RECORD_KEYS)
+        if unknown_extras not in ("include", "ignore", "raise"):
+            raise ValueError(f"unknown_extras must be include, ignore or raise, not {unknown_extras!r}")
+
+        self.include_keys = (include_keys if include_keys is not None else LOG_RECORD_KEYS + CONTEXT_KEYS)
         self.datefmt = datefmt
+        self.unknown_extras = unknown_extras
+
+        # Plano: atributos sempre presentes saem de uma vez via itemgetter; os que
+        # podem faltar (taskName, message, contexto) e os que podem ser None são tratados à parte
+        record_keys = [key for key in self.include_keys if key in _STANDARD_KEYS and key != "asctime"]
+        self._getter_keys = tuple(key for key in record_keys if key in _RECORD_INIT_KEYS)
+        self._getter = itemgetter(*self._getter_keys) if len(self._getter_keys) > 1 else None
+        self._optional_keys = tuple(key for key in record_keys if key not in _RECORD_INIT_KEYS)
+        self._nullable_keys = tuple(key for key in self._getter_keys if key in _NULLABLE_KEYS)
+        self._declared_extras = frozenset(key for key in self.include_keys if key not in _STANDARD_KEYS)
+        self._include_created = "created" in record_keys
+        self._include_message = "message" in self.include_keys
+        self._include_exc_info = "exc_info" in record_keys
+        self._include_stack_info = "stack_info" in record_keys
+
+        # Sem frações de segundo no formato, o texto do timestamp muda no máximo uma vez por segundo
+        self._cache_timestamp = datefmt is not None and "%f" not in datefmt
+        self._timestamp_cache: tuple[int, str] = (-1, "")
 
     def format(self, record: logging.LogRecord) -> str:
-        dict_record: dict[str, Any] = {
-            key: getattr(record, key) for key in self.include_keys
-            if key in LOG_RECORD_KEYS and getattr(record, key, None) is not None
-        }
+        if self._include_message:
+            record.message = record.getMessage()
+
+        attrs = record.__dict__
+        if self._getter is not None:
+            dict_record: dict[str, Any] = dict(zip(self._getter_keys, self._getter(attrs)))
+        else:
+            dict_record = {key: attrs[key] for key in self._getter_keys}
 
-        if "created" in dict_record:
-            # sobrescreve metodo formatTime para retornar datetime com timezone
-            dict_record["created"] = self.formatTime(record, self.datefmt)
+        for key in self._nullable_keys:
+            if dict_record[key] is None:
+                del dict_record[key]
+        for key in self._optional_keys:
+            value = attrs.get(key)
+            if value is not None:
+                dict_record[key] = value
 
-        if "message" in self.include_keys:
-            dict_record["message"] = record.getMessage()
+        if self._include_created:
+            dict_record["created"] = self._format_created(record)
 
-        if "exc_info" in dict_record and record.exc_info:
+        if self._include_exc_info and record.exc_info:
             # formatação para str das informações de exceções
             dict_record["exc_info"] = self.formatException(record.exc_info)
 
-        if "stack_info" in dict_record and record.stack_info:
+        if self._include_stack_info and record.stack_info:
             # Formatação do valor da stack de exceção para str
             dict_record["stack_info"] = self.formatStack(record.stack_info)
 
-        # caso tenha extras no log
-        for key, val in vars(record).items():
-            if key in LOG_RECORD_KEYS:
-                continue
+        # caso tenha extras no log (contagem de atributos evita o diff de conjuntos no caso comum)
+        excedente = len(attrs) - len(_RECORD_INIT_KEYS) - ("message" in attrs) - ("asctime" in attrs)
+        if excedente > 0:
+            excedente -= ("request_id" in attrs) + ("route" in attrs) + ("user_id" in attrs)
+        if excedente > 0:
+            for key in attrs.keys() - _STANDARD_KEYS:
+                if key in self._declared_extras or self.unknown_extras == "include":
+                    dict_record[key] = attrs[key]
+                elif self.unknown_extras == "raise":
+                    msg = f"Key {key!r} does not exist in 'include_keys'"
+                    raise ValueError(msg)
+
+        return self._dumps(dict_record)
 
-            if key not in self.include_keys:
-                if key == 'asctime':
-                    continue
-                # gera erro caso a chave não esteja sendo do include_keys
-                msg = f"Key {key!r} does not exist in 'include_keys'"
-                raise ValueError(msg)
+    @staticmethod
+    def _dumps(dict_record: dict[str, Any]) -> str:
+        # default=str: um extra não serializável vira texto em vez de derrubar o log
+        if orjson is not None:
+            try:
+                return orjson.dumps(dict_record, default=str).decode()
+            except TypeError:
+                pass  # ex.: inteiro maior que 64 bits; a stdlib aceita
+        return json.dumps(dict_record, default=str)
 
-            dict_record[key] = val
+    def _format_created(self, record: logging.LogRecord) -> str:
+        if not self._cache_timestamp:
+            return self.formatTime(record, self.datefmt)
 
-        return json.dumps(dict_record)
+        segundo = int(record.created)
+        cache = self._timestamp_cache
+        if cache[0] != segundo:
+            cache = self._timestamp_cache = (segundo, datetime.fromtimestamp(segundo, tz=TZ).strftime(self.datefmt))
+        return cache[1]
 
     def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
         date = datetime.fromtimestamp(record.created, tz=TZ)
         if datefmt:
             return date.strftime(datefmt)
 
-        return date.isoformat()
\ No newline at end of file
+        return date.isoformat()
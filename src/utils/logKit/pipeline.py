@@ -0,0 +1,233 @@
+"""
+Pipeline de logging não bloqueante
+
+As threads da aplicação só enfileiram o registro (QueueHandler); uma thread
+de fundo (BatchQueueListener) drena a fila em lotes e entrega cada lote aos
+handlers de saída, que escrevem o lote inteiro de uma vez (uma escrita e um
+flush por lote). Rotação do arquivo acontece na thread do listener e a
+compressão (gzip) numa thread própria, fora do caminho da requisição.
+
+Fila limitada: com a fila cheia o registro é descartado e contado; o
+listener publica um aviso com o total descartado no próximo lote.
+"""
+
+import gzip
+import logging
+import os
+import queue
+import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import TextIO
+
+from src.utils.logKit.formatters import JSONLogFormatter
+
+
+class DropQueueHandler(QueueHandler):
+    """QueueHandler com fila limitada: descarta e conta quando a fila está cheia"""
+
+    def __init__(self, queue_: queue.Queue) -> None:
+        super().__init__(queue_)
+        self.dropped = 0
+        self.listener: "BatchQueueListener | None" = None
+        self._dropped_lock = threading.Lock()
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+class BatchQueueListener(QueueListener):
+    """QueueListener que entrega os registros aos handlers em lotes"""
+
+    def __init__(self, queue_: queue.Queue, *handlers: logging.Handler, batch_size: int = 256,
+                 respect_handler_level: bool = True, source: DropQueueHandler | None = None) -> None:
+        super().__init__(queue_, *handlers, respect_handler_level=respect_handler_level)
+        self.batch_size = batch_size
+        self.source = source
+        self._dropped_reported = 0
+
+    def enqueue_sentinel(self) -> None:
+        # Bloqueante: com a fila cheia put_nowait perderia o sentinel e o stop() travaria
+        self.queue.put(self._sentinel)
+
+    def _next_batch(self) -> tuple[list[logging.LogRecord], bool]:
+        """Espera o primeiro registro e junta os que já estiverem na fila (sem esperar)"""
+        batch = []
+        record = self.dequeue(True)
+        while True:
+            if record is self._sentinel:
+                return batch, True
+            batch.append(self.prepare(record))
+            if len(batch) >= self.batch_size:
+                return batch, False
+            try:
+                record = self.dequeue(False)
+            except queue.Empty:
+                return batch, False
+
+    def _dropped_record(self) -> logging.LogRecord | None:
+        if self.source is None or self.source.dropped == self._dropped_reported:
+            return None
+
+        total = self.source.dropped
+        novos = total - self._dropped_reported
+        self._dropped_reported = total
+        return logging.LogRecord(__name__, logging.WARNING, __file__, 0,
+                                 "%d registros de log descartados (fila cheia, total %d)", (novos, total), None)
+
+    def handle_batch(self, batch: list[logging.LogRecord]) -> None:
+        for handler in self.handlers:
+            records = [
+                record for record in batch
+                if (not self.respect_handler_level or record.levelno >= handler.level) and handler.filter(record)
+            ]
+            if not records:
+                continue
+
+            if hasattr(handler, "emit_batch"):
+                with handler.lock:
+                    handler.emit_batch(records)
+            else:
+                for record in records:
+                    handler.handle(record)
+
+    def _monitor(self) -> None:
+        has_task_done = hasattr(self.queue, "task_done")
+        while True:
+            batch, stop = self._next_batch()
+            dequeued = len(batch) + stop
+
+            dropped = self._dropped_record()
+            if dropped is not None:
+                batch.append(dropped)
+
+            if batch:
+                self.handle_batch(batch)
+
+            if has_task_done:
+                for _ in range(dequeued):
+                    self.queue.task_done()
+
+            if stop:
+                break
+
+
+class BatchedStreamHandler(logging.StreamHandler):
+    """StreamHandler que escreve um lote por chamada (uma escrita e um flush)"""
+
+    def __init__(self, stream: TextIO | None = None) -> None:
+        super().__init__(stream if stream is not None else sys.stdout)
+
+    def emit_batch(self, records: list[logging.LogRecord]) -> None:
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+
+        if lines:
+            self.stream.write(self.terminator.join(lines) + self.terminator)
+            self.flush()
+
+
+class BatchedJSONLFileHandler(logging.Handler):
+    """
+    Arquivo JSONL escrito em lotes, com rotação por tamanho
+
+    Ao passar de `max_bytes` o arquivo é renomeado com timestamp e um novo
+    é aberto; o antigo é comprimido (gzip) numa thread separada, mantendo
+    os `backup_count` mais recentes.
+    """
+
+    def __init__(self, filename: str | Path, max_bytes: int = 5 * 1024 * 1024, backup_count: int = 5,
+                 encoding: str = "utf-8") -> None:
+        super().__init__()
+        self.path = Path(filename)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.encoding = encoding
+        self.setFormatter(JSONLogFormatter())
+
+        self._stream = self.path.open("a", encoding=encoding)
+        self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-compress")
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.emit_batch([record])
+
+    def emit_batch(self, records: list[logging.LogRecord]) -> None:
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+
+        if not lines:
+            return
+
+        self._stream.write("\n".join(lines) + "\n")
+        self._stream.flush()
+
+        if self.max_bytes > 0 and self._stream.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        self._stream.close()
+        rotated = self.path.with_name(f"{self.path.name}.{datetime.now():%Y%m%d-%H%M%S-%f}")
+        os.replace(self.path, rotated)
+        self._stream = self.path.open("a", encoding=self.encoding)
+        self._compressor.submit(self._compress, rotated)
+
+    def _compress(self, rotated: Path) -> None:
+        try:
+            with rotated.open("rb") as origem, gzip.open(f"{rotated}.gz", "wb") as destino:
+                shutil.copyfileobj(origem, destino)
+            rotated.unlink()
+
+            backups = sorted(self.path.parent.glob(f"{self.path.name}.*.gz"))
+            for antigo in backups[:max(len(backups) - self.backup_count, 0)]:
+                antigo.unlink()
+        except Exception:
+            logging.getLogger(__name__).exception("Erro ao comprimir log rotacionado: %s", rotated)
+
+    def close(self) -> None:
+        with self.lock:
+            if not self._stream.closed:
+                self._stream.close()
+        self._compressor.shutdown(wait=True)
+        super().close()
+
+
+def install_queue_pipeline(logger: logging.Logger | None = None, queue_size: int = 10_000,
+                           batch_size: int = 256) -> BatchQueueListener:
+    """
+    Move os handlers do logger (root por padrão) para trás de uma fila
+
+    O logger passa a ter só um DropQueueHandler; os handlers originais rodam
+    na thread do listener. Retorna o listener já iniciado (chamar `stop()`
+    no encerramento para drenar a fila).
+    """
+    logger = logger if logger is not None else logging.getLogger()
+    handlers = list(logger.handlers)
+
+    fila: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = DropQueueHandler(fila)
+    listener = BatchQueueListener(fila, *handlers, batch_size=batch_size, source=queue_handler)
+    queue_handler.listener = listener
+
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(queue_handler)
+
+    listener.start()
+    return listener
@@ -52,6 +52,15 @@ setup_logger_level = getenv("SETUP_LOGGER_LEVEL", "WARNING")
 
 default_logger_level = getenv("DEFAULT_LOGGER_LEVEL", "WARNING")
 
+# Modo produção: registros vão para uma fila e são escritos em lotes por uma thread de fundo
+log_async = getenv("LOG_ASYNC", "False").lower() == "true"
+log_outputs = [saida.strip() for saida in getenv("LOG_OUTPUTS", "stdout").split(",") if saida.strip()]
+log_file = logs_dir / getenv("LOG_FILE", "app.jsonl")
+log_file_max_bytes = int(getenv("LOG_FILE_MAX_BYTES", str(5 * 1024 * 1024)))
+log_file_backups = int(getenv("LOG_FILE_BACKUPS", "5"))
+log_queue_size = int(getenv("LOG_QUEUE_SIZE", "10000"))
+log_batch_size = int(getenv("LOG_BATCH_SIZE", "256"))
+
 
 def validate() -> None:
     """Valida configurações básicas (tolerante a falhas)"""
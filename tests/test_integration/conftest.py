@@ -130,7 +130,7 @@ def produto_teste(db_session, produto_controller):
         modelo="Inspiron 15",
         categoria="Eletrônicos",
         valor=3500.00,
-        quantidade=10,
+        quantidade_estoque=10,
         vlr_compra=2800.00
     )
 
@@ -0,0 +1,90 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.api.app import app
+from src.api.middleware.auth_middleware import get_current_user
+from src.database.connection import get_sessao, url_assincrona
+from src.database.models import Base, Produtos, Usuarios
+
+
+@pytest.fixture
+def banco_arquivo(tmp_path):
+    """Banco SQLite em arquivo, compartilhado entre engine síncrono e assíncrono"""
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+
+    sessao = sessionmaker(bind=engine)()
+    vendedor = Usuarios(username="vendedor_async", email="async@loja.com", senha_hash="x",
+                        nome_completo="Vendedor Async", tipo_usuario="vendedor")
+    produto = Produtos(nome="Mouse", modelo="M1", categoria="Periféricos", valor=100, vlr_compra=50,
+                       quantidade_estoque=10)
+    sessao.add_all([vendedor, produto])
+    sessao.commit()
+    ids = {"vendedor_id": vendedor.id_usuario, "produto_id": produto.codigo}
+    sessao.close()
+
+    yield url, ids, engine
+
+    engine.dispose()
+
+
+@pytest.fixture
+def api_async(banco_arquivo):
+    """API com as rotas quentes usando AsyncSession (aiosqlite)"""
+    url, ids, _ = banco_arquivo
+    async_engine = create_async_engine(url_assincrona(url))
+    fabrica = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    async def _get_sessao():
+        async with fabrica() as db:
+            yield db
+
+    app.dependency_overrides[get_sessao] = _get_sessao
+    app.dependency_overrides[get_current_user] = lambda: {
+        "user_id": ids["vendedor_id"], "username": "vendedor_async", "tipo_usuario": "vendedor"
+    }
+    yield TestClient(app), ids
+    app.dependency_overrides.clear()
+
+
+class TestModoAssincrono:
+    """Rotas quentes funcionando sobre AsyncSession"""
+
+    def test_url_assincrona(self):
+        assert url_assincrona("sqlite:///./data/loja.db") == "sqlite+aiosqlite:///./data/loja.db"
+        assert url_assincrona("postgresql://u:s@host:5432/loja") == "postgresql+asyncpg://u:s@host:5432/loja"
+
+        with pytest.raises(ValueError):
+            url_assincrona("mssql+pyodbc://host/loja")
+
+    def test_fluxo_carrinho_e_checkout(self, api_async, banco_arquivo):
+        client, ids = api_async
+        produto_id = ids["produto_id"]
+
+        resposta = client.post("/sales/cart/items", json={"produto_id": produto_id, "quantidade": 3})
+        assert resposta.status_code == 201, resposta.text
+
+        carrinho = client.get("/sales/cart").json()
+        assert carrinho["total_itens"] == 1
+        assert carrinho["itens"][0]["nome"] == "Mouse"
+
+        disponibilidade = client.get(f"/stock/{produto_id}/availability", params={"quantidade": 7}).json()
+        assert disponibilidade["disponivel"] is True
+        assert disponibilidade["estoque_disponivel"] == 7
+
+        busca = client.get("/products/search", params={"nome": "Mouse"})
+        assert busca.status_code == 200
+
+        checkout = client.post("/sales/checkout", json={"forma_pagamento": "Debito"})
+        assert checkout.status_code == 201, checkout.text
+
+        _, _, engine = banco_arquivo
+        sessao = sessionmaker(bind=engine)()
+        produto = sessao.get(Produtos, produto_id)
+        assert produto.quantidade_estoque == 7
+        assert produto.quantidade_reservada == 0
+        sessao.close()
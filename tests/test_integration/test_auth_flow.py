@@ -1,3 +1,14 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from src.api.middleware import require_vendedor_or_above
+from src.database.models import Usuarios
+from src.services.security import JWTHandler, PasswordHandler
+from src.services.security.password_handler import ExecutorInline
 
 class TestAuthFlow:
     """Testes de fluxo de autenticação"""
@@ -61,3 +72,108 @@ class TestAuthFlow:
         )
 
         assert sucesso_login, "Login com nova senha falhou"
+
+    def test_login_refaz_hash_com_custo_antigo(self, db_session, auth_controller, monkeypatch):
+        """Hash com custo diferente do configurado é refeito no login"""
+        monkeypatch.setattr(JWTHandler, "SECRET_KEY", "teste-secret")
+        monkeypatch.setattr(PasswordHandler, "ROUNDS", 4)
+        auth_controller.registrar_usuario(db=db_session, username="maria", email="maria@test.com",
+                                          senha="Senha123!@#", nome_completo="Maria Souza", tipo_usuario="vendedor")
+
+        usuario = db_session.query(Usuarios).filter(Usuarios.username == "maria").one()
+        assert usuario.senha_hash.startswith("$2b$04$")
+
+        monkeypatch.setattr(PasswordHandler, "ROUNDS", 5)
+        sucesso, msg, _ = auth_controller.login(db=db_session, username="maria", senha="Senha123!@#")
+
+        assert sucesso, msg
+        db_session.refresh(usuario)
+        assert usuario.senha_hash.startswith("$2b$05$")
+        assert PasswordHandler.verify_password("Senha123!@#", usuario.senha_hash)
+
+    def test_executor_plugavel_e_versoes_async(self, monkeypatch):
+        """Hash/verificação funcionam com executor trocado e nas versões async"""
+        monkeypatch.setattr(PasswordHandler, "ROUNDS", 4)
+        PasswordHandler.configurar_executor(ExecutorInline())
+        try:
+            hash_senha = asyncio.run(PasswordHandler.hash_password_async("Senha123!@#"))
+
+            assert asyncio.run(PasswordHandler.verify_password_async("Senha123!@#", hash_senha))
+            assert not asyncio.run(PasswordHandler.verify_password_async("Errada123!@#", hash_senha))
+            assert not asyncio.run(PasswordHandler.verify_password_async("Senha123!@#", "hash-invalido"))
+        finally:
+            PasswordHandler.encerrar_executor()
+
+
+class TestCacheToken:
+    """Verificação de JWT uma vez por requisição e cache de tokens verificados"""
+
+    @pytest.fixture(autouse=True)
+    def chave_jwt(self, monkeypatch):
+        monkeypatch.setattr(JWTHandler, "SECRET_KEY", "teste-secret")
+        JWTHandler.limpar_cache()
+        yield
+        JWTHandler.limpar_cache()
+
+    @pytest.fixture
+    def contador_decode(self, monkeypatch):
+        chamadas = []
+        original = JWTHandler.decode_token.__func__
+
+        def _decode(cls, token):
+            chamadas.append(token)
+            return original(cls, token)
+
+        monkeypatch.setattr(JWTHandler, "decode_token", classmethod(_decode))
+        return chamadas
+
+    def _token(self, **kwargs) -> str:
+        return JWTHandler.create_access_token(
+            {"user_id": 1, "username": "vendedor_test", "tipo_usuario": "vendedor"}, **kwargs)
+
+    def test_token_repetido_vem_do_cache(self, contador_decode):
+        token = self._token()
+
+        primeiro = JWTHandler.verify_token(token)
+        primeiro["user_id"] = 999
+        segundo = JWTHandler.verify_token(token)
+
+        assert len(contador_decode) == 1
+        assert segundo["user_id"] == 1
+
+        with pytest.raises(HTTPException):
+            JWTHandler.verify_token(token, token_type="refresh")
+
+    def test_cache_expira_junto_com_token(self, contador_decode):
+        token = self._token(expires_delta=timedelta(seconds=-1))
+
+        for _ in range(2):
+            with pytest.raises(HTTPException) as erro:
+                JWTHandler.verify_token(token)
+            assert erro.value.detail == "Token expirado"
+
+        assert len(contador_decode) == 2
+
+    def test_cache_limitado_descarta_menos_usado(self, monkeypatch):
+        monkeypatch.setattr(JWTHandler, "CACHE_TAMANHO", 2)
+        tokens = [self._token(expires_delta=timedelta(minutes=i + 1)) for i in range(3)]
+
+        for token in tokens:
+            JWTHandler.verify_token(token)
+
+        assert len(JWTHandler._cache) == 2
+        assert JWTHandler._chave_cache(tokens[0]) not in JWTHandler._cache
+
+    def test_uma_verificacao_por_requisicao(self, contador_decode, monkeypatch):
+        monkeypatch.setattr(JWTHandler, "CACHE_TAMANHO", 0)
+        app = FastAPI()
+
+        @app.get("/rota", dependencies=[Depends(require_vendedor_or_above)])
+        def rota(user: dict = Depends(require_vendedor_or_above)):
+            return user
+
+        resposta = TestClient(app).get("/rota", headers={"Authorization": f"Bearer {self._token()}"})
+
+        assert resposta.status_code == 200
+        assert resposta.json()["username"] == "vendedor_test"
+        assert len(contador_decode) == 1
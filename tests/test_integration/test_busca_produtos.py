@@ -0,0 +1,171 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from src.api.app import app
+from src.database.busca import consulta_busca, pesquisar, reconstruir_indice, termos
+from src.database.connection import get_sessao
+from src.database.models import Base, Produtos
+
+CATALOGO = [
+    ("Notebook Dell", "Inspiron 15", "Eletrônicos"),
+    ("Cadeira Gamer", "Dell Edition", "Móveis"),
+    ("Mouse Logitech", "MX Master 3", "Periféricos"),
+    ("Teclado Mecânico", "K120", "Periféricos"),
+]
+
+
+@pytest.fixture
+def catalogo(db_session, produto_controller):
+    for nome, modelo, categoria in CATALOGO:
+        assert "sucesso" in produto_controller.cadastrar_produto(db_session, nome, modelo, categoria, 100.0, 10, 50.0)
+    return {p.nome: p.codigo for p in db_session.query(Produtos)}
+
+
+def _nomes(itens) -> list[str]:
+    return [item.nome for item in itens]
+
+
+class TestBuscaProdutos:
+    """Índice de busca: prefixo, sem acento, relevância e sincronização pelo controller"""
+
+    def test_termos_normalizados(self):
+        assert termos('  Eletrô-NICOS "MX"* ') == ["eletro", "nicos", "mx"]
+        assert termos("*'\"") == []
+
+    def test_prefixo_sem_acento(self, db_session, produto_controller, catalogo):
+        assert _nomes(produto_controller.pesquisar_produtos(db_session, "note del")) == ["Notebook Dell"]
+        assert _nomes(produto_controller.pesquisar_produtos(db_session, "ELETRONICO")) == ["Notebook Dell"]
+        assert _nomes(produto_controller.pesquisar_produtos(db_session, "mecan")) == ["Teclado Mecânico"]
+        assert produto_controller.pesquisar_produtos(db_session, "xyz") == []
+        assert produto_controller.pesquisar_produtos(db_session, "  ") == []
+
+    def test_nome_pesa_mais_que_modelo(self, db_session, produto_controller, catalogo):
+        itens = produto_controller.pesquisar_produtos(db_session, "dell")
+
+        assert _nomes(itens) == ["Notebook Dell", "Cadeira Gamer"]
+        assert itens[0].relevancia > itens[1].relevancia
+        assert itens[0]._fields == ("codigo", "nome", "modelo", "categoria", "valor", "quantidade_estoque",
+                                    "relevancia")
+
+    def test_paginacao(self, db_session, produto_controller, catalogo):
+        todos = _nomes(produto_controller.pesquisar_produtos(db_session, "perif"))
+        paginas = [_nomes(produto_controller.pesquisar_produtos(db_session, "perif", limite=1, pular=pular))
+                   for pular in (0, 1, 2)]
+
+        assert len(todos) == 2
+        assert paginas == [todos[:1], todos[1:], []]
+
+    def test_edicao_e_desativacao_sincronizam_indice(self, db_session, produto_controller, catalogo):
+        codigo = catalogo["Mouse Logitech"]
+
+        assert "sucesso" in produto_controller.editar_produto(db_session, codigo, nome="Mouse Razer")
+        assert produto_controller.pesquisar_produtos(db_session, "logitech") == []
+        assert _nomes(produto_controller.pesquisar_produtos(db_session, "razer")) == ["Mouse Razer"]
+
+        assert "sucesso" in produto_controller.desabilitar_produto(db_session, codigo)
+        assert produto_controller.pesquisar_produtos(db_session, "razer") == []
+
+    def test_reconstruir_indice_apos_carga_direta(self, db_session):
+        db_session.execute(insert(Produtos), [
+            {"nome": "Monitor LG", "modelo": "UltraGear", "categoria": "Monitores", "valor": 900, "vlr_compra": 600,
+             "quantidade_estoque": 3},
+            {"nome": "Monitor Samsung", "modelo": "Odyssey", "categoria": "Monitores", "valor": 900,
+             "vlr_compra": 600, "quantidade_estoque": 3, "ativo": False}])
+        assert pesquisar(db_session, "monitor") == []
+
+        assert reconstruir_indice(db_session) == 1
+        assert [linha.nome for linha in pesquisar(db_session, "monitor")] == ["Monitor LG"]
+
+    def test_consulta_postgres_usa_expressoes_dos_indices(self):
+        sql = str(consulta_busca("postgresql", "Note Dél").compile(dialect=postgresql.dialect()))
+
+        assert "@@ to_tsquery('simple'::regconfig" in sql
+        assert "setweight(to_tsvector('simple'::regconfig, f_unaccent(lower(coalesce(produtos.nome, ''))))" in sql
+        assert "f_unaccent(lower(coalesce(produtos.nome, ''))) LIKE" in sql
+
+
+class TestRotaBusca:
+    """GET /products/search?q=... com JSON estruturado"""
+
+    @pytest.fixture
+    def client(self, tmp_path, produto_controller):
+        engine = create_engine(f"sqlite:///{tmp_path / 'busca.db'}")
+        Base.metadata.create_all(engine)
+        fabrica = sessionmaker(bind=engine)
+        with fabrica() as db:
+            for nome, modelo, categoria in CATALOGO:
+                produto_controller.cadastrar_produto(db, nome, modelo, categoria, 100.0, 10, 50.0)
+
+        def _get_sessao():
+            with fabrica() as db:
+                yield db
+
+        app.dependency_overrides[get_sessao] = _get_sessao
+        yield TestClient(app)
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+    def test_busca_estruturada(self, client):
+        resposta = client.get("/products/search", params={"q": "perifé", "limit": 1})
+
+        assert resposta.status_code == 200
+        corpo = resposta.json()
+        assert (corpo["q"], corpo["limit"], corpo["skip"], corpo["next_skip"]) == ("perifé", 1, 0, 1)
+        assert len(corpo["itens"]) == 1
+        assert corpo["itens"][0]["categoria"] == "Periféricos"
+
+        ultima = client.get("/products/search", params={"q": "perifé", "limit": 1, "skip": 1}).json()
+        assert len(ultima["itens"]) == 1 and ultima["next_skip"] is None
+
+    def test_filtros_exatos_paginados(self, client):
+        primeira = client.get("/products/search", params={"categoria": "Periféricos", "limit": 1}).json()
+        segunda = client.get("/products/search", params={"categoria": "Periféricos", "limit": 1,
+                                                         "skip": primeira["next_skip"]}).json()
+
+        assert "q" not in primeira
+        assert [item["nome"] for item in primeira["itens"] + segunda["itens"]] == ["Mouse Logitech",
+                                                                                    "Teclado Mecânico"]
+        assert (primeira["next_skip"], segunda["next_skip"]) == (1, None)
+        assert client.get("/products/search", params={"nome": "Inexistente"}).json()["itens"] == []
+
+    def test_cursor_das_listagens(self, client):
+        paginas = []
+        params = {"categoria": "Periféricos", "fields": "nome", "limit": 1}
+        while True:
+            pagina = client.get("/products/search", params=params).json()
+            paginas.append(pagina)
+            if pagina["next_after_codigo"] is None:
+                break
+            params["after_codigo"] = pagina["next_after_codigo"]
+
+        # codigo lido só para o cursor: fora dos itens quando não está em fields
+        assert [pagina["itens"] for pagina in paginas] == [[{"nome": "Mouse Logitech"}],
+                                                           [{"nome": "Teclado Mecânico"}]]
+
+        resposta = client.get("/products/search", params={"q": "mouse", "after_codigo": 1})
+        assert resposta.status_code == 400
+
+    def test_fields_projeta_colunas(self, client):
+        corpo = client.get("/products/search", params={"nome": "Notebook Dell", "fields": "nome, valor"}).json()
+
+        assert corpo["itens"] == [{"nome": "Notebook Dell", "valor": 100.0}]
+
+        resposta = client.get("/products/search", params={"modelo": "K120", "fields": "nome,vlr_compra"})
+        assert resposta.status_code == 400
+        assert "vlr_compra" in resposta.json()["detail"]
+
+
+class TestProjecaoController:
+    """busca_produto/filtro_categoria leem só as colunas pedidas"""
+
+    def test_linhas_projetadas(self, db_session, produto_controller, catalogo):
+        linhas = produto_controller.filtro_categoria(db_session, "Periféricos", campos=["codigo", "valor"])
+
+        assert [linha._fields for linha in linhas] == [("codigo", "valor")] * 2
+        assert all(isinstance(linha.valor, float) for linha in linhas)
+        assert produto_controller.busca_produto(db_session, "ativo", "x") == "Coluna não localizada"
+        assert [linha.nome for linha in produto_controller.busca_produto(db_session, "modelo", "K120")] == [
+            "Teclado Mecânico"]
@@ -0,0 +1,152 @@
+import pytest
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import sessionmaker
+
+from src.database.cache_produtos import (CONSULTAS_CACHE, CacheProdutos, cache_para, obter_produto,
+                                         registrar_alteracao)
+from src.database.models import Base, ItemCarrinho, Produtos
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 1000.0
+
+    def __call__(self) -> float:
+        return self.agora
+
+
+def _consultas(resultado: str) -> float:
+    return sum(valor for labels, valor in CONSULTAS_CACHE.snapshot() if labels == [resultado])
+
+
+@pytest.fixture
+def fabrica(tmp_path):
+    """Banco em arquivo: cada sessão/cache simula um worker diferente sobre o mesmo banco"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'cache.db'}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(Produtos(nome="Mouse", modelo="M1", categoria="Periféricos", valor=100, vlr_compra=50,
+                        quantidade_estoque=3))
+        db.commit()
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+class TestCacheProdutos:
+    """Read-through com LRU/TTL e invalidação pela tabela de versões"""
+
+    def test_hit_nao_vai_ao_banco(self, fabrica):
+        cache = CacheProdutos(relogio=Relogio())
+        with fabrica() as db:
+            statements = []
+            event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+            hits = _consultas("hit")
+
+            primeiro = cache.obter(db, 1)
+            antes = len(statements)
+            segundo = cache.obter(db, 1)
+
+        assert primeiro == segundo
+        assert (primeiro.nome, primeiro.valor, primeiro.ativo) == ("Mouse", 100, True)
+        assert len(statements) == antes
+        assert _consultas("hit") == hits + 1
+
+    def test_ttl_e_lru(self, fabrica):
+        relogio = Relogio()
+        cache = CacheProdutos(tamanho=1, ttl=60, relogio=relogio)
+        with fabrica() as db:
+            cache.obter(db, 1)
+            db.execute(update(Produtos).values(valor=120))  # fora dos controllers: sem versão
+            db.commit()
+
+            assert cache.obter(db, 1).valor == 100
+            relogio.agora += 61
+            assert cache.obter(db, 1).valor == 120
+
+            assert cache.obter(db, 999) is None
+            db.add(Produtos(nome="Teclado", modelo="T1", categoria="Periféricos", valor=80, vlr_compra=40,
+                            quantidade_estoque=1))
+            db.commit()
+            cache.obter(db, 2)
+            assert len(cache) == 1
+
+    def test_outro_worker_ve_alteracao_pela_versao(self, fabrica):
+        relogio = Relogio()
+        worker = CacheProdutos(sincronizacao=1, relogio=relogio)
+        with fabrica() as db:
+            assert worker.obter(db, 1).valor == 100
+
+        # Outro worker edita: atualiza o produto e a versão na mesma transação
+        with fabrica() as db:
+            db.execute(update(Produtos).values(valor=150))
+            registrar_alteracao(db, 1)
+            db.commit()
+
+        with fabrica() as db:
+            assert worker.obter(db, 1).valor == 100  # dentro do intervalo de sincronização
+            relogio.agora += 1
+            assert worker.obter(db, 1).valor == 150
+            assert worker.obter(db, 1).valor == 150
+
+    def test_invalidacao_durante_miss_nao_guarda_valor_antigo(self, fabrica):
+        relogio = Relogio()
+        cache = CacheProdutos(ttl=300, relogio=relogio)
+        with fabrica() as db:
+            engine = db.get_bind()
+            pendente = [True]
+
+            # Outra requisição desabilita e invalida entre o SELECT do miss e o momento de guardar
+            # (o UPDATE vem logo depois: o SQLite não deixa escrever com o cursor do SELECT aberto)
+            def invalidar_no_meio(conn, cursor, statement, *args):
+                if "FROM produtos " in statement and pendente:
+                    pendente.clear()
+                    cache.invalidar(1)
+
+            event.listen(engine, "after_cursor_execute", invalidar_no_meio)
+            assert cache.obter(db, 1).ativo is True
+            event.remove(engine, "after_cursor_execute", invalidar_no_meio)
+            db.execute(update(Produtos).values(ativo=False))
+            db.commit()
+
+            relogio.agora += 1  # bem dentro do TTL
+            assert cache.obter(db, 1).ativo is False
+            assert cache.obter(db, 1).ativo is False  # agora sim em cache
+
+    def test_registrar_alteracao_ordena_versoes(self, fabrica):
+        with fabrica() as db:
+            assert [registrar_alteracao(db, produto) for produto in (1, 2, 1)] == [1, 2, 3]
+
+
+class TestCacheNoFluxo:
+    """Controllers usando o cache: preço/ativo invalidados na hora, estoque sempre do banco"""
+
+    def test_edicao_e_desativacao_invalidam(self, db_session, produto_controller, venda_controller,
+                                            usuario_vendedor, produto_teste):
+        vendedor_id = usuario_vendedor['id_usuario']
+        assert obter_produto(db_session, produto_teste.codigo).valor == produto_teste.valor
+
+        assert "sucesso" in produto_controller.editar_produto(db_session, produto_teste.codigo, valor=3900.0)
+        sucesso, msg = venda_controller.adicionar_item_carrinho(db_session, vendedor_id, produto_teste.codigo, 1)
+        assert sucesso, msg
+        item = db_session.query(ItemCarrinho).filter(ItemCarrinho.produto_id == produto_teste.codigo).one()
+        assert float(item.preco_unitario) == 3900.0
+
+        assert "sucesso" in produto_controller.desabilitar_produto(db_session, produto_teste.codigo)
+        sucesso, msg = venda_controller.adicionar_item_carrinho(db_session, vendedor_id, produto_teste.codigo, 1)
+        assert not sucesso
+        assert "desativado" in msg
+
+    def test_estoque_nunca_vem_do_cache(self, db_session, venda_controller, estoque_controller, usuario_vendedor,
+                                        produto_teste):
+        vendedor_id = usuario_vendedor['id_usuario']
+        estoque = produto_teste.quantidade_estoque
+
+        sucesso, _ = venda_controller.adicionar_item_carrinho(db_session, vendedor_id, produto_teste.codigo, estoque)
+        assert sucesso
+        assert len(cache_para(db_session)) == 1
+
+        assert estoque_controller.verificar_disponibilidade(db_session, produto_teste.codigo, 1, vendedor_id) == (
+            False, 0)
+        sucesso, msg = venda_controller.adicionar_item_carrinho(db_session, vendedor_id, produto_teste.codigo, 1)
+        assert not sucesso
+        assert "Estoque insuficiente" in msg
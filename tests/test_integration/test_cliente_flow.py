@@ -53,4 +53,27 @@ class TestClienteFlow:
 
         # Verificar desativação
         cliente = cliente_controller.buscar_cliente(db_session, cliente_teste.cpf)
-        assert cliente.ativo == False
\ No newline at end of file
+        assert cliente.ativo == False
+
+    def test_listagem_paginada_por_cursor(self, db_session, cliente_controller):
+        """Páginas por cursor (apos_id) cobrem todos os ativos, em ordem, sem repetir"""
+        cpfs = ["52998224725", "11144477735", "39053344705", "98765432100", "12345678909"]
+        for i, cpf in enumerate(cpfs):
+            cliente_controller.cadastrar_cliente(db=db_session, cpf=cpf, nome=f"Cliente {i}",
+                                                 dt_nascimento="01/01/1990", endereco="Rua 1",
+                                                 telefone="11999999999")
+        cliente_controller.desativar_cliente(db_session, cpfs[2])
+
+        vistos = []
+        apos_id = None
+        while True:
+            pagina = cliente_controller.listar_clientes(db_session, limite=2, apos_id=apos_id)
+            if isinstance(pagina, str):
+                break
+            vistos.extend(c.id_cliente for c in pagina)
+            apos_id = pagina[-1].id_cliente
+
+        assert len(vistos) == 4
+        assert vistos == sorted(vistos)
+        assert cliente_controller.contar_clientes(db_session) == 4
+        assert [c.id_cliente for c in cliente_controller.listar_clientes(db_session, limite=2, pular=2)] == vistos[2:]
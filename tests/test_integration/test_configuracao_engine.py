@@ -0,0 +1,189 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+import src.api.app as api
+from src.database.configuracao import ConfiguracaoEngine, aquecer_pool, criar_engine, estado_pool, marcar_escrita
+from src.database.instrumentacao import QueuePoolMedido
+
+
+@pytest.fixture
+def configuracao(tmp_path):
+    return ConfiguracaoEngine(url=f"sqlite:///{tmp_path / 'loja.db'}", pool_size=2, max_overflow=1, pool_timeout=1)
+
+
+class TestConfiguracaoEngine:
+    """Pool dirigido pela configuração, pre-ping, aquecimento e /ready"""
+
+    def test_argumentos_do_pool(self, configuracao):
+        argumentos = configuracao.argumentos()
+
+        assert argumentos["poolclass"] is QueuePoolMedido
+        assert (argumentos["pool_size"], argumentos["max_overflow"], argumentos["pool_timeout"]) == (2, 1, 1)
+        assert argumentos["pool_pre_ping"] is True
+
+    def test_dialetos_sem_fila_nao_recebem_argumentos_de_pool(self, configuracao):
+        memoria = configuracao.para_url("sqlite://").argumentos()
+        aiosqlite = configuracao.para_url("sqlite+aiosqlite:///loja.db").argumentos(assincrono=True)
+        testes = ConfiguracaoEngine(url=configuracao.url, sem_pool=True).argumentos()
+
+        assert "pool_size" not in memoria and "pool_size" not in aiosqlite
+        assert testes["poolclass"] is NullPool
+
+    def test_pgbouncer_desliga_cache_de_prepared_statements(self):
+        configuracao = ConfiguracaoEngine(url="postgresql+asyncpg://u:s@pgbouncer/loja", pgbouncer=True)
+
+        argumentos = configuracao.argumentos(assincrono=True)
+
+        assert argumentos["connect_args"]["statement_cache_size"] == 0
+        assert argumentos["connect_args"]["prepared_statement_cache_size"] == 0
+        nome = argumentos["connect_args"]["prepared_statement_name_func"]
+        assert nome() != nome()
+        assert "poolclass" not in argumentos  # AsyncAdaptedQueuePool padrão do asyncpg
+
+    def test_estrategia_de_pre_ping_invalida(self, configuracao):
+        with pytest.raises(ValueError):
+            ConfiguracaoEngine(url=configuracao.url, pre_ping="sempre")
+
+    def test_pre_ping_ocioso_troca_conexao_quebrada(self, configuracao):
+        engine = criar_engine(ConfiguracaoEngine(url=configuracao.url, pool_size=1, max_overflow=0,
+                                                 pre_ping="ocioso", pre_ping_ocioso=0))
+        try:
+            with engine.connect() as conexao:
+                conexao.execute(text("SELECT 1"))
+                quebrada = conexao.connection.dbapi_connection
+            quebrada.close()  # servidor/proxy fechou a conexão ociosa
+
+            with engine.connect() as conexao:
+                assert conexao.execute(text("SELECT 1")).scalar() == 1
+                assert conexao.connection.dbapi_connection is not quebrada
+        finally:
+            engine.dispose()
+
+    def test_aquecer_pool_abre_ate_pool_size(self, configuracao):
+        engine = criar_engine(configuracao)
+        try:
+            assert aquecer_pool(engine, 10) == 2
+            assert engine.pool.checkedin() == 2
+            assert engine.pool.checkedout() == 0
+        finally:
+            engine.dispose()
+
+    def test_ready_reporta_saturacao(self, configuracao, monkeypatch):
+        engine = criar_engine(configuracao)
+        monkeypatch.setattr(api, "engine", engine)
+        client = TestClient(api.app)
+        try:
+            resposta = client.get("/ready")
+            assert resposta.status_code == 200
+            assert resposta.json()["banco"] == "ok"
+            assert resposta.json()["pool"]["saturacao"] == 0
+
+            conexoes = [engine.connect() for _ in range(3)]
+            try:
+                assert estado_pool(engine)["saturacao"] == 1
+                resposta = client.get("/ready")
+            finally:
+                for conexao in conexoes:
+                    conexao.close()
+
+            assert resposta.status_code == 503
+            assert resposta.json() == {"status": "not_ready", "banco": "nao_verificado",
+                                       "pool": {"tipo": "QueuePoolMedido", "tamanho": 2, "max_overflow": 1,
+                                                "em_uso": 3, "ociosas": 0, "overflow": 1, "saturacao": 1.0}}
+        finally:
+            engine.dispose()
+
+
+class TestPerfilSQLite:
+    """PRAGMAs do perfil e BEGIN IMMEDIATE nas transações de escrita"""
+
+    def _pragmas(self, engine) -> dict:
+        with engine.connect() as conexao:
+            return {nome: conexao.exec_driver_sql(f"PRAGMA {nome}").scalar()
+                    for nome in ("journal_mode", "synchronous", "busy_timeout", "cache_size", "temp_store",
+                                 "foreign_keys")}
+
+    def test_perfis(self, configuracao):
+        padrao = criar_engine(configuracao.para_url(configuracao.url.replace("loja.db", "padrao.db")))
+        desempenho = criar_engine(ConfiguracaoEngine(url=configuracao.url, sqlite_perfil="desempenho",
+                                                     sqlite_busy_timeout_ms=2500, sqlite_cache_kb=1024))
+        try:
+            assert self._pragmas(padrao)["journal_mode"] == "delete"
+            assert self._pragmas(padrao)["foreign_keys"] == 1
+            assert self._pragmas(desempenho) == {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 2500,
+                                                 "cache_size": -1024, "temp_store": 2, "foreign_keys": 1}
+        finally:
+            padrao.dispose()
+            desempenho.dispose()
+
+    def test_begin_immediate_so_em_escritas(self, configuracao):
+        engine = criar_engine(ConfiguracaoEngine(url=configuracao.url, sqlite_perfil="desempenho",
+                                                 sqlite_begin_immediate=True, pre_ping="desligado"))
+        executados = []
+        event.listen(engine, "connect", lambda conexao, registro: conexao.set_trace_callback(executados.append))
+        try:
+            with engine.begin() as conexao:
+                conexao.execute(text("CREATE TABLE t (a INTEGER)"))
+            with Session(engine) as db:
+                db.execute(text("SELECT a FROM t")).all()
+                db.commit()
+                db.execute(text("INSERT INTO t VALUES (1)"))
+                db.commit()
+                marcar_escrita(db)
+                db.execute(text("SELECT a FROM t")).all()
+                db.execute(text("UPDATE t SET a = 2"))
+                db.commit()
+        finally:
+            engine.dispose()
+
+        begins = [sql for sql in executados if sql.startswith("BEGIN")]
+        assert begins == ["BEGIN", "BEGIN", "BEGIN IMMEDIATE", "BEGIN IMMEDIATE"]
+
+    @pytest.mark.parametrize("immediate", [False, True])
+    def test_ler_e_depois_escrever_em_paralelo(self, configuracao, immediate):
+        """
+        Sem BEGIN IMMEDIATE o pysqlite só abre a transação no UPDATE: as duas leem 0 e um
+        incremento se perde. Com ele, a segunda transação espera a primeira terminar.
+        """
+        engine = criar_engine(ConfiguracaoEngine(url=configuracao.url, pool_size=2, sqlite_perfil="desempenho",
+                                                 sqlite_begin_immediate=immediate))
+        with engine.begin() as conexao:
+            conexao.execute(text("CREATE TABLE contador (valor INTEGER)"))
+            conexao.execute(text("INSERT INTO contador VALUES (0)"))
+
+        barreira = threading.Barrier(2)
+        erros = []
+
+        def incrementar():
+            with Session(engine) as db:
+                marcar_escrita(db)
+                try:
+                    barreira.wait()
+                    valor = db.execute(text("SELECT valor FROM contador")).scalar()
+                    time.sleep(0.1)
+                    db.execute(text("UPDATE contador SET valor = :valor"), {"valor": valor + 1})
+                    db.commit()
+                except OperationalError as erro:
+                    erros.append(erro)
+                    db.rollback()
+
+        try:
+            threads = [threading.Thread(target=incrementar) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            with engine.connect() as conexao:
+                valor = conexao.execute(text("SELECT valor FROM contador")).scalar()
+        finally:
+            engine.dispose()
+
+        assert erros == []
+        assert valor == (2 if immediate else 1)
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Carrinho, Reserva
+from src.services.workers import CarrinhoExpiracaoWorker, ReservaExpiracaoWorker
+
+
+class TestExpiracaoReservasFlow:
+    """Testes do worker de expiração de reservas"""
+
+    def _expirar(self, db_session, reserva_id):
+        reserva = db_session.get(Reserva, reserva_id)
+        reserva.expira_em = datetime.now() - timedelta(minutes=1)
+        db_session.commit()
+
+    def test_worker_libera_reservas_expiradas(self, db_session, estoque_controller, produto_teste,
+                                              usuario_vendedor):
+        """Reservas vencidas são liberadas em lote e o reservado do produto é devolvido"""
+        vendedor_id = usuario_vendedor['id_usuario']
+
+        ids = []
+        for _ in range(3):
+            sucesso, reserva_id = estoque_controller.reservar_estoque(
+                db=db_session, produto_id=produto_teste.codigo, quantidade=2, usuario_id=vendedor_id)
+            assert sucesso
+            ids.append(reserva_id)
+
+        self._expirar(db_session, ids[0])
+        self._expirar(db_session, ids[1])
+
+        worker = ReservaExpiracaoWorker(tamanho_lote=1, session_factory=sessionmaker(bind=db_session.get_bind()))
+        metricas = worker.executar(db_session)
+
+        assert metricas.reservas_liberadas == 2
+        assert metricas.unidades_liberadas == 4
+        assert metricas.lotes == 2
+
+        db_session.expire_all()
+        assert produto_teste.quantidade_reservada == 2
+        assert db_session.get(Reserva, ids[2]).ativa is True
+        assert all(db_session.get(Reserva, i).ativa is False for i in ids[:2])
+
+    def test_verificar_disponibilidade_nao_altera_reservas(self, db_session, estoque_controller, produto_teste,
+                                                           usuario_vendedor):
+        """O caminho da requisição apenas lê; a liberação fica com o worker"""
+        vendedor_id = usuario_vendedor['id_usuario']
+        _, reserva_id = estoque_controller.reservar_estoque(
+            db=db_session, produto_id=produto_teste.codigo, quantidade=4, usuario_id=vendedor_id)
+        self._expirar(db_session, reserva_id)
+
+        estoque_controller.verificar_disponibilidade(db_session, produto_teste.codigo, 1, vendedor_id)
+
+        db_session.expire_all()
+        assert db_session.get(Reserva, reserva_id).ativa is True
+        assert estoque_controller.obter_reservas_usuario(db_session, vendedor_id) == []
+
+
+class TestExpiracaoCarrinhosFlow:
+    """Testes do worker de expiração de carrinhos"""
+
+    def _vencer_carrinho(self, db_session, usuario_id):
+        carrinho = db_session.query(Carrinho).filter(Carrinho.usuario_id == usuario_id,
+                                                     Carrinho.status == 'ATIVO').first()
+        carrinho.expira_em = datetime.now() - timedelta(minutes=1)
+        db_session.commit()
+        return carrinho.id_carrinho
+
+    def test_worker_expira_carrinho_e_libera_reservas(self, db_session, carrinho_controller, produto_teste,
+                                                      usuario_vendedor):
+        """Carrinho vencido vira EXPIRADO e as reservas dos itens são liberadas na mesma transação"""
+        vendedor_id = usuario_vendedor['id_usuario']
+        sucesso, msg = carrinho_controller.adicionar_item(db_session, vendedor_id, produto_teste.codigo, 3)
+        assert sucesso, msg
+
+        carrinho_id = self._vencer_carrinho(db_session, vendedor_id)
+
+        # Leitura não devolve carrinho vencido nem o expira
+        assert carrinho_controller.obter_carrinho(db_session, vendedor_id) is None
+
+        worker = CarrinhoExpiracaoWorker()
+        metricas = worker.executar(db_session)
+
+        assert metricas.carrinhos_expirados == 1
+        assert metricas.reservas_liberadas == 1
+        assert metricas.unidades_liberadas == 3
+
+        db_session.expire_all()
+        assert db_session.get(Carrinho, carrinho_id).status == 'EXPIRADO'
+        assert produto_teste.quantidade_reservada == 0
+
+    def test_carrinho_vencido_do_usuario_e_substituido(self, db_session, carrinho_controller, produto_teste,
+                                                       usuario_vendedor):
+        """Sem esperar o worker, o próprio usuário ganha um carrinho novo e o antigo libera a reserva"""
+        vendedor_id = usuario_vendedor['id_usuario']
+        carrinho_controller.adicionar_item(db_session, vendedor_id, produto_teste.codigo, 2)
+        antigo_id = self._vencer_carrinho(db_session, vendedor_id)
+
+        novo, carrinho, _ = carrinho_controller.obter_ou_criar_carrinho(db_session, vendedor_id)
+
+        assert novo
+        assert carrinho.id_carrinho != antigo_id
+        db_session.expire_all()
+        assert db_session.get(Carrinho, antigo_id).status == 'EXPIRADO'
+        assert produto_teste.quantidade_reservada == 0
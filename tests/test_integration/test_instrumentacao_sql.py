@@ -0,0 +1,110 @@
+import logging
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.api.middleware import ServerTimingMiddleware
+from src.database import instrumentacao
+from src.database.instrumentacao import (EstatisticasRequisicao, HistogramaRolante, MetricasSQL,
+                                         estatisticas_requisicao, fingerprint, instrumentar_engine)
+from src.database.models import Base, Produtos
+
+
+@pytest.fixture
+def engine_instrumentado():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    instrumentar_engine(engine)
+    yield engine
+    engine.dispose()
+
+
+class TestInstrumentacaoSQL:
+    """Contagem por requisição, queries lentas e histogramas por fingerprint"""
+
+    def test_fingerprint_normaliza_literais_e_listas(self):
+        a = fingerprint("SELECT * FROM produtos WHERE codigo IN (?, ?, ?) AND nome = 'Mouse' -- busca")
+        b = fingerprint("SELECT *   FROM produtos\nWHERE codigo IN (?, ?) AND nome = 'Teclado'")
+
+        assert a == b
+        assert a[1] == "SELECT * FROM produtos WHERE codigo IN (...) AND nome = ?"
+        assert fingerprint("INSERT INTO t (a, b) VALUES (%(a_1)s, %(b_1)s), (%(a_2)s, %(b_2)s)")[1] == \
+               "INSERT INTO t (a, b) VALUES (...)"
+        assert fingerprint("SELECT x::text FROM t1 WHERE id = $1")[1] == "SELECT x::text FROM t1 WHERE id = ?"
+
+    def test_histograma_descarta_fatias_fora_da_janela(self):
+        histograma = HistogramaRolante(janela=60, fatias=6)
+        for duracao in (0.3, 3, 30, 300):
+            histograma.registrar(duracao, agora=5)
+        histograma.registrar(3, agora=50)
+
+        resumo = histograma.resumo(agora=55)
+        assert resumo["count"] == 5 and resumo["p50_ms"] == 5 and resumo["p99_ms"] == 500
+
+        assert histograma.resumo(agora=75)["count"] == 1
+
+    def test_fingerprints_excedentes_caem_em_outros(self, monkeypatch):
+        monkeypatch.setattr(instrumentacao, "MAX_FINGERPRINTS", 2)
+        metricas = MetricasSQL(amostragem=1)
+
+        for tabela in ("a", "b", "c", "d"):
+            metricas.registrar(f"SELECT * FROM {tabela}", 0.001, agora=1)
+
+        snapshot = metricas.snapshot(agora=1)
+        assert len(snapshot) == 3
+        assert snapshot[instrumentacao.OUTROS]["count"] == 2
+
+    def test_query_lenta_logada_com_fingerprint(self, engine_instrumentado, monkeypatch):
+        monkeypatch.setattr(instrumentacao, "SLOW_QUERY_THRESHOLD", 0.0)
+        registros = []
+        handler = logging.Handler()
+        handler.emit = registros.append
+        instrumentacao.sql_log.addHandler(handler)
+        try:
+            with engine_instrumentado.connect() as conn:
+                conn.execute(text("SELECT codigo FROM produtos WHERE nome = :nome"), {"nome": "Mouse"})
+        finally:
+            instrumentacao.sql_log.removeHandler(handler)
+
+        lentas = [r for r in registros if "produtos" in r.statement]
+        assert lentas[0].statement == "SELECT codigo FROM produtos WHERE nome = ?"
+        assert lentas[0].fingerprint == fingerprint("SELECT codigo FROM produtos WHERE nome = ?")[0]
+        assert lentas[0].duration_ms >= 0
+
+    def test_statement_com_erro_nao_entra_na_contagem(self, engine_instrumentado):
+        estatisticas = EstatisticasRequisicao()
+        token = estatisticas_requisicao.set(estatisticas)
+        try:
+            with engine_instrumentado.connect() as conn:
+                with pytest.raises(Exception):
+                    conn.execute(text("SELECT * FROM tabela_inexistente"))
+                conn.execute(text("SELECT 1"))
+        finally:
+            estatisticas_requisicao.reset(token)
+
+        assert estatisticas.consultas == 1
+        assert 0 < estatisticas.tempo_db < 1
+
+    def test_server_timing_por_requisicao(self, engine_instrumentado):
+        fabrica = sessionmaker(bind=engine_instrumentado)
+        app = FastAPI()
+        app.add_middleware(ServerTimingMiddleware)
+
+        @app.get("/produtos")
+        def listar():
+            with fabrica() as db:
+                db.add(Produtos(nome="Mouse", modelo="M1", categoria="Periféricos", valor=100, vlr_compra=50,
+                                quantidade_estoque=10))
+                db.commit()
+                return {"total": db.query(Produtos).count()}
+
+        resposta = TestClient(app).get("/produtos")
+
+        assert resposta.status_code == 200
+        timing = resposta.headers["Server-Timing"]
+        assert re.fullmatch(r'db;dur=\d+\.\d{2};desc="2 queries", app;dur=\d+\.\d{2}', timing), timing
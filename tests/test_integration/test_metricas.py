@@ -0,0 +1,166 @@
+import json
+import re
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from src.api.middleware import MetricasMiddleware
+from src.database.instrumentacao import QueuePoolMedido, instrumentar_pool
+from src.services import metricas
+from src.services.metricas import RegistroMetricas
+
+
+def _valor(metrica) -> float:
+    return sum(serie[1] for serie in metrica.snapshot())
+
+
+def _amostras(texto: str) -> dict[str, float]:
+    """Linhas de amostra do formato texto: 'nome{labels}' -> valor"""
+    return {linha.rsplit(" ", 1)[0]: float(linha.rsplit(" ", 1)[1])
+            for linha in texto.splitlines() if linha and not linha.startswith("#")}
+
+
+class TestRegistroMetricas:
+    """Formato texto do Prometheus e agregação entre processos"""
+
+    def test_exportacao_no_formato_prometheus(self):
+        registro = RegistroMetricas()
+        contador = registro.contador("pedidos_total", "Pedidos", ("origem",))
+        histograma = registro.histograma("latencia_seconds", "Latência", limites=(0.1, 1.0))
+        registro.medidor("fila", "Fila", funcao=lambda: {(): 3})
+
+        contador.inc(origem='loja "centro"')
+        contador.inc(2, origem='loja "centro"')
+        for valor in (0.05, 0.1, 0.5, 2.0):
+            histograma.observar(valor)
+
+        texto = registro.exportar()
+
+        assert "# TYPE pedidos_total counter" in texto
+        assert "# TYPE latencia_seconds histogram" in texto
+        amostras = _amostras(texto)
+        assert amostras['pedidos_total{origem="loja \\"centro\\""}'] == 3
+        assert amostras['latencia_seconds_bucket{le="0.1"}'] == 2
+        assert amostras['latencia_seconds_bucket{le="1"}'] == 3
+        assert amostras['latencia_seconds_bucket{le="+Inf"}'] == 4
+        assert amostras["latencia_seconds_count"] == 4
+        assert amostras["latencia_seconds_sum"] == pytest.approx(2.65)
+        assert amostras["fila"] == 3
+
+    def test_labels_invalidos_sao_rejeitados(self):
+        contador = RegistroMetricas().contador("x_total", "X", ("rota",))
+
+        with pytest.raises(ValueError):
+            contador.inc(status="200")
+
+    def test_modo_multiprocesso_soma_contadores_e_descarta_gauges_de_mortos(self, tmp_path):
+        def criar_registro(pid: int) -> RegistroMetricas:
+            registro = RegistroMetricas(tmp_path)
+            registro.pid = pid
+            registro.contador("vendas_total", "Vendas").inc(pid % 10)
+            registro.medidor("em_andamento", "Em andamento").inc(1)
+            return registro
+
+        morto = criar_registro(999_999_991)  # PID inexistente
+        morto.gravar_snapshot()
+        vivo = RegistroMetricas(tmp_path)
+        vivo.contador("vendas_total", "Vendas").inc(2)
+        vivo.medidor("em_andamento", "Em andamento").inc(1)
+
+        amostras = _amostras(vivo.exportar())
+
+        assert amostras["vendas_total"] == 3
+        assert amostras["em_andamento"] == 1
+        assert {arquivo.name for arquivo in tmp_path.iterdir()} == {"999999991.json", f"{vivo.pid}.json"}
+        assert json.loads((tmp_path / f"{vivo.pid}.json").read_text())["pid"] == vivo.pid
+
+
+class TestMetricasHTTP:
+    """Latência por template de rota, requisições em andamento e pool de conexões"""
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.add_middleware(MetricasMiddleware)
+
+        @app.get("/itens/{item_id}")
+        def item(item_id: int):
+            if item_id == 0:
+                raise HTTPException(status_code=404, detail="Item não encontrado")
+            return {"item_id": item_id}
+
+        @app.get("/metrics")
+        def exportar():
+            return PlainTextResponse(metricas.registro.exportar(), media_type="text/plain; version=0.0.4")
+
+        return TestClient(app)
+
+    def test_latencia_por_template_de_rota(self, client):
+        client.get("/itens/1")
+        client.get("/itens/2")
+        client.get("/itens/0")
+        client.get("/nao-existe/123")
+
+        resposta = client.get("/metrics")
+
+        assert resposta.headers["content-type"].startswith("text/plain; version=0.0.4")
+        amostras = _amostras(resposta.text)
+        serie = 'http_request_duration_seconds_count{method="GET",route="/itens/{item_id}",status="%s"}'
+        assert amostras[serie % "200"] >= 2
+        assert amostras[serie % "404"] >= 1
+        assert 'route="desconhecida",status="404"' in resposta.text
+        assert "/nao-existe/123" not in resposta.text
+        # A própria requisição do /metrics está em andamento durante a exportação
+        assert amostras["http_requests_in_flight"] >= 1
+
+    def test_pool_exporta_conexoes_e_espera(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePoolMedido, pool_size=2,
+                               max_overflow=1)
+        instrumentar_pool(engine, "teste_pool")
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                amostras = _amostras(metricas.registro.exportar())
+                assert amostras['db_pool_checked_out{pool="teste_pool"}'] == 1
+                assert amostras['db_pool_size{pool="teste_pool"}'] == 2
+
+            amostras = _amostras(metricas.registro.exportar())
+            assert amostras['db_pool_checked_out{pool="teste_pool"}'] == 0
+            assert amostras['db_pool_wait_seconds_count{pool="teste_pool"}'] >= 1
+        finally:
+            from src.database import instrumentacao
+            instrumentacao._pools.pop("teste_pool", None)
+            engine.dispose()
+
+    def test_pool_sem_fila_nao_e_exportado(self):
+        engine = create_engine("sqlite://", poolclass=NullPool)
+        instrumentar_pool(engine, "sem_fila")
+
+        assert 'pool="sem_fila"' not in metricas.registro.exportar()
+
+
+class TestMetricasNegocio:
+    """Contadores de carrinhos, reservas e vendas no fluxo carrinho -> checkout"""
+
+    def test_fluxo_carrinho_checkout(self, db_session, venda_controller, usuario_vendedor, produto_teste):
+        antes = {nome: _valor(getattr(metricas, nome))
+                 for nome in ("CARRINHOS_CRIADOS", "RESERVAS_CRIADAS", "VENDAS_FINALIZADAS")}
+        vendedor_id = usuario_vendedor['id_usuario']
+
+        sucesso, msg = venda_controller.adicionar_item_carrinho(db_session, vendedor_id, produto_teste.codigo, 2)
+        assert sucesso, msg
+        sucesso, msg, _ = venda_controller.finalizar_venda(db_session, vendedor_id)
+        assert sucesso, msg
+
+        assert _valor(metricas.CARRINHOS_CRIADOS) == antes["CARRINHOS_CRIADOS"] + 1
+        assert _valor(metricas.RESERVAS_CRIADAS) == antes["RESERVAS_CRIADAS"] + 1
+        assert _valor(metricas.VENDAS_FINALIZADAS) == antes["VENDAS_FINALIZADAS"] + 1
+
+    def test_bcrypt_medido(self, usuario_vendedor):
+        texto = metricas.registro.exportar()
+
+        assert re.search(r'bcrypt_duration_seconds_count\{operacao="hash"\} [1-9]', texto)
@@ -0,0 +1,131 @@
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from src.controllers.produto_controller import ProdutoController
+from src.database.models import Base, Produtos
+from src.database.replicas import RoteadorReplicas, SessaoRoteada
+from src.utils.logKit.context import RequestContext, bind_request, reset_request
+
+
+def _banco(caminho, produtos: int):
+    """SQLite em arquivo com N produtos ativos (a contagem identifica o banco que respondeu)"""
+    engine = create_engine(f"sqlite:///{caminho}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conexao:
+        conexao.execute(insert(Produtos), [
+            {"nome": f"Produto {i}", "modelo": "M", "categoria": "Teste", "valor": 10, "vlr_compra": 5,
+             "quantidade_estoque": 1} for i in range(produtos)])
+    return engine
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 1000.0
+
+    def __call__(self) -> float:
+        return self.agora
+
+
+@pytest.fixture
+def relogio():
+    return Relogio()
+
+
+@pytest.fixture
+def bancos(tmp_path):
+    """Primário com 1 produto, réplicas com 2 e 3 (réplicas "atrasadas" com dados diferentes)"""
+    engines = [_banco(tmp_path / "primario.db", 1), _banco(tmp_path / "replica1.db", 2),
+               _banco(tmp_path / "replica2.db", 3)]
+    yield engines
+    for engine in engines:
+        engine.dispose()
+
+
+def _fabrica(primario, roteador):
+    return sessionmaker(class_=SessaoRoteada, bind=primario, roteador=roteador)
+
+
+class TestReplicas:
+    """Métodos `@somente_leitura` nas réplicas, com fallback e read-your-writes"""
+
+    controller = ProdutoController()
+
+    def test_sem_replicas_le_do_primario(self, bancos):
+        with _fabrica(bancos[0], RoteadorReplicas([]))() as db:
+            assert self.controller.contar_produtos(db) == 1
+
+    def test_round_robin_entre_replicas(self, bancos, relogio):
+        roteador = RoteadorReplicas(bancos[1:], relogio=relogio)
+
+        with _fabrica(bancos[0], roteador)() as db:
+            contagens = [self.controller.contar_produtos(db) for _ in range(4)]
+
+            assert contagens == [2, 3, 2, 3]
+            # Fora dos métodos marcados, o primário
+            assert db.query(Produtos).count() == 1
+
+    def test_escrita_na_sessao_fixa_leituras_no_primario(self, bancos, relogio):
+        roteador = RoteadorReplicas(bancos[2:], relogio=relogio)
+
+        with _fabrica(bancos[0], roteador)() as db:
+            assert self.controller.contar_produtos(db) == 3
+
+            db.add(Produtos(nome="Novo", modelo="M", categoria="Teste", valor=10, vlr_compra=5,
+                            quantidade_estoque=1))
+            assert self.controller.contar_produtos(db) == 2  # pendente: flush vai para o primário
+            db.commit()
+
+            assert self.controller.contar_produtos(db) == 2
+
+    def test_read_your_writes_por_usuario(self, bancos, relogio):
+        roteador = RoteadorReplicas(bancos[2:], leitura_propria=5, relogio=relogio)
+        fabrica = _fabrica(bancos[0], roteador)
+        token = bind_request(RequestContext("req-1", user_id=7))
+        try:
+            with fabrica() as db:
+                db.add(Produtos(nome="Novo", modelo="M", categoria="Teste", valor=10, vlr_compra=5,
+                                quantidade_estoque=1))
+                db.commit()
+
+            with fabrica() as db:
+                assert self.controller.contar_produtos(db) == 2  # primário: 1 + o novo
+
+            relogio.agora += 6
+            with fabrica() as db:
+                assert self.controller.contar_produtos(db) == 3  # janela vencida: réplica
+                assert db.query(Produtos).count() == 2
+        finally:
+            reset_request(token)
+
+        # Outro usuário nunca ficou preso ao primário
+        token = bind_request(RequestContext("req-2", user_id=8))
+        try:
+            relogio.agora -= 6
+            with fabrica() as db:
+                assert self.controller.contar_produtos(db) == 3
+        finally:
+            reset_request(token)
+
+    def test_replica_fora_do_ar_cai_para_o_primario(self, bancos, relogio, tmp_path):
+        ausente = create_engine(f"sqlite:///{tmp_path / 'ausente' / 'replica.db'}")
+        roteador = RoteadorReplicas([ausente], quarentena=30, relogio=relogio)
+        fabrica = _fabrica(bancos[0], roteador)
+
+        with fabrica() as db:
+            # A réplica falha na conexão: o método é repetido no primário
+            assert self.controller.contar_produtos(db) == 1
+        assert roteador.falhas(ausente) == 1
+
+        with fabrica() as db:
+            assert self.controller.contar_produtos(db) == 1
+        assert roteador.falhas(ausente) == 1  # em quarentena: nem tentou
+
+        # Réplica volta; depois da quarentena o SELECT 1 a devolve ao round-robin
+        (tmp_path / "ausente").mkdir()
+        _banco(tmp_path / "ausente" / "replica.db", 4).dispose()
+        relogio.agora += 31
+        with fabrica() as db:
+            assert self.controller.contar_produtos(db) == 4
+
+        ausente.dispose()
@@ -0,0 +1,93 @@
+import io
+import json
+import logging
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.exception_handlers import generic_exception_handler
+from src.api.middleware import RequestIdMiddleware, get_current_user
+from src.services.security import JWTHandler
+from src.utils.logKit import JSONLogFormatter, RequestContextFilter
+
+
+@pytest.fixture
+def saida_logs():
+    """Logger da rota de teste gravando JSON, com o filtro de contexto no handler"""
+    logger = logging.getLogger("tests.request_context")
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(JSONLogFormatter(include_keys=["message", "request_id", "route", "user_id"]))
+    handler.addFilter(RequestContextFilter())
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    def registros() -> list[dict]:
+        return [json.loads(linha) for linha in handler.stream.getvalue().splitlines()]
+
+    yield logger, registros
+
+    logger.removeHandler(handler)
+
+
+@pytest.fixture
+def client(saida_logs, monkeypatch):
+    monkeypatch.setattr(JWTHandler, "SECRET_KEY", "teste-secret")
+    JWTHandler.limpar_cache()
+    logger, _ = saida_logs
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+    app.add_exception_handler(Exception, generic_exception_handler)
+
+    # Rota síncrona: roda no threadpool, como as rotas da API
+    @app.get("/items/{item_id}")
+    def item(item_id: int, user: dict = Depends(get_current_user)):
+        logger.info("Item consultado: %s", item_id)
+        return {"item_id": item_id}
+
+    @app.get("/falha")
+    def falha():
+        raise RuntimeError("inesperado")
+
+    yield TestClient(app, raise_server_exceptions=False)
+    JWTHandler.limpar_cache()
+
+
+class TestRequestContext:
+    """X-Request-ID propagado para a resposta e para os logs da requisição"""
+
+    def _auth(self) -> dict:
+        token = JWTHandler.create_access_token({"user_id": 42, "username": "vendedor_test",
+                                                "tipo_usuario": "vendedor"})
+        return {"Authorization": f"Bearer {token}"}
+
+    def test_logs_levam_request_id_rota_e_usuario(self, client, saida_logs):
+        _, registros = saida_logs
+
+        resposta = client.get("/items/7", headers={**self._auth(), "X-Request-ID": "req-abc.1"})
+
+        assert resposta.status_code == 200
+        assert resposta.headers["X-Request-ID"] == "req-abc.1"
+        assert registros() == [{"message": "Item consultado: 7", "request_id": "req-abc.1",
+                                "route": "/items/{item_id}", "user_id": 42}]
+
+    def test_id_gerado_quando_ausente_ou_invalido(self, client):
+        gerado = client.get("/items/1", headers=self._auth()).headers["X-Request-ID"]
+        invalido = client.get("/items/1", headers={**self._auth(), "X-Request-ID": "a b\tc"}).headers["X-Request-ID"]
+
+        assert len(gerado) == 32 and len(invalido) == 32
+        assert gerado != invalido != "a b\tc"
+
+    def test_erro_500_devolve_o_mesmo_id(self, client):
+        resposta = client.get("/falha", headers={"X-Request-ID": "req-erro"})
+
+        assert resposta.status_code == 500
+        assert resposta.headers["X-Request-ID"] == "req-erro"
+
+    def test_fora_de_requisicao_campos_omitidos(self, saida_logs):
+        logger, registros = saida_logs
+
+        logger.info("worker de expiração")
+
+        assert registros() == [{"message": "worker de expiração"}]
@@ -1,3 +1,8 @@
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+
+from src.database.models import Carrinho
+
 class TestVendaFlow:
     """Testes de fluxo completo de venda"""
 
@@ -116,3 +121,40 @@ class TestVendaFlow:
         # 3. Verificar devolução ao estoque
         db_session.refresh(produto_teste)
         assert produto_teste.quantidade_estoque == estoque_antes
+
+    def test_subtotal_do_carrinho_acompanha_itens(self, db_session, venda_controller, carrinho_controller,
+                                                  usuario_vendedor, produto_teste, produto_controller):
+        """Subtotal somado no UPDATE do carrinho, inclusive para o item recém-adicionado"""
+        vendedor_id = usuario_vendedor['id_usuario']
+        assert "sucesso" in produto_controller.cadastrar_produto(db_session, "Mouse", "M1", "Periféricos",
+                                                                 100.0, 10, 50.0)
+        mouse = produto_teste.codigo + 1
+
+        def subtotal():
+            db_session.expire_all()
+            return float(db_session.query(Carrinho.subtotal).filter(Carrinho.usuario_id == vendedor_id,
+                                                                    Carrinho.status == 'ATIVO').scalar())
+
+        assert venda_controller.adicionar_item_carrinho(db_session, vendedor_id, produto_teste.codigo, 1)[0]
+        assert subtotal() == 3500.0
+        assert venda_controller.adicionar_item_carrinho(db_session, vendedor_id, mouse, 2)[0]
+        assert subtotal() == 3700.0
+        assert carrinho_controller.alterar_quantidade(db_session, vendedor_id, mouse, 1)[0]
+        assert subtotal() == 3600.0
+        assert carrinho_controller.remover_item(db_session, vendedor_id, produto_teste.codigo)[0]
+        assert subtotal() == 100.0
+
+    def test_relacionamento_fora_das_opcoes_levanta(self, db_session, venda_controller, usuario_vendedor,
+                                                    produto_teste):
+        """lazy='raise': N+1 vira erro; o carrinho da listagem traz itens e produtos por opção"""
+        vendedor_id = usuario_vendedor['id_usuario']
+        assert venda_controller.adicionar_item_carrinho(db_session, vendedor_id, produto_teste.codigo, 1)[0]
+        db_session.expire_all()
+
+        carrinho = venda_controller.ver_carrinho(db_session, vendedor_id)
+        assert carrinho.itens[0].produto.nome == "Notebook Dell"
+
+        db_session.expire_all()
+        carrinho = db_session.query(Carrinho).filter(Carrinho.usuario_id == vendedor_id).one()
+        with pytest.raises(InvalidRequestError, match="lazy='raise'"):
+            carrinho.itens
@@ -0,0 +1,104 @@
+import socket
+import threading
+import time
+
+import pytest
+import uvicorn
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base, Usuarios, Produtos
+
+
+@pytest.fixture(scope="function")
+def perf_engine(tmp_path):
+    """
+    Engine SQLite em arquivo para benchmarks
+
+    Em arquivo (e não em memória) para que várias conexões/threads
+    enxerguem o mesmo banco, como em produção
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'bench.db'}", connect_args={"check_same_thread": False, "timeout": 30})
+    Base.metadata.create_all(engine)
+
+    yield engine
+
+    engine.dispose()
+
+
+@pytest.fixture
+def perf_session_factory(perf_engine):
+    return sessionmaker(bind=perf_engine)
+
+
+@pytest.fixture
+def perf_session(perf_session_factory):
+    session = perf_session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def vendedor_id(perf_session):
+    """Cria vendedor direto no banco (sem bcrypt, que distorceria os tempos)"""
+    usuario = Usuarios(username="bench_vendedor", email="bench@loja.com", senha_hash="x",
+                       nome_completo="Vendedor Benchmark", tipo_usuario="vendedor")
+    perf_session.add(usuario)
+    perf_session.commit()
+    return usuario.id_usuario
+
+
+@pytest.fixture
+def criar_produtos(perf_session):
+    """Retorna função que insere produtos em massa e devolve os códigos criados"""
+
+    def _criar(quantidade: int, estoque: int = 1_000_000, reservado: int = 0) -> list[int]:
+        inicio = perf_session.query(Produtos).count()
+        perf_session.execute(insert(Produtos), [
+            {
+                "nome": f"Produto {i}",
+                "modelo": f"M{i}",
+                "categoria": f"Categoria {i % 10}",
+                "valor": 100,
+                "vlr_compra": 50,
+                "quantidade_estoque": estoque,
+                "quantidade_reservada": reservado,
+                "ativo": True,
+            }
+            for i in range(inicio, inicio + quantidade)
+        ])
+        perf_session.commit()
+        return [codigo for (codigo,) in perf_session.query(Produtos.codigo)
+                .order_by(Produtos.codigo).offset(inicio).all()]
+
+    return _criar
+
+
+@pytest.fixture
+def iniciar_servidor():
+    """
+    Retorna função que sobe o app num uvicorn real (thread separada)
+
+    A função devolve a URL base; os servidores são encerrados no teardown.
+    """
+    servidores = []
+
+    def _iniciar(app) -> str:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            porta = sock.getsockname()[1]
+
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=porta, log_level="warning"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.01)
+
+        servidores.append((server, thread))
+        return f"http://127.0.0.1:{porta}"
+
+    yield _iniciar
+
+    for server, thread in servidores:
+        server.should_exit = True
+        thread.join(timeout=10)
@@ -0,0 +1,1110 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from statistics import median, quantiles
+
+import pytest
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import event, insert, text
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from src.api.container import get_controllers
+from src.api.middleware import MetricasMiddleware, get_current_user, require_vendedor_or_above
+from src.api.middleware.request_context import _ContextoASGI
+from src.api.routes.vendas import get_venda_controller, vendas_router
+from src.api.schemas.produto_schema import ProdutosPagina
+
+from src.controllers.auth_controller import AuthController
+from src.controllers.carrinho_controller import CarrinhoController
+from src.controllers.cliente_controller import ClienteController
+from src.controllers.estoque_controller import EstoqueController
+from src.controllers.produto_controller import ProdutoController
+from src.controllers.venda_controller import VendaController
+from src.database import instrumentacao
+from src.database.busca import reconstruir_indice
+from src.database.cache_produtos import cache_para
+from src.database.configuracao import ConfiguracaoEngine, criar_engine
+from src.database.instrumentacao import EstatisticasRequisicao, estatisticas_requisicao
+from src.database.models import (Base, Carrinho, Clientes, ItemCarrinho, MovimentacaoEstoque, Produtos, Reserva,
+                                 Usuarios)
+from src.services.metricas import RegistroMetricas
+from src.services.security import JWTHandler, PasswordHandler
+from src.services.security.password_handler import criar_executor
+from src.services.workers import ReservaExpiracaoWorker
+from src.utils.logKit import get_logger
+from src.utils.logKit import formatters
+from src.utils.logKit.context import bind_request, reset_request
+from src.utils.logKit.filters import DedupFilter, RateLimitFilter, RequestContextFilter, SamplingFilter
+from src.utils.logKit.formatters import LOG_RECORD_KEYS, TZ, JSONLogFormatter
+from src.utils.logKit.pipeline import BatchedJSONLFileHandler, BatchedStreamHandler, install_queue_pipeline
+
+
+def medir_ms(funcao, repeticoes: int) -> list[float]:
+    """Executa `funcao` N vezes e retorna as latências em ms"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+@pytest.mark.slow
+class TestBenchmarkExpiracaoReservas:
+    """Adicionar ao carrinho com 10k reservas expiradas pendentes"""
+
+    RESERVAS_EXPIRADAS = 10_000
+
+    def _semear_reservas_expiradas(self, session, produtos: list[int], usuario_id: int) -> None:
+        vencida = datetime.now() - timedelta(hours=1)
+        session.execute(insert(Reserva), [
+            {"produto_id": produtos[i % len(produtos)], "usuario_id": usuario_id, "quantidade": 1,
+             "expira_em": vencida, "ativa": True}
+            for i in range(self.RESERVAS_EXPIRADAS)
+        ])
+        session.commit()
+
+    def test_adicionar_item_nao_paga_limpeza_global(self, perf_session, perf_session_factory, vendedor_id,
+                                                     criar_produtos):
+        produtos = criar_produtos(200, reservado=self.RESERVAS_EXPIRADAS // 200)
+        self._semear_reservas_expiradas(perf_session, produtos, vendedor_id)
+
+        controller = CarrinhoController()
+        alvos = iter(produtos)
+        tempos = medir_ms(
+            lambda: controller.adicionar_item(perf_session, vendedor_id, next(alvos), 1), repeticoes=50)
+
+        # O caminho da requisição apenas lê: as reservas vencidas continuam pendentes
+        pendentes = perf_session.query(Reserva).filter(Reserva.ativa == True,
+                                                       Reserva.expira_em < datetime.now()).count()
+        assert pendentes == self.RESERVAS_EXPIRADAS
+
+        worker = ReservaExpiracaoWorker(tamanho_lote=500, session_factory=perf_session_factory)
+        inicio = time.perf_counter()
+        metricas = worker.executar_uma_vez()
+        varredura_ms = (time.perf_counter() - inicio) * 1000
+
+        assert metricas.reservas_liberadas == self.RESERVAS_EXPIRADAS
+
+        perf_session.expire_all()
+        reservado_total = sum(p.quantidade_reservada for p in perf_session.query(Produtos).all())
+        assert reservado_total == 50
+
+        print(f"\nadd-to-cart com {self.RESERVAS_EXPIRADAS} reservas expiradas pendentes: "
+              f"p50={median(tempos):.2f}ms max={max(tempos):.2f}ms")
+        print(f"varredura do worker ({self.RESERVAS_EXPIRADAS} reservas, lotes de 500): {varredura_ms:.0f}ms")
+
+
+@pytest.mark.slow
+class TestConcorrenciaReservas:
+    """Muitas threads disputando o mesmo SKU não podem reservar além do estoque"""
+
+    ESTOQUE = 200
+    THREADS = 16
+    TENTATIVAS_POR_THREAD = 40
+
+    def test_sku_quente_sem_overselling(self, perf_session, perf_session_factory, vendedor_id, criar_produtos):
+        (produto_id,) = criar_produtos(1, estoque=self.ESTOQUE)
+        controller = EstoqueController()
+        barreira = threading.Barrier(self.THREADS)
+
+        def comprador() -> int:
+            db = perf_session_factory()
+            sucessos = 0
+            try:
+                barreira.wait()
+                for _ in range(self.TENTATIVAS_POR_THREAD):
+                    sucesso, _ = controller.reservar_estoque(db, produto_id, 1, vendedor_id)
+                    sucessos += sucesso
+            finally:
+                db.close()
+            return sucessos
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.THREADS) as pool:
+            sucessos = sum(pool.map(lambda _: comprador(), range(self.THREADS)))
+        duracao = time.perf_counter() - inicio
+
+        perf_session.expire_all()
+        produto = perf_session.get(Produtos, produto_id)
+        reservas_ativas = perf_session.query(Reserva).filter(Reserva.ativa == True).count()
+
+        assert produto.quantidade_reservada <= produto.quantidade_estoque
+        assert produto.quantidade_reservada == sucessos == reservas_ativas
+        assert sucessos == self.ESTOQUE
+
+        tentativas = self.THREADS * self.TENTATIVAS_POR_THREAD
+        print(f"\n{tentativas} tentativas em {self.THREADS} threads: {sucessos} reservas, "
+              f"{tentativas / duracao:.0f} tentativas/s ({duracao * 1000:.0f}ms)")
+
+
+@pytest.mark.slow
+class TestBenchmarkCheckout:
+    """Latência do checkout conforme o número de linhas do carrinho"""
+
+    ESTOQUE = 1_000
+
+    def _montar_carrinho(self, session, produtos: list[int], usuario_id: int) -> None:
+        expira = datetime.now() + timedelta(minutes=30)
+        carrinho = Carrinho(usuario_id=usuario_id, expira_em=expira, subtotal=200 * len(produtos), status='ATIVO')
+        session.add(carrinho)
+        session.flush()
+
+        session.execute(insert(ItemCarrinho), [
+            {"carrinho_id": carrinho.id_carrinho, "produto_id": pid, "quantidade": 2, "preco_unitario": 100,
+             "subtotal": 200}
+            for pid in produtos
+        ])
+        session.execute(insert(Reserva), [
+            {"produto_id": pid, "usuario_id": usuario_id, "quantidade": 2, "expira_em": expira, "ativa": True}
+            for pid in produtos
+        ])
+        session.commit()
+
+    @pytest.mark.parametrize("linhas", [1, 10, 50, 200])
+    def test_checkout_transacao_unica(self, perf_engine, perf_session, vendedor_id, criar_produtos, linhas):
+        produtos = criar_produtos(linhas, estoque=self.ESTOQUE, reservado=2)
+        self._montar_carrinho(perf_session, produtos, vendedor_id)
+
+        commits = []
+        statements = []
+        event.listen(perf_engine, "commit", lambda conn: commits.append(1))
+        event.listen(perf_engine, "before_cursor_execute", lambda *args: statements.append(1))
+
+        inicio = time.perf_counter()
+        sucesso, msg, dados = VendaController().finalizar_venda(perf_session, vendedor_id)
+        decorrido_ms = (time.perf_counter() - inicio) * 1000
+
+        print(f"\n[checkout] {linhas} linhas: {decorrido_ms:.1f} ms, "
+              f"{len(statements)} statements, {len(commits)} commit(s)")
+
+        assert sucesso, msg
+        assert dados["total_itens"] == linhas
+        assert len(commits) == 1
+
+        perf_session.expire_all()
+        estoques = {p.quantidade_estoque for p in perf_session.query(Produtos).filter(Produtos.codigo.in_(produtos))}
+        assert estoques == {self.ESTOQUE - 2}
+        assert perf_session.query(Reserva).filter(Reserva.ativa == True).count() == 0
+        assert perf_session.query(MovimentacaoEstoque).filter(
+            MovimentacaoEstoque.venda_id == dados["id_venda"]).count() == linhas
+
+    def test_checkout_sem_estoque_nao_altera_nada(self, perf_session, vendedor_id, criar_produtos):
+        produtos = criar_produtos(5, estoque=self.ESTOQUE, reservado=2)
+        self._montar_carrinho(perf_session, produtos, vendedor_id)
+
+        # Último produto esgotado depois de entrar no carrinho
+        perf_session.query(Produtos).filter(Produtos.codigo == produtos[-1]).update(
+            {"quantidade_estoque": 1, "quantidade_reservada": 0})
+        perf_session.commit()
+
+        sucesso, msg, dados = VendaController().finalizar_venda(perf_session, vendedor_id)
+
+        assert not sucesso
+        assert dados is None
+
+        perf_session.expire_all()
+        estoques = [p.quantidade_estoque for p in perf_session.query(Produtos).order_by(Produtos.codigo)]
+        assert estoques == [self.ESTOQUE] * 4 + [1]
+        assert perf_session.query(MovimentacaoEstoque).count() == 0
+        assert perf_session.query(Reserva).filter(Reserva.ativa == True).count() == 5
+        assert perf_session.query(Carrinho).one().status == 'ATIVO'
+
+
+@pytest.mark.slow
+class TestBenchmarkLogin:
+    """Logins/s por executor de bcrypt e número de clientes simultâneos"""
+
+    ROUNDS = 10
+    DURACAO_SEGUNDOS = 2.0
+    SENHA = "Bench123!@#"
+
+    def _logins_por_segundo(self, session_factory, clientes: int) -> float:
+        auth = AuthController()
+        fim = time.perf_counter() + self.DURACAO_SEGUNDOS
+
+        def cliente() -> int:
+            feitos = 0
+            while time.perf_counter() < fim:
+                db = session_factory()
+                try:
+                    sucesso, msg, _ = auth.login(db=db, username="bench_login", senha=self.SENHA)
+                    assert sucesso, msg
+                    feitos += 1
+                finally:
+                    db.close()
+            return feitos
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clientes) as pool:
+            total = sum(pool.map(lambda _: cliente(), range(clientes)))
+        return total / (time.perf_counter() - inicio)
+
+    def test_logins_por_segundo(self, monkeypatch, perf_session, perf_session_factory):
+        monkeypatch.setattr(JWTHandler, "SECRET_KEY", "bench-secret")
+        monkeypatch.setattr(PasswordHandler, "ROUNDS", self.ROUNDS)
+        AuthController().registrar_usuario(db=perf_session, username="bench_login", email="login@loja.com",
+                                           senha=self.SENHA, nome_completo="Bench Login", tipo_usuario="vendedor")
+
+        resultados = {}
+        try:
+            for tipo in ("inline", "thread", "process"):
+                PasswordHandler.configurar_executor(criar_executor(tipo))
+                for clientes in (1, 4, 16):
+                    resultados[(tipo, clientes)] = self._logins_por_segundo(perf_session_factory, clientes)
+        finally:
+            PasswordHandler.encerrar_executor()
+
+        for (tipo, clientes), taxa in resultados.items():
+            print(f"\n[login bcrypt={self.ROUNDS}] executor={tipo:<7} clientes={clientes:>2}: {taxa:.1f} logins/s", end="")
+        print()
+
+        assert all(taxa > 0 for taxa in resultados.values())
+
+
+@pytest.mark.slow
+class TestBenchmarkAuth:
+    """Custo da dependency de autenticação por requisição (µs)"""
+
+    REPETICOES = 20_000
+
+    def _custo_us(self, token: str, dependencies_por_rota: int) -> float:
+        credenciais = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+        def requisicao():
+            request = Request({"type": "http", "headers": []})
+            for _ in range(dependencies_por_rota):
+                require_vendedor_or_above(get_current_user(request, credenciais))
+
+        return median(medir_ms(requisicao, self.REPETICOES)) * 1000
+
+    def test_custo_auth_por_requisicao(self, monkeypatch):
+        monkeypatch.setattr(JWTHandler, "SECRET_KEY", "bench-secret")
+        token = JWTHandler.create_access_token(
+            {"user_id": 1, "username": "bench_vendedor", "tipo_usuario": "vendedor"})
+        JWTHandler.limpar_cache()
+
+        resultados = {}
+        try:
+            monkeypatch.setattr(JWTHandler, "CACHE_TAMANHO", 0)
+            resultados["sem cache"] = self._custo_us(token, 2)
+
+            monkeypatch.setattr(JWTHandler, "CACHE_TAMANHO", 4096)
+            resultados["cache quente"] = self._custo_us(token, 2)
+        finally:
+            JWTHandler.limpar_cache()
+
+        inicio = time.perf_counter()
+        for _ in range(self.REPETICOES // 10):
+            JWTHandler._verificar_assinatura(token)
+        resultados["decode jwt (referência)"] = (time.perf_counter() - inicio) / (self.REPETICOES // 10) * 1e6
+
+        for cenario, custo in resultados.items():
+            print(f"\n[auth por requisição] {cenario:<24}: {custo:.1f} µs", end="")
+        print()
+
+        assert resultados["cache quente"] < resultados["sem cache"]
+
+
+@pytest.mark.slow
+class TestBenchmarkListagemClientes:
+    """Página de 100 clientes com 1k e 1M clientes cadastrados"""
+
+    PAGINA = 100
+    LOTE_INSERCAO = 50_000
+
+    def _semear_clientes(self, session, inicio: int, fim: int) -> None:
+        for lote in range(inicio, fim, self.LOTE_INSERCAO):
+            session.execute(insert(Clientes), [
+                {"nome": f"Cliente {i}", "cpf": f"{i:011d}", "dt_nascimento": datetime(1990, 1, 1),
+                 "telefone": "11999999999", "endereco": "Rua Teste, 1", "ativo": True,
+                 "data_cadastro": datetime.now()}
+                for i in range(lote, min(lote + self.LOTE_INSERCAO, fim))
+            ])
+        session.commit()
+
+    def _medir(self, session, total: int) -> dict:
+        controller = ClienteController()
+        meio = total // 2
+
+        def keyset():
+            session.expunge_all()
+            assert len(controller.listar_clientes(session, limite=self.PAGINA, apos_id=meio)) == self.PAGINA
+
+        def offset():
+            session.expunge_all()
+            assert len(controller.listar_clientes(session, limite=self.PAGINA, pular=meio)) == self.PAGINA
+
+        return {
+            "keyset (meio)": median(medir_ms(keyset, 50)),
+            "offset (meio)": median(medir_ms(offset, 10)),
+            "count": median(medir_ms(lambda: controller.contar_clientes(session), 5)),
+        }
+
+    def test_pagina_custa_o_mesmo_com_1k_e_1m(self, perf_session):
+        self._semear_clientes(perf_session, 1, 1_001)
+        pequeno = self._medir(perf_session, 1_000)
+
+        self._semear_clientes(perf_session, 1_001, 1_000_001)
+        grande = self._medir(perf_session, 1_000_000)
+
+        for cenario in pequeno:
+            print(f"\n[clientes página={self.PAGINA}] {cenario:<14}: 1k={pequeno[cenario]:.2f} ms "
+                  f"1M={grande[cenario]:.2f} ms", end="")
+        print()
+
+        # Keyset não pode crescer com a base (folga para ruído de I/O)
+        assert grande["keyset (meio)"] < pequeno["keyset (meio)"] * 3
+
+
+class TestContainerControllers:
+    """Controllers únicos por processo, com dependências compartilhadas"""
+
+    def test_container_reaproveita_controllers(self):
+        request = Request({"type": "http", "headers": [], "app": FastAPI()})
+
+        primeiro = asyncio.run(get_venda_controller(request))
+        segundo = asyncio.run(get_venda_controller(request))
+
+        assert primeiro is segundo
+        assert primeiro.estoque_controller is get_controllers(request).estoque
+        assert primeiro.carrinho_controller.estoque_controller is primeiro.estoque_controller
+
+
+@pytest.mark.slow
+class TestBenchmarkResolucaoControllers:
+    """Custo por requisição de resolver o controller (µs)"""
+
+    REPETICOES = 5_000
+
+    def _custo_us(self, resolver) -> float:
+        async def medir():
+            inicio = time.perf_counter()
+            for _ in range(self.REPETICOES):
+                await resolver()
+            return (time.perf_counter() - inicio) / self.REPETICOES * 1e6
+
+        return asyncio.run(medir())
+
+    def test_custo_resolucao_por_requisicao(self):
+        request = Request({"type": "http", "headers": [], "app": FastAPI()})
+
+        # Antes: dependency síncrona (FastAPI despacha no threadpool) construindo o controller
+        antes = self._custo_us(lambda: run_in_threadpool(VendaController))
+        construcao = self._custo_us(lambda: asyncio.sleep(0, VendaController()))
+        depois = self._custo_us(lambda: get_venda_controller(request))
+
+        print(f"\n[resolução VendaController] antes={antes:.1f} µs (construção {construcao:.1f} µs) "
+              f"depois={depois:.2f} µs")
+
+        assert depois < antes
+
+
+@pytest.mark.slow
+class TestBenchmarkLoggerDebugDesligado:
+    """Custo de `logger.debug` com DEBUG desligado sob tráfego de requisições"""
+
+    REQUISICOES = 20_000
+    LOGGERS_POR_REQUISICAO = ("LoggerBenchVendas", "LoggerBenchEstoque", "LoggerBenchCarrinho")
+    DEBUGS_POR_REQUISICAO = 10
+
+    def _custo_ns_por_debug(self, obter_logger) -> float:
+        inicio = time.perf_counter()
+        for i in range(self.REQUISICOES):
+            # Controllers construídos na requisição pedem seus loggers
+            loggers = [obter_logger(nome, "WARNING") for nome in self.LOGGERS_POR_REQUISICAO]
+            for j in range(self.DEBUGS_POR_REQUISICAO):
+                loggers[j % len(loggers)].debug("item %s processado", i)
+        return (time.perf_counter() - inicio) / (self.REQUISICOES * self.DEBUGS_POR_REQUISICAO) * 1e9
+
+    def test_debug_desligado_por_requisicao(self):
+        # Processo da API tem dezenas de loggers (sqlalchemy, uvicorn, controllers, rotas)
+        for i in range(50):
+            logging.getLogger(f"LoggerBenchOutro{i}").debug("aquecer")
+
+        def get_logger_antigo(nome, nivel):
+            logger = logging.getLogger(nome)
+            logger.setLevel(nivel)
+            return logger
+
+        antes = self._custo_ns_por_debug(get_logger_antigo)
+        depois = self._custo_ns_por_debug(get_logger)
+
+        logger = get_logger(self.LOGGERS_POR_REQUISICAO[0], "WARNING")
+        inicio = time.perf_counter()
+        for i in range(self.REQUISICOES * self.DEBUGS_POR_REQUISICAO):
+            logger.debug("item %s processado", i)
+        isolado = (time.perf_counter() - inicio) / (self.REQUISICOES * self.DEBUGS_POR_REQUISICAO) * 1e9
+
+        print(f"\n[logger.debug desligado] antes={antes:.0f} ns depois={depois:.0f} ns "
+              f"(só debug, cache quente: {isolado:.0f} ns) por chamada, incluindo get_logger da requisição")
+
+        assert depois < antes
+
+
+class SaidaLenta:
+    """Stream que leva 1 ms por escrita (stdout em pipe cheio, disco/rede lentos)"""
+
+    def write(self, dados: str) -> None:
+        time.sleep(0.001)
+
+    def flush(self) -> None:
+        pass
+
+
+@pytest.mark.slow
+class TestBenchmarkLoggingRequisicao:
+    """Latência por requisição com logging desligado, síncrono e em fila com lotes"""
+
+    REPETICOES = 2_000
+    RODADAS = 3
+
+    def _medir(self, perf_session, produto: int, vendedor_id: int) -> tuple[list[float], float]:
+        controller = EstoqueController()
+        logger = logging.getLogger("LoggerBenchRequisicao")
+
+        # Requisição de leitura (1 SELECT + 1 INFO): sem commit nem crescimento de tabela entre modos
+        latencias = medir_ms(lambda: controller.verificar_disponibilidade(perf_session, produto, 1, vendedor_id),
+                             self.REPETICOES)
+
+        inicio = time.perf_counter()
+        for i in range(self.REPETICOES):
+            logger.info("Produto verificado: %s Usuario:%s", produto, i)
+        custo_registro_us = (time.perf_counter() - inicio) / self.REPETICOES * 1e6
+        return latencias, custo_registro_us
+
+    def test_latencia_com_logging(self, perf_session, vendedor_id, criar_produtos, tmp_path):
+        produto = criar_produtos(1)[0]
+        root = logging.getLogger()
+        handlers_originais, nivel_original = list(root.handlers), root.level
+        for handler in handlers_originais:
+            root.removeHandler(handler)
+        root.setLevel(logging.INFO)
+
+        def desligado():
+            logging.disable(logging.INFO)
+            return lambda: logging.disable(logging.NOTSET)
+
+        def sincrono():
+            handler = logging.FileHandler(tmp_path / "sync.jsonl", encoding="utf-8")
+            handler.setFormatter(JSONLogFormatter())
+            root.addHandler(handler)
+            return lambda: (root.removeHandler(handler), handler.close())
+
+        def fila():
+            handler = BatchedJSONLFileHandler(tmp_path / "async.jsonl", max_bytes=0)
+            root.addHandler(handler)
+            listener = install_queue_pipeline(root)
+            return lambda: (listener.stop(), root.removeHandler(root.handlers[0]), handler.close())
+
+        def sincrono_lento():
+            handler = logging.StreamHandler(SaidaLenta())
+            root.addHandler(handler)
+            return lambda: root.removeHandler(handler)
+
+        def fila_lenta():
+            root.addHandler(BatchedStreamHandler(SaidaLenta()))
+            listener = install_queue_pipeline(root)
+            return lambda: (listener.stop(), root.removeHandler(root.handlers[0]))
+
+        modos = {"desligado": desligado, "síncrono": sincrono, "fila + lotes": fila,
+                 "síncrono, saída lenta": sincrono_lento, "fila, saída lenta": fila_lenta}
+        latencias = {modo: [] for modo in modos}
+        custos = {modo: [] for modo in modos}
+        try:
+            for rodada in range(self.RODADAS):
+                for modo, configurar in modos.items():
+                    desfazer = configurar()
+                    try:
+                        medidas, custo = self._medir(perf_session, produto, vendedor_id)
+                    finally:
+                        desfazer()
+                    latencias[modo].extend(medidas)
+                    custos[modo].append(custo)
+        finally:
+            logging.disable(logging.NOTSET)
+            for handler in handlers_originais:
+                root.addHandler(handler)
+            root.setLevel(nivel_original)
+
+        for modo in modos:
+            p99 = quantiles(latencias[modo], n=100)[98]
+            print(f"\n[logging por requisição] {modo:<21}: p50={median(latencias[modo]) * 1000:.0f} µs "
+                  f"p99={p99 * 1000:.0f} µs | logger.info na thread da requisição: {median(custos[modo]):.1f} µs",
+                  end="")
+        print()
+
+        linhas = len((tmp_path / "async.jsonl").read_text(encoding="utf-8").splitlines())
+        assert linhas == 2 * self.REPETICOES * self.RODADAS
+        assert median(custos["fila, saída lenta"]) < median(custos["síncrono, saída lenta"])
+
+
+class FormatterReferencia(logging.Formatter):
+    """JSONLogFormatter original (getattr por chave, vars(record), ZoneInfo e json por registro)"""
+
+    def __init__(self):
+        super().__init__()
+        self.include_keys = LOG_RECORD_KEYS
+
+    def format(self, record):
+        dict_record = {key: getattr(record, key) for key in self.include_keys
+                       if key in LOG_RECORD_KEYS and getattr(record, key, None) is not None}
+        dict_record["created"] = datetime.fromtimestamp(record.created, tz=TZ).strftime("%Y-%m-%dT%H:%M:%S%z")
+        dict_record["message"] = record.getMessage()
+        for key, val in vars(record).items():
+            if key not in LOG_RECORD_KEYS and key != "asctime":
+                dict_record[key] = val
+        return json.dumps(dict_record)
+
+
+@pytest.mark.slow
+class TestBenchmarkJSONLogFormatter:
+    """Registros/s formatados: original vs plano pré-calculado (orjson e fallback stdlib)"""
+
+    REGISTROS = 20_000
+
+    def _registros_por_segundo(self, formatter) -> float:
+        registros = [logging.LogRecord("LoggerVendasController", logging.INFO, __file__, 10,
+                                       "Item adicionado: produto %s qtd %s", (i, 2), None)
+                     for i in range(self.REGISTROS)]
+        melhor = float("inf")
+        for _ in range(3):
+            inicio = time.perf_counter()
+            for registro in registros:
+                formatter.format(registro)
+            melhor = min(melhor, time.perf_counter() - inicio)
+        return self.REGISTROS / melhor
+
+    def test_registros_por_segundo(self, monkeypatch):
+        resultados = {
+            "original": self._registros_por_segundo(FormatterReferencia()),
+            "plano + orjson": self._registros_por_segundo(JSONLogFormatter()),
+        }
+        monkeypatch.setattr(formatters, "orjson", None)
+        resultados["plano + json stdlib"] = self._registros_por_segundo(JSONLogFormatter())
+
+        for modo, taxa in resultados.items():
+            print(f"\n[JSONLogFormatter] {modo:<19}: {taxa:>9,.0f} registros/s "
+                  f"({taxa / resultados['original']:.1f}x)", end="")
+        print()
+
+        assert resultados["plano + orjson"] > resultados["original"] * 3
+
+
+@pytest.mark.slow
+class TestBenchmarkFiltrosLog:
+    """Custo de um INFO de hot path (f-string, JSON em arquivo) com e sem filtros"""
+
+    REGISTROS = 20_000
+
+    def _medir(self, tmp_path, nome: str, filtro: logging.Filter | None) -> tuple[float, int]:
+        caminho = tmp_path / f"{nome}.jsonl"
+        handler = logging.FileHandler(caminho, encoding="utf-8")
+        handler.setFormatter(JSONLogFormatter())
+        if filtro is not None:
+            handler.addFilter(filtro)
+
+        logger = logging.getLogger(f"LoggerBenchFiltros.{nome}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        try:
+            inicio = time.perf_counter()
+            for i in range(self.REGISTROS):
+                logger.info(f"Produto verificado: Produto {i % 50} Usuario:{i % 5} ")
+            custo_us = (time.perf_counter() - inicio) / self.REGISTROS * 1e6
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+        return custo_us, len(caminho.read_text(encoding="utf-8").splitlines())
+
+    def test_custo_por_registro(self, tmp_path):
+        modos = {
+            "sem filtro": None,
+            "amostragem 10%": SamplingFilter(rate=0.1, seed=1),
+            "rate limit 10/s": RateLimitFilter(rate=10, burst=20),
+            "dedup 1s": DedupFilter(window=1.0),
+        }
+        resultados = {nome: self._medir(tmp_path, nome.split()[0], filtro) for nome, filtro in modos.items()}
+
+        for nome, (custo, linhas) in resultados.items():
+            print(f"\n[filtros de log] {nome:<16}: {custo:5.1f} µs por logger.info, {linhas:>6} linhas gravadas",
+                  end="")
+        print()
+
+        # O LogRecord é criado antes do filtro: o ganho é formatar e gravar menos
+        for nome in ("amostragem 10%", "rate limit 10/s", "dedup 1s"):
+            assert resultados[nome][0] < resultados["sem filtro"][0]
+        assert resultados["rate limit 10/s"][1] < 100
+
+
+@pytest.mark.slow
+class TestBenchmarkContextoRequisicao:
+    """Custo por registro do RequestContextFilter (ContextVar + 3 atributos)"""
+
+    REGISTROS = 200_000
+
+    def _custo_ns(self, filtro: RequestContextFilter, registros: list[logging.LogRecord]) -> float:
+        melhor = float("inf")
+        for _ in range(5):
+            inicio = time.perf_counter()
+            for registro in registros:
+                filtro.filter(registro)
+            melhor = min(melhor, time.perf_counter() - inicio)
+        return melhor / len(registros) * 1e9
+
+    def test_custo_por_registro_abaixo_de_1us(self):
+        filtro = RequestContextFilter()
+        registros = [logging.LogRecord("LoggerVendasController", logging.INFO, __file__, 10,
+                                       "Item adicionado", (), None) for _ in range(self.REGISTROS)]
+
+        fora = self._custo_ns(filtro, registros)
+        # Contexto do middleware: rota lida do scope depois do roteamento
+        rota = vendas_router.routes[0]
+        contexto = _ContextoASGI("0f3c2a9e5b7d4c1a8e6f0b2d4a6c8e0f", {"route": rota})
+        contexto.user_id = 42
+        token = bind_request(contexto)
+        try:
+            dentro = self._custo_ns(filtro, registros)
+        finally:
+            reset_request(token)
+
+        print(f"\n[RequestContextFilter] dentro da requisição={dentro:.0f} ns fora={fora:.0f} ns por registro "
+              f"(rota {registros[0].route})")
+
+        assert dentro < 1000 and fora < 1000
+
+
+@pytest.mark.slow
+class TestBenchmarkInstrumentacaoSQL:
+    """Custo da instrumentação por statement com amostragem 0, 10% e 100%"""
+
+    REPETICOES = 5_000
+    CHAMADAS_HOOKS = 100_000
+    AMOSTRAGENS = (0.0, 0.1, 1.0)
+
+    def _custo_statement_us(self, perf_engine, produto: int) -> float:
+        consulta = text("SELECT quantidade_estoque FROM produtos WHERE codigo = :codigo")
+        with perf_engine.connect() as conn:
+            inicio = time.perf_counter()
+            for _ in range(self.REPETICOES):
+                conn.execute(consulta, {"codigo": produto}).scalar()
+            return (time.perf_counter() - inicio) / self.REPETICOES * 1e6
+
+    def _custo_hooks_us(self, conn, contexto, statement: str) -> float:
+        """Par before/after chamado direto: sem o ruído do SQLite (1 CPU), só o custo da instrumentação"""
+        melhor = float("inf")
+        for _ in range(3):
+            inicio = time.perf_counter()
+            for _ in range(self.CHAMADAS_HOOKS):
+                instrumentacao.antes_de_executar(conn, None, statement, None, contexto, False)
+                instrumentacao.depois_de_executar(conn, None, statement, None, contexto, False)
+            melhor = min(melhor, time.perf_counter() - inicio)
+        return melhor / self.CHAMADAS_HOOKS * 1e6
+
+    def test_custo_por_statement(self, perf_engine, criar_produtos, monkeypatch):
+        produto = criar_produtos(1)[0]
+        metricas = instrumentacao.MetricasSQL()
+        monkeypatch.setattr(instrumentacao, "metricas_sql", metricas)
+        token = estatisticas_requisicao.set(EstatisticasRequisicao())
+
+        # Listeners de antes (corpo só rodava com DEBUG em development): o SQLAlchemy já pagava o despacho
+        def listener_antigo(conn, cursor, statement, params, context, executemany):
+            if False:
+                pass
+
+        try:
+            sem_instrumentacao = self._custo_statement_us(perf_engine, produto)
+            event.listen(perf_engine, "before_cursor_execute", listener_antigo)
+            event.listen(perf_engine, "after_cursor_execute", listener_antigo)
+            listeners_antigos = self._custo_statement_us(perf_engine, produto)
+            event.remove(perf_engine, "before_cursor_execute", listener_antigo)
+            event.remove(perf_engine, "after_cursor_execute", listener_antigo)
+
+            instrumentacao.instrumentar_engine(perf_engine)
+            resultados = {}
+            with perf_engine.connect() as conn:
+                resultado = conn.execute(text("SELECT quantidade_estoque FROM produtos WHERE codigo = :codigo"),
+                                         {"codigo": produto})
+                contexto, statement = resultado.context, resultado.context.statement
+                for amostragem in self.AMOSTRAGENS:
+                    metricas.amostragem = amostragem
+                    resultados[amostragem] = (self._custo_statement_us(perf_engine, produto),
+                                              self._custo_hooks_us(conn, contexto, statement))
+        finally:
+            event.remove(perf_engine, "before_cursor_execute", instrumentacao.antes_de_executar)
+            event.remove(perf_engine, "after_cursor_execute", instrumentacao.depois_de_executar)
+            estatisticas_requisicao.reset(token)
+
+        print(f"\n[instrumentação SQL] sem listeners     : {sem_instrumentacao:5.1f} µs por statement", end="")
+        print(f"\n[instrumentação SQL] listeners antigos : {listeners_antigos:5.1f} µs por statement", end="")
+        for amostragem, (statement_us, hooks_us) in resultados.items():
+            print(f"\n[instrumentação SQL] amostragem {amostragem:4.0%}   : {statement_us:5.1f} µs por statement "
+                  f"(hooks: {hooks_us:.2f} µs)", end="")
+        print()
+
+        resumo = next(iter(metricas.snapshot().values()))
+        assert resumo["statement"] == "SELECT quantidade_estoque FROM produtos WHERE codigo = ?"
+        assert resultados[0.1][1] < 3
+
+
+@pytest.mark.slow
+class TestBenchmarkMetricas:
+    """Custo do MetricasMiddleware por requisição, do incremento sob threads e do /metrics"""
+
+    REQUISICOES = 20_000
+    INCREMENTOS = 50_000
+    THREADS = 4
+
+    async def _custo_requisicoes_us(self, app, scope: dict) -> float:
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            pass
+
+        melhor = float("inf")
+        for _ in range(3):
+            inicio = time.perf_counter()
+            for _ in range(self.REQUISICOES):
+                await app(dict(scope), receive, send)
+            melhor = min(melhor, time.perf_counter() - inicio)
+        return melhor / self.REQUISICOES * 1e6
+
+    def test_overhead_do_middleware(self):
+        async def app_vazio(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"{}"})
+
+        rota = vendas_router.routes[0]
+        scope = {"type": "http", "method": "GET", "path": "/sales/cart", "headers": [], "route": rota}
+
+        sem = asyncio.run(self._custo_requisicoes_us(app_vazio, scope))
+        com = asyncio.run(self._custo_requisicoes_us(MetricasMiddleware(app_vazio), scope))
+
+        print(f"\n[MetricasMiddleware] sem={sem:.2f} µs com={com:.2f} µs por requisição "
+              f"(overhead {com - sem:.2f} µs)")
+
+        assert com - sem < 20
+
+    def test_contadores_exatos_sob_threads(self):
+        registro = RegistroMetricas()
+        contador = registro.contador("bench_total", "Bench", ("rota",))
+        histograma = registro.histograma("bench_seconds", "Bench", ("rota",))
+
+        def trabalhar():
+            for _ in range(self.INCREMENTOS):
+                contador.inc(rota="/sales/checkout")
+                histograma.observar(0.01, rota="/sales/checkout")
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            for futuro in [executor.submit(trabalhar) for _ in range(self.THREADS)]:
+                futuro.result()
+        total = self.INCREMENTOS * self.THREADS
+        custo_us = (time.perf_counter() - inicio) / total * 1e6
+
+        print(f"\n[metricas] inc + observar com {self.THREADS} threads: {custo_us:.2f} µs por par")
+
+        assert contador.snapshot()[0][1] == total
+        assert sum(histograma.snapshot()[0][1]) == total
+
+    def test_exportacao_com_muitas_series(self):
+        registro = RegistroMetricas()
+        latencia = registro.histograma("http_request_duration_seconds", "Latência", ("method", "route", "status"))
+        for indice in range(50):
+            for status in ("200", "404", "500"):
+                latencia.observar(0.02, method="GET", route=f"/rota/{indice}", status=status)
+
+        tempos = medir_ms(registro.exportar, 50)
+
+        print(f"\n[/metrics] 150 séries de histograma: mediana {median(tempos):.2f} ms")
+
+        assert median(tempos) < 50
+
+
+@pytest.mark.slow
+class TestBenchmarkTamanhoPool:
+    """
+    Vazão x tamanho do pool com 32 threads de rota
+
+    Cada operação segura a conexão por ~2 ms (round trip de um banco em rede,
+    simulado com sleep sobre o SQLite). A vazão cresce com o pool até o
+    "joelho", onde o gargalo deixa de ser a espera por conexão.
+    """
+
+    THREADS = 32
+    OPERACOES_POR_THREAD = 15
+    LATENCIA_BANCO = 0.002
+    TAMANHOS = (1, 2, 4, 8, 16, 32)
+
+    def _vazao(self, url: str, produto: int, tamanho: int) -> tuple[float, float]:
+        engine = criar_engine(ConfiguracaoEngine(url=url, pool_size=tamanho, max_overflow=0, pool_timeout=60,
+                                                 pre_ping="desligado"))
+        consulta = text("SELECT quantidade_estoque FROM produtos WHERE codigo = :codigo")
+        esperas = []
+
+        def trabalhar():
+            for _ in range(self.OPERACOES_POR_THREAD):
+                inicio = time.perf_counter()
+                with engine.connect() as conexao:
+                    esperas.append(time.perf_counter() - inicio)
+                    conexao.execute(consulta, {"codigo": produto}).scalar()
+                    time.sleep(self.LATENCIA_BANCO)
+
+        try:
+            inicio = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+                for futuro in [executor.submit(trabalhar) for _ in range(self.THREADS)]:
+                    futuro.result()
+            duracao = time.perf_counter() - inicio
+        finally:
+            engine.dispose()
+
+        p95_espera_ms = quantiles(esperas, n=20)[-1] * 1000
+        return self.THREADS * self.OPERACOES_POR_THREAD / duracao, p95_espera_ms
+
+    def test_joelho_da_vazao(self, perf_engine, criar_produtos):
+        produto = criar_produtos(1)[0]
+        url = perf_engine.url.render_as_string(hide_password=False)
+
+        resultados = {tamanho: self._vazao(url, produto, tamanho) for tamanho in self.TAMANHOS}
+        maxima = max(vazao for vazao, _ in resultados.values())
+        joelho = min(tamanho for tamanho, (vazao, _) in resultados.items() if vazao >= 0.9 * maxima)
+
+        for tamanho, (vazao, espera) in resultados.items():
+            marcador = "  <- joelho" if tamanho == joelho else ""
+            print(f"\n[pool] size={tamanho:2d}: {vazao:6.0f} ops/s, p95 espera por conexão {espera:6.1f} ms{marcador}",
+                  end="")
+        print()
+
+        assert resultados[8][0] > 3 * resultados[1][0]
+        assert resultados[1][1] > resultados[32][1]
+
+
+@pytest.mark.slow
+class TestBenchmarkPerfilSQLite:
+    """
+    Vazão de carrinho + checkout com várias threads no SQLite em arquivo
+
+    padrao: rollback journal (leitores bloqueiam o escritor, fsync a cada commit);
+    desempenho: WAL + synchronous=NORMAL + cache/mmap; + BEGIN IMMEDIATE nas escritas.
+    """
+
+    THREADS = 8
+    VENDAS_POR_THREAD = 15
+    PERFIS = {"padrao": ("padrao", False), "desempenho": ("desempenho", False),
+              "desempenho+immediate": ("desempenho", True)}
+
+    def _vazao(self, url: str, perfil: str, immediate: bool) -> tuple[float, int]:
+        engine = criar_engine(ConfiguracaoEngine(url=url, pool_size=self.THREADS, max_overflow=0, pre_ping="desligado",
+                                                 sqlite_perfil=perfil, sqlite_begin_immediate=immediate))
+        Base.metadata.create_all(engine)
+        fabrica = sessionmaker(bind=engine)
+        with fabrica() as db:
+            db.execute(insert(Usuarios), [
+                {"username": f"vendedor{i}", "email": f"v{i}@loja.com", "senha_hash": "x",
+                 "nome_completo": f"Vendedor {i}", "tipo_usuario": "vendedor"} for i in range(self.THREADS)])
+            db.execute(insert(Produtos), [
+                {"nome": f"Produto {i}", "modelo": f"M{i}", "categoria": "Bench", "valor": 100, "vlr_compra": 50,
+                 "quantidade_estoque": 1_000_000, "quantidade_reservada": 0, "ativo": True} for i in range(20)])
+            db.commit()
+            usuarios = [u for (u,) in db.query(Usuarios.id_usuario).order_by(Usuarios.id_usuario)]
+            produtos = [p for (p,) in db.query(Produtos.codigo).order_by(Produtos.codigo)]
+
+        controller = VendaController()
+        barreira = threading.Barrier(self.THREADS)
+
+        def vendedor(indice: int) -> int:
+            falhas = 0
+            with fabrica() as db:
+                barreira.wait()
+                for venda in range(self.VENDAS_POR_THREAD):
+                    for produto in (produtos[venda % 20], produtos[(venda + indice) % 20]):
+                        sucesso, _ = controller.adicionar_item_carrinho(db, usuarios[indice], produto, 1)
+                        falhas += not sucesso
+                    sucesso, _, _ = controller.finalizar_venda(db, usuarios[indice])
+                    falhas += not sucesso
+            return falhas
+
+        try:
+            inicio = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+                falhas = sum(executor.map(vendedor, range(self.THREADS)))
+            duracao = time.perf_counter() - inicio
+        finally:
+            engine.dispose()
+
+        return self.THREADS * self.VENDAS_POR_THREAD / duracao, falhas
+
+    def test_vazao_por_perfil(self, tmp_path):
+        resultados = {nome: self._vazao(f"sqlite:///{tmp_path / (nome + '.db')}", *perfil)
+                      for nome, perfil in self.PERFIS.items()}
+
+        for nome, (vazao, falhas) in resultados.items():
+            print(f"\n[sqlite {nome:21s}] {vazao:6.1f} checkouts/s ({self.THREADS} threads, {falhas} falhas)", end="")
+        print()
+
+        assert resultados["desempenho+immediate"][1] == 0
+        assert resultados["desempenho+immediate"][0] > resultados["padrao"][0]
+
+
+@pytest.mark.slow
+class TestBenchmarkBuscaProdutos:
+    """
+    Busca de produtos com 100k produtos (SQLite FTS5)
+
+    Referência: LIKE '%termo%' em nome/modelo/categoria, o mais próximo de busca
+    parcial sem índice (percorre a tabela inteira, sem acento nem relevância).
+    """
+
+    TOTAL = 100_000
+    LOTE_INSERCAO = 20_000
+    MARCAS = ("Dell", "Lenovo", "Samsung", "Logitech", "Acer", "Asus", "Positivo", "Multilaser", "Philips", "LG")
+    TIPOS = (("Notebook", "Eletrônicos"), ("Mouse", "Periféricos"), ("Teclado", "Periféricos"),
+             ("Monitor", "Monitores"), ("Cadeira", "Móveis"), ("Fone", "Áudio"), ("Impressora", "Escritório"))
+    BUSCAS = ("note", "note dell", "perife", "eletronicos", "mouse logitech 42", "impressora positivo 9")
+
+    def _semear(self, session) -> None:
+        for lote in range(0, self.TOTAL, self.LOTE_INSERCAO):
+            session.execute(insert(Produtos), [
+                {"nome": f"{self.TIPOS[i % 7][0]} {self.MARCAS[i % 10]} {i}", "modelo": f"Série {i % 997}",
+                 "categoria": self.TIPOS[i % 7][1], "valor": 100, "vlr_compra": 50, "quantidade_estoque": 10}
+                for i in range(lote, min(lote + self.LOTE_INSERCAO, self.TOTAL))
+            ])
+        session.commit()
+        inicio = time.perf_counter()
+        assert reconstruir_indice(session) == self.TOTAL
+        session.commit()
+        print(f"\n[busca 100k] indexação: {(time.perf_counter() - inicio) * 1000:.0f} ms", end="")
+
+    def test_latencia_da_busca(self, perf_session):
+        self._semear(perf_session)
+        controller = ProdutoController()
+        like = text("SELECT codigo FROM produtos WHERE ativo AND (nome LIKE :t OR modelo LIKE :t OR categoria LIKE :t) "
+                    "LIMIT 20")
+
+        resultados = {}
+        for busca in self.BUSCAS:
+            assert controller.pesquisar_produtos(perf_session, busca), busca
+            tempos = medir_ms(lambda: controller.pesquisar_produtos(perf_session, busca, limite=20), 20)
+            referencia = medir_ms(lambda: perf_session.execute(like, {"t": f"%{busca}%"}).all(), 5)
+            resultados[busca] = (median(tempos), quantiles(tempos, n=20)[-1], median(referencia))
+
+        for busca, (p50, p95, referencia) in resultados.items():
+            print(f"\n[busca 100k] {busca!r:24}: p50 {p50:6.2f} ms  p95 {p95:6.2f} ms  (LIKE %termo%: {referencia:6.2f} ms)",
+                  end="")
+        print()
+
+        # Buscas seletivas não dependem do tamanho do catálogo
+        assert resultados["mouse logitech 42"][0] < resultados["mouse logitech 42"][2]
+        assert max(p50 for p50, _, _ in resultados.values()) < 500
+
+
+@pytest.mark.slow
+class TestBenchmarkCacheProdutos:
+    """Statements (round trips) e latência por add-to-cart com e sem o cache de atributos de produto"""
+
+    PRODUTOS = 20
+    ADICOES = 200
+
+    def _medir(self, fabrica, usuario_id: int, produtos: list[int]) -> tuple[float, float]:
+        controller = CarrinhoController()
+        statements = []
+        engine = fabrica.kw["bind"]
+
+        def contar(*args):
+            statements.append(args[2])
+
+        with fabrica() as db:
+            for produto in produtos:  # aquece o cache (e o carrinho)
+                assert controller.adicionar_item(db, usuario_id, produto, 1)[0]
+            event.listen(engine, "before_cursor_execute", contar)
+            try:
+                inicio = time.perf_counter()
+                for i in range(self.ADICOES):
+                    assert controller.adicionar_item(db, usuario_id, produtos[i % self.PRODUTOS], 1)[0]
+                duracao = time.perf_counter() - inicio
+            finally:
+                event.remove(engine, "before_cursor_execute", contar)
+            controller.limpar_carrinho(db, usuario_id)
+        return len(statements) / self.ADICOES, duracao / self.ADICOES * 1000
+
+    def test_round_trips_por_add_to_cart(self, perf_session_factory):
+        with perf_session_factory() as db:
+            db.execute(insert(Usuarios), [{"username": "vendedor", "email": "v@loja.com", "senha_hash": "x",
+                                           "nome_completo": "Vendedor", "tipo_usuario": "vendedor"}])
+            db.execute(insert(Produtos), [
+                {"nome": f"Produto {i}", "modelo": f"M{i}", "categoria": "Bench", "valor": 100, "vlr_compra": 50,
+                 "quantidade_estoque": 1_000_000, "quantidade_reservada": 0} for i in range(self.PRODUTOS)])
+            db.commit()
+            usuario_id = db.query(Usuarios.id_usuario).scalar()
+            produtos = [p for (p,) in db.query(Produtos.codigo).order_by(Produtos.codigo)]
+            cache = cache_para(db)
+
+        cache.tamanho = 0
+        sem_cache = self._medir(perf_session_factory, usuario_id, produtos)
+        cache.tamanho = 10_000
+        com_cache = self._medir(perf_session_factory, usuario_id, produtos)
+
+        for nome, (por_adicao, ms) in (("sem cache", sem_cache), ("com cache", com_cache)):
+            print(f"\n[add-to-cart {nome}] {por_adicao:.2f} statements/adição, {ms:.2f} ms/adição", end="")
+        print()
+
+        # A leitura do produto sai do caminho; estoque/reserva continuam no banco
+        assert com_cache[0] <= sem_cache[0] - 0.9
+
+
+@pytest.mark.slow
+class TestBenchmarkSerializacaoProdutos:
+    """
+    Listagem de 10k produtos de uma categoria: do banco até os bytes da resposta
+
+    Referência: caminho anterior (entidades ORM completas, f-string por produto,
+    jsonable_encoder + json.dumps como o FastAPI fazia com `{"database": [...]}`).
+    """
+
+    TOTAL = 10_000
+
+    def test_linhas_por_segundo(self, perf_session):
+        perf_session.execute(insert(Produtos), [
+            {"nome": f"Produto {i}", "modelo": f"M{i}", "categoria": "Bench", "valor": 100 + i % 50 / 100,
+             "vlr_compra": 50, "quantidade_estoque": 10} for i in range(self.TOTAL)])
+        perf_session.commit()
+        controller = ProdutoController()
+
+        def anterior():
+            produtos = perf_session.query(Produtos).filter(Produtos.categoria == "Bench", Produtos.ativo == True).all()
+            resultado = [f"ID:{p.codigo} | Produto: {p.nome} | Modelo {p.modelo} | Estoque: {p.quantidade_estoque} "
+                         f"| Valor: {p.valor}" for p in produtos]
+            perf_session.expunge_all()  # cada requisição tinha sessão nova (sem identity map aquecido)
+            return json.dumps(jsonable_encoder({"database": resultado})).encode()
+
+        def projecao(campos=None):
+            linhas = controller.filtro_categoria(perf_session, "Bench", self.TOTAL + 1, 0, campos)
+            return ProdutosPagina.json_das_linhas(linhas, self.TOTAL, 0)
+
+        assert json.loads(projecao())["itens"][0] == {"codigo": 1, "nome": "Produto 0", "modelo": "M0",
+                                                      "categoria": "Bench", "valor": 100.0,
+                                                      "quantidade_estoque": 10}
+        resultados = {
+            "anterior (ORM + f-string)": median(medir_ms(anterior, 5)),
+            "projeção + pydantic-core": median(medir_ms(projecao, 5)),
+            "projeção fields=nome,valor": median(medir_ms(lambda: projecao(["nome", "valor"]), 5)),
+        }
+
+        for nome, ms in resultados.items():
+            print(f"\n[serialização 10k] {nome:28}: {ms:7.1f} ms  ({self.TOTAL / ms * 1000:9,.0f} linhas/s)", end="")
+        print()
+
+        anterior_ms, completo_ms, parcial_ms = resultados.values()
+        assert completo_ms < anterior_ms / 2
+        assert parcial_ms < completo_ms
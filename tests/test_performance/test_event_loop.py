@@ -0,0 +1,93 @@
+"""
+Carga: latência de /health enquanto /auth/login é martelado
+
+Sobe a API num uvicorn real (thread separada) e mede p50/p99 de /health
+com vários clientes fazendo login ao mesmo tempo. Se alguma rota bloquear o
+event loop (SQL ou bcrypt direto numa `async def`), o p99 de /health passa a
+acompanhar o custo de um hash bcrypt.
+"""
+import gc
+import threading
+import time
+from statistics import median, quantiles
+
+import httpx
+import pytest
+
+from src.api import app as app_module
+from src.controllers.auth_controller import AuthController
+from src.database.connection import get_db
+from src.services.security import JWTHandler, PasswordHandler
+
+CLIENTES_LOGIN = 8
+DURACAO_SEGUNDOS = 3.0
+SENHA = "Bench123!@#"
+
+
+@pytest.fixture
+def servidor(monkeypatch, perf_session_factory, perf_session, iniciar_servidor):
+    """API real em uvicorn, apontando para o banco de benchmark"""
+    monkeypatch.setattr(app_module, "EXPIRACAO_WORKER_ATIVO", False)
+    monkeypatch.setattr(JWTHandler, "SECRET_KEY", "bench-secret")
+
+    AuthController().registrar_usuario(db=perf_session, username="bench_login", email="login@loja.com",
+                                       senha=SENHA, nome_completo="Bench Login", tipo_usuario="vendedor")
+
+    def _get_db():
+        db = perf_session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app_module.app.dependency_overrides[get_db] = _get_db
+
+    yield iniciar_servidor(app_module.app)
+
+    app_module.app.dependency_overrides.clear()
+
+
+@pytest.mark.slow
+def test_health_nao_trava_durante_logins(servidor):
+    parar = threading.Event()
+    logins = []
+
+    def martelar_login():
+        with httpx.Client(base_url=servidor, timeout=30) as client:
+            while not parar.is_set():
+                resposta = client.post("/auth/login", json={"username": "bench_login", "senha": SENHA})
+                logins.append(resposta.status_code)
+
+    inicio = time.perf_counter()
+    PasswordHandler.hash_password(SENHA)
+    custo_hash_ms = (time.perf_counter() - inicio) * 1000
+
+    # Heap deixado por outros testes: uma coleta gen2 no meio da medição vira ruído de segundos
+    gc.collect()
+    gc.freeze()
+
+    threads = [threading.Thread(target=martelar_login) for _ in range(CLIENTES_LOGIN)]
+    for thread in threads:
+        thread.start()
+
+    latencias = []
+    with httpx.Client(base_url=servidor, timeout=30) as client:
+        fim = time.perf_counter() + DURACAO_SEGUNDOS
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            assert client.get("/health").status_code == 200
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            time.sleep(0.01)
+
+    parar.set()
+    for thread in threads:
+        thread.join()
+    gc.unfreeze()
+
+    p50 = median(latencias)
+    p99 = quantiles(latencias, n=100)[98]
+    print(f"\n[/health sob carga] p50={p50:.1f} ms p99={p99:.1f} ms "
+          f"({len(latencias)} amostras, {len(logins)} logins, hash bcrypt={custo_hash_ms:.0f} ms)")
+
+    assert logins and set(logins) == {200}
+    assert p99 < custo_hash_ms
@@ -0,0 +1,43 @@
+"""
+Orçamento de tempo de import (cold start) de `src.api.app`
+
+Roda `python -X importtime` num interpretador novo e falha se o import
+passar do teto ou se puxar dependências pesadas que a API não usa
+(pandas/plotly/rich, relatórios).
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ_PROJETO = Path(__file__).resolve().parents[2]
+
+# Teto do import cumulativo de src.api.app (ms); sobrescrevível no CI lento
+ORCAMENTO_IMPORT_MS = float(os.getenv("ORCAMENTO_IMPORT_MS", "2500"))
+
+MODULOS_PROIBIDOS = ("pandas", "numpy", "plotly", "rich", "src.reports")
+
+
+def _importtime(modulo: str) -> dict[str, int]:
+    """Tempo cumulativo (µs) de cada módulo importado por `modulo`"""
+    resultado = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                               cwd=RAIZ_PROJETO, capture_output=True, text=True, check=True)
+
+    tempos = {}
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, cumulativo, nome = linha.split("|")
+        tempos[nome.strip()] = int(cumulativo)
+    return tempos
+
+
+def test_import_da_api_dentro_do_orcamento():
+    tempos = _importtime("src.api.app")
+
+    proibidos = sorted(m for m in tempos if any(m == p or m.startswith(p + ".") for p in MODULOS_PROIBIDOS))
+    total_ms = tempos["src.api.app"] / 1000
+    print(f"\n[import src.api.app] {total_ms:.0f} ms (orçamento {ORCAMENTO_IMPORT_MS:.0f} ms)")
+
+    assert not proibidos, f"Import da API puxa dependências pesadas: {proibidos}"
+    assert total_ms < ORCAMENTO_IMPORT_MS
@@ -0,0 +1,124 @@
+"""
+Regressão de número de statements SQL por endpoint
+
+Conta os statements emitidos por requisição e falha se algum endpoint passar
+do orçamento. Os produtos são semeados com histórico (vendas e movimentações)
+para que um relacionamento de histórico carregado por acidente apareça aqui.
+"""
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert
+
+from src.api.app import app
+from src.api.middleware.auth_middleware import get_current_user
+from src.database.connection import get_db, get_sessao
+from src.database.models import Clientes, ItemVenda, MovimentacaoEstoque, Vendas
+
+# Teto de statements por requisição (subir só com justificativa)
+ORCAMENTO_STATEMENTS = {
+    "POST /sales/cart/items": 11,
+    "GET /sales/cart": 2,
+    "PATCH /sales/cart/items/{id}": 10,
+    "DELETE /sales/cart/items/{id}": 14,
+    "POST /sales/checkout": 9,
+    "GET /products/search": 1,
+    "GET /stock/{id}/availability": 2,
+    "GET /clients": 2,  # página + COUNT (include_total)
+}
+
+HISTORICO_POR_PRODUTO = 50
+
+
+@pytest.fixture
+def contador_statements(perf_engine):
+    statements = []
+
+    def _contar(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(perf_engine, "before_cursor_execute", _contar)
+    yield statements
+    event.remove(perf_engine, "before_cursor_execute", _contar)
+
+
+@pytest.fixture
+def api(perf_session_factory, vendedor_id):
+    def _get_db():
+        db = perf_session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_sessao] = _get_db
+    app.dependency_overrides[get_current_user] = lambda: {
+        "user_id": vendedor_id, "username": "bench_vendedor", "tipo_usuario": "admin"
+    }
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def produtos_com_historico(perf_session, vendedor_id, criar_produtos):
+    """Produtos com vendas e movimentações antigas"""
+    produtos = criar_produtos(5, estoque=10_000)
+
+    cliente = Clientes(nome="Cliente Historico", cpf="52998224725", dt_nascimento=datetime(1990, 1, 1),
+                       telefone="11999999999", endereco="Rua Teste, 1")
+    perf_session.add(cliente)
+    venda = Vendas(data_hora=datetime.now(), subtotal=100, desconto=0, total=100, forma_pagamento="Debito",
+                   cliente_id=cliente.id_cliente, vendedor_id=vendedor_id)
+    perf_session.add(venda)
+    perf_session.flush()
+
+    perf_session.execute(insert(ItemVenda), [
+        {"id_venda": venda.id_venda, "produto_id": pid, "nome_produto": "Produto", "quantidade": 1,
+         "preco_unitario": 100, "subtotal": 100}
+        for pid in produtos for _ in range(HISTORICO_POR_PRODUTO)
+    ])
+    perf_session.execute(insert(MovimentacaoEstoque), [
+        {"produto_id": pid, "tipo": "ENTRADA", "quantidade": 1, "estoque_anterior": 0, "estoque_posterior": 1,
+         "usuario_id": vendedor_id, "data_hora": datetime.now()}
+        for pid in produtos for _ in range(HISTORICO_POR_PRODUTO)
+    ])
+    perf_session.commit()
+    return produtos
+
+
+def _medir(contador: list, requisicao) -> int:
+    contador.clear()
+    resposta = requisicao()
+    assert resposta.status_code < 400, resposta.text
+    return len(contador)
+
+
+def test_statements_por_endpoint_dentro_do_orcamento(api, contador_statements, produtos_com_historico):
+    produto = produtos_com_historico[0]
+    medidos = {}
+
+    for outro in produtos_com_historico[1:]:
+        api.post("/sales/cart/items", json={"produto_id": outro, "quantidade": 1})
+
+    medidos["POST /sales/cart/items"] = _medir(
+        contador_statements, lambda: api.post("/sales/cart/items", json={"produto_id": produto, "quantidade": 1}))
+    medidos["GET /sales/cart"] = _medir(contador_statements, lambda: api.get("/sales/cart"))
+    medidos["PATCH /sales/cart/items/{id}"] = _medir(
+        contador_statements, lambda: api.patch(f"/sales/cart/items/{produto}", json={"nova_quantidade": 3}))
+    medidos["GET /stock/{id}/availability"] = _medir(
+        contador_statements, lambda: api.get(f"/stock/{produto}/availability"))
+    medidos["GET /products/search"] = _medir(
+        contador_statements, lambda: api.get("/products/search", params={"nome": "Produto 1"}))
+    medidos["GET /clients"] = _medir(contador_statements, lambda: api.get("/clients"))
+    medidos["DELETE /sales/cart/items/{id}"] = _medir(
+        contador_statements, lambda: api.delete(f"/sales/cart/items/{produto}"))
+    medidos["POST /sales/checkout"] = _medir(
+        contador_statements, lambda: api.post("/sales/checkout", json={"forma_pagamento": "Debito"}))
+
+    print("\n" + "\n".join(f"[statements] {rota}: {n}" for rota, n in medidos.items()))
+
+    estourados = {rota: (n, ORCAMENTO_STATEMENTS[rota]) for rota, n in medidos.items()
+                  if n > ORCAMENTO_STATEMENTS[rota]}
+    assert not estourados, f"Endpoints acima do orçamento de statements (medido, teto): {estourados}"
@@ -0,0 +1,112 @@
+"""
+Throughput (req/s) das rotas quentes: modo síncrono vs DB_ASYNC
+
+A API roda num processo uvicorn separado, configurado só por variáveis de
+ambiente (DATABASE_URL, DB_ASYNC). O gerador de carga é um cliente HTTP/1.1
+keep-alive mínimo em asyncio, para que o custo do cliente não domine a
+medição.
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from src.services.security import JWTHandler
+
+CONCORRENCIA = 64
+DURACAO_SEGUNDOS = 3.0
+SEGREDO_JWT = "bench-secret"
+RAIZ_PROJETO = Path(__file__).resolve().parents[2]
+
+
+def _porta_livre() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _subir_api(database_url: str, db_async: bool) -> tuple[subprocess.Popen, int]:
+    porta = _porta_livre()
+    env = dict(os.environ, DATABASE_URL=database_url, DB_ASYNC=str(db_async), JWT_SECRET_KEY=SEGREDO_JWT,
+               EXPIRACAO_WORKER_ATIVO="False", DEBUG="False", ENVIRONMENT="development")
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.app:app", "--port", str(porta), "--log-level", "warning"],
+        cwd=RAIZ_PROJETO, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    limite = time.perf_counter() + 30
+    while time.perf_counter() < limite:
+        try:
+            socket.create_connection(("127.0.0.1", porta), timeout=0.2).close()
+            return processo, porta
+        except OSError:
+            time.sleep(0.1)
+
+    processo.kill()
+    raise RuntimeError("API não subiu a tempo")
+
+
+async def _requisitar(reader, writer, caminho: str, token: str) -> int:
+    writer.write(f"GET {caminho} HTTP/1.1\r\nHost: bench\r\nAuthorization: Bearer {token}\r\n\r\n".encode())
+    await writer.drain()
+
+    cabecalho = await reader.readuntil(b"\r\n\r\n")
+    status = int(cabecalho.split(b" ", 2)[1])
+    tamanho = 0
+    for linha in cabecalho.split(b"\r\n"):
+        if linha.lower().startswith(b"content-length:"):
+            tamanho = int(linha.split(b":", 1)[1])
+    await reader.readexactly(tamanho)
+    return status
+
+
+async def _medir_throughput(porta: int, produtos: list[int], token: str) -> float:
+    concluidas = 0
+    fim = time.perf_counter() + DURACAO_SEGUNDOS
+
+    async def cliente(indice: int):
+        nonlocal concluidas
+        reader, writer = await asyncio.open_connection("127.0.0.1", porta)
+        try:
+            while time.perf_counter() < fim:
+                if indice % 2:
+                    caminho = f"/stock/{produtos[indice % len(produtos)]}/availability"
+                else:
+                    caminho = f"/products/search?nome=Produto%20{indice % 10}"
+                assert await _requisitar(reader, writer, caminho, token) == 200
+                concluidas += 1
+        finally:
+            writer.close()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(i) for i in range(CONCORRENCIA)))
+    return concluidas / (time.perf_counter() - inicio)
+
+
+@pytest.mark.slow
+def test_throughput_sync_vs_async(monkeypatch, perf_engine, vendedor_id, criar_produtos):
+    monkeypatch.setattr(JWTHandler, "SECRET_KEY", SEGREDO_JWT)
+    token = JWTHandler.create_access_token(
+        {"user_id": vendedor_id, "username": "bench_vendedor", "tipo_usuario": "vendedor"}
+    )
+    produtos = criar_produtos(50)
+    database_url = perf_engine.url.render_as_string()
+
+    resultados = {}
+    for modo, db_async in (("sync", False), ("async", True)):
+        processo, porta = _subir_api(database_url, db_async)
+        try:
+            resultados[modo] = asyncio.run(_medir_throughput(porta, produtos, token))
+        finally:
+            processo.terminate()
+            processo.wait(timeout=10)
+
+    print(f"\n[throughput c={CONCORRENCIA}] sync={resultados['sync']:.0f} req/s "
+          f"async={resultados['async']:.0f} req/s ({resultados['async'] / resultados['sync']:.2f}x)")
+
+    assert resultados["sync"] > 0 and resultados["async"] > 0
@@ -0,0 +1,300 @@
+import gzip
+import io
+import json
+import logging
+import logging.config
+import queue
+import sys
+
+import pytest
+
+from src.utils.logKit import configure_levels, get_logger
+from src.utils.logKit import config_logging, formatters
+from src.utils.logKit.cli import write_json
+from src.utils.logKit.filters import DedupFilter, RateLimitFilter, SamplingFilter
+from src.utils.logKit.formatters import JSONLogFormatter
+from src.utils.logKit.pipeline import (BatchedJSONLFileHandler, BatchQueueListener, DropQueueHandler,
+                                       install_queue_pipeline)
+
+
+@pytest.fixture
+def nomes_loggers():
+    """Nomes exclusivos do teste; remove os níveis de runtime no final"""
+    nomes = ["TesteRegistroA", "TesteRegistroB"]
+    yield nomes
+    for nome in nomes:
+        config_logging._niveis_runtime.pop(nome, None)
+        config_logging._registro.pop(nome, None)
+
+
+class TestRegistroLoggers:
+    """Registro configure-once do get_logger"""
+
+    def test_mesmo_nivel_nao_chama_set_level(self, nomes_loggers, monkeypatch):
+        logger = get_logger(nomes_loggers[0], "DEBUG")
+        chamadas = []
+        monkeypatch.setattr(logging.Logger, "setLevel", lambda self, level: chamadas.append(level))
+
+        for _ in range(100):
+            assert get_logger(nomes_loggers[0], "DEBUG") is logger
+
+        assert chamadas == []
+        assert logger.level == logging.DEBUG
+
+    def test_novo_nivel_no_codigo_ainda_vale(self, nomes_loggers):
+        get_logger(nomes_loggers[0], "DEBUG")
+
+        assert get_logger(nomes_loggers[0], "ERROR").level == logging.ERROR
+
+    def test_configure_levels_prevalece_sobre_get_logger(self, nomes_loggers):
+        a = get_logger(nomes_loggers[0], "DEBUG")
+        b = get_logger(nomes_loggers[1], "DEBUG")
+        assert a.isEnabledFor(logging.DEBUG)
+
+        configure_levels({nomes_loggers[0]: "WARNING", nomes_loggers[1]: "ERROR"})
+
+        assert not a.isEnabledFor(logging.DEBUG)
+        assert b.level == logging.ERROR
+        assert get_logger(nomes_loggers[0], "DEBUG").level == logging.WARNING
+
+    def test_configure_levels_invalido_nao_altera_nada(self, nomes_loggers):
+        logger = get_logger(nomes_loggers[0], "INFO")
+
+        with pytest.raises(ValueError):
+            configure_levels({nomes_loggers[0]: "ERROR", nomes_loggers[1]: "VERBOSE"})
+
+        assert logger.level == logging.INFO
+
+
+class TestPipelineAssincrono:
+    """Fila limitada + listener em lotes + arquivo JSONL rotacionado"""
+
+    @pytest.fixture
+    def logger_isolado(self):
+        logger = logging.getLogger("TestePipeline")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        yield logger
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+
+    def test_registros_chegam_ao_arquivo_em_lotes(self, logger_isolado, tmp_path, monkeypatch):
+        arquivo = BatchedJSONLFileHandler(tmp_path / "app.jsonl")
+        escritas = []
+        original = arquivo.emit_batch
+        monkeypatch.setattr(arquivo, "emit_batch", lambda registros: (escritas.append(len(registros)),
+                                                                     original(registros)))
+        logger_isolado.addHandler(arquivo)
+
+        listener = install_queue_pipeline(logger_isolado, queue_size=1000, batch_size=50)
+        listener.stop()  # nada enfileirado ainda: reinicia com a fila cheia de registros
+        for i in range(200):
+            logger_isolado.info("item %d", i)
+        listener.start()
+        listener.stop()
+
+        linhas = (tmp_path / "app.jsonl").read_text(encoding="utf-8").splitlines()
+        assert [json.loads(linha)["message"] for linha in linhas] == [f"item {i}" for i in range(200)]
+        assert escritas == [50, 50, 50, 50]
+
+    def test_fila_cheia_descarta_e_conta(self, logger_isolado, tmp_path):
+        arquivo = BatchedJSONLFileHandler(tmp_path / "app.jsonl")
+        fila = queue.Queue(maxsize=5)
+        queue_handler = DropQueueHandler(fila)
+        logger_isolado.addHandler(queue_handler)
+
+        for i in range(8):
+            logger_isolado.info("item %d", i)
+
+        listener = BatchQueueListener(fila, arquivo, source=queue_handler)
+        listener.start()
+        listener.stop()
+        arquivo.close()
+
+        mensagens = [json.loads(linha)["message"]
+                     for linha in (tmp_path / "app.jsonl").read_text(encoding="utf-8").splitlines()]
+        assert queue_handler.dropped == 3
+        assert mensagens[:5] == [f"item {i}" for i in range(5)]
+        assert mensagens[5] == "3 registros de log descartados (fila cheia, total 3)"
+
+    def test_rotacao_comprime_e_mantem_backups(self, tmp_path):
+        arquivo = BatchedJSONLFileHandler(tmp_path / "app.jsonl", max_bytes=500, backup_count=2)
+
+        for lote in range(5):
+            arquivo.emit_batch([logging.LogRecord("x", logging.INFO, __file__, 1, "lote %d " + "x" * 600,
+                                                  (lote,), None)])
+        arquivo.close()
+
+        backups = sorted(tmp_path.glob("app.jsonl.*.gz"))
+        assert len(backups) == 2
+        assert "lote 4" in gzip.decompress(backups[-1].read_bytes()).decode()
+        assert not list(tmp_path.glob("app.jsonl.*[0-9]"))
+
+
+class TestJSONLogFormatter:
+    """Formatter com plano de chaves pré-calculado"""
+
+    def _record(self, **extras) -> logging.LogRecord:
+        record = logging.LogRecord("loja", logging.INFO, __file__, 10, "item %s", (1,), None)
+        record.__dict__.update(extras)
+        return record
+
+    def test_extras_por_politica(self):
+        record = self._record(request_id="abc", context={"rota": "/sales"})
+
+        incluidos = json.loads(JSONLogFormatter().format(record))
+        assert incluidos["request_id"] == "abc" and incluidos["message"] == "item 1"
+
+        ignorados = json.loads(JSONLogFormatter(include_keys=["message", "context"],
+                                                unknown_extras="ignore").format(record))
+        assert ignorados == {"message": "item 1", "context": {"rota": "/sales"}}
+
+        with pytest.raises(ValueError):
+            JSONLogFormatter(include_keys=["message"], unknown_extras="raise").format(record)
+
+    def test_campos_de_contexto_nao_escondem_extras(self):
+        record = self._record(request_id="req-1", route="/sales/checkout", user_id=None, pedido=10)
+
+        saida = json.loads(JSONLogFormatter().format(record))
+        assert saida["request_id"] == "req-1" and saida["route"] == "/sales/checkout"
+        assert "user_id" not in saida
+        assert saida["pedido"] == 10
+
+        so_contexto = JSONLogFormatter(include_keys=["request_id"], unknown_extras="ignore").format(record)
+        assert json.loads(so_contexto) == {"request_id": "req-1"}
+
+    def test_extra_nao_serializavel_e_fallback_stdlib(self, monkeypatch):
+        record = self._record(objeto=object())
+        com_orjson = json.loads(JSONLogFormatter().format(record))
+
+        monkeypatch.setattr(formatters, "orjson", None)
+        com_stdlib = json.loads(JSONLogFormatter().format(record))
+
+        assert com_orjson["objeto"].startswith("<object object")
+        assert com_stdlib == com_orjson
+
+    def test_timestamp_cacheado_por_segundo(self):
+        formatter = JSONLogFormatter(include_keys=["created"])
+        record = self._record()
+
+        for created in (1_700_000_000.1, 1_700_000_000.9, 1_700_000_001.2):
+            record.created = created
+            assert json.loads(formatter.format(record))["created"] == \
+                   formatter.formatTime(record, formatter.datefmt)
+
+    def test_exc_info_formatado(self):
+        try:
+            raise RuntimeError("falhou")
+        except RuntimeError:
+            record = logging.LogRecord("loja", logging.ERROR, __file__, 1, "erro", (), sys.exc_info())
+
+        saida = json.loads(JSONLogFormatter().format(record))
+        assert "RuntimeError: falhou" in saida["exc_info"]
+        assert "stack_info" not in saida
+
+
+class TestFiltros:
+    """Amostragem, rate limit e dedup dos logs de hot path"""
+
+    def _record(self, msg="Produto verificado: 1", level=logging.INFO, lineno=10, nome="loja"):
+        return logging.LogRecord(nome, level, __file__, lineno, msg, (), None)
+
+    def test_amostragem_por_logger_e_level(self):
+        filtro = SamplingFilter(rate=1.0, levels={"DEBUG": 0.0}, loggers={"hot": 0.25}, seed=7)
+
+        assert filtro.filter(self._record())
+        assert not filtro.filter(self._record(level=logging.DEBUG))
+        assert filtro.filter(self._record(level=logging.WARNING, nome="hot"))
+
+        passaram = sum(filtro.filter(self._record(nome="hot")) for _ in range(4000))
+        assert 800 < passaram < 1200
+
+    def test_rate_limit_por_template_resume_suprimidas(self):
+        filtro = RateLimitFilter(rate=1, burst=2)
+        agora = [0.0]
+        filtro._clock = lambda: agora[0]
+
+        resultados = [filtro.filter(self._record(f"Produto verificado: {i}")) for i in range(5)]
+        assert resultados == [True, True, False, False, False]
+        # Outro ponto de chamada tem o próprio bucket
+        assert filtro.filter(self._record(lineno=99))
+        assert filtro.filter(self._record(level=logging.ERROR))
+
+        agora[0] = 1.0
+        record = self._record("Produto verificado: 9")
+        assert filtro.filter(record)
+        assert record.getMessage() == "Produto verificado: 9 (3 suprimidas)"
+        assert record.suppressed == 3
+
+    def test_dedup_dentro_da_janela(self):
+        filtro = DedupFilter(window=1.0)
+        agora = [0.0]
+        filtro._clock = lambda: agora[0]
+
+        assert filtro.filter(self._record("falha no pagamento", level=logging.ERROR))
+        assert not filtro.filter(self._record("falha no pagamento", level=logging.ERROR))
+        assert not filtro.filter(self._record("falha no pagamento", level=logging.ERROR))
+        assert filtro.filter(self._record("outra mensagem"))
+
+        agora[0] = 1.5
+        record = self._record("falha no pagamento", level=logging.ERROR)
+        assert filtro.filter(record)
+        assert record.getMessage() == "falha no pagamento (repetida 2 vezes)"
+
+    def test_filtros_do_json_config(self, tmp_path, capsys):
+        config = json.loads(write_json(tmp_path / "logging.json").read_text())
+        capsys.readouterr()
+
+        logger = logging.getLogger("tests.logkit.filtros_json")
+        handler = logging.StreamHandler(io.StringIO())
+        logging.config.dictConfig({
+            "version": 1,
+            "disable_existing_loggers": False,
+            "filters": config["filters"],
+            "handlers": {"saida": {"()": lambda: handler,
+                                   "filters": ["rate_limit_console", "dedup_console", "sample"]}},
+            "loggers": {logger.name: {"handlers": ["saida"], "level": "INFO", "propagate": False}},
+        })
+        try:
+            assert {type(f) for f in handler.filters} == {RateLimitFilter, DedupFilter, SamplingFilter}
+            for i in range(50):
+                logger.info("pedido %d", i)
+            assert len(handler.stream.getvalue().splitlines()) == 20
+        finally:
+            logger.removeHandler(handler)
+
+    def test_console_e_arquivo_filtram_independentes(self, tmp_path, capsys):
+        """Cada handler do JSON gerado tem as próprias instâncias de rate limit e dedup"""
+        config = json.loads(write_json(tmp_path / "logging.json").read_text())
+        capsys.readouterr()
+        config["handlers"]["console"] = {"class": "logging.StreamHandler", "stream": io.StringIO(),
+                                         "filters": config["handlers"]["console"]["filters"]}
+        config["handlers"]["file"]["filename"] = str(tmp_path / "log.jsonl")
+        config["handlers"]["file"]["formatter"] = "console"
+        logger = logging.getLogger("tests.logkit.dois_handlers")
+        logging.config.dictConfig({
+            "version": 1,
+            "disable_existing_loggers": False,
+            "formatters": config["formatters"],
+            "filters": config["filters"],
+            "handlers": {nome: config["handlers"][nome] for nome in ("console", "file")},
+            "loggers": {logger.name: {"handlers": ["console", "file"], "level": "INFO", "propagate": False}},
+        })
+        console, arquivo = logger.handlers
+        try:
+            for _ in range(3):
+                logger.error("falha no pagamento")
+            for i in range(20):
+                logger.info("pedido %d", i)
+            arquivo.flush()
+
+            saidas = [console.stream.getvalue().splitlines(),
+                      (tmp_path / "log.jsonl").read_text(encoding="utf-8").splitlines()]
+            for linhas in saidas:
+                assert linhas.count("falha no pagamento") == 1
+                assert len(linhas) == 21
+        finally:
+            for handler in (console, arquivo):
+                logger.removeHandler(handler)
+                handler.close()